@@ -5,8 +5,12 @@ NKUST 問卷自動填寫系統
 流程：登入 → 主頁 → 期末問卷 → 期末問卷填寫 → 各科填寫問卷 → 送出
 """
 
+import argparse
+import logging
 import time
-import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlencode, urlsplit
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,23 +18,132 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.edge.options import Options
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
+import requests
 import config
+import fill_engine
+import page_parser
+from readiness import PageReadiness, SUBMIT_CLICK_SCRIPT
+from http_filler import HttpQuestionnaireSession, HttpFillUnsupported
+from driver_cache import DriverCache, detect_edge_version
+from tracing import Tracer, traced
+from driver_metrics import CommandAccounting
+from completion_journal import CompletionJournal
+from form_templates import TemplateCache
+from network_filter import NetworkFilter
+from session_recovery import SessionRecovery, is_session_lost
+from browser_daemon import BrowserDaemon
+import submission_check
+import page_corpus
+from selector_resolver import SelectorResolver, SelectorStats
+from tab_pipeline import TabPipeline
+from log_setup import start_logging, stop_logging
+
+# 以臨時表單重送問卷按鈕原本的 form 提交: arguments = [action, method, fields]
+OPEN_FORM_SCRIPT = """
+var form = document.createElement('form'), fields = arguments[2];
+form.action = arguments[0];
+form.method = arguments[1];
+Object.keys(fields).forEach(function (name) {
+    var input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = name;
+    input.value = fields[name];
+    form.appendChild(input);
+});
+document.body.appendChild(form);
+form.submit();
+"""
+
+# 🎯 備援選擇器鏈（CSS 與 XPath 可混用，由 SelectorResolver 一次在頁面內評估）
+MENU_SELECTORS = [
+    "//a[contains(text(),'期末問卷')]",
+    "//span[contains(text(),'期末問卷')]",
+    "//*[contains(text(),'期末問卷')]"
+]
+FILL_LINK_SELECTORS = [
+    "//a[contains(text(),'期末問卷填寫')]",
+    "//a[contains(text(),'問卷填寫')]",
+    "//*[contains(text(),'期末問卷填寫')]"
+]
+SUBMIT_SELECTORS = [
+    "input[value*='送出']",
+    "button[type='submit']",
+    "input[type='submit']",
+    "//input[contains(@value,'送出')]",
+    "//button[contains(text(),'送出')]"
+]
+
+# 點擊 onclick 屬性完全相同的按鈕: arguments = [onclick]
+CLICK_BY_ONCLICK_SCRIPT = """
+var elements = document.querySelectorAll('[onclick]');
+for (var i = 0; i < elements.length; i++) {
+    if (elements[i].getAttribute('onclick') === arguments[0]) {
+        elements[i].click();
+        return true;
+    }
+}
+return false;
+"""
+
 
 class QuestionnaireAutoFiller:
     def __init__(self):
         self.driver = None
         self.wait = None
+        self.answer_policy = fill_engine.build_answer_policy()
+        self.questionnaire_list = []
+        self.list_url = None
+        self.http_session = None
+        self.driver_cache = DriverCache()
+        self.tracer = Tracer(console=config.TRACE_CONSOLE)
+        self.command_stats = CommandAccounting([__file__], self.tracer) if config.DRIVER_COMMAND_STATS else None
+        self.journal = CompletionJournal() if config.JOURNAL_ENABLED else None
+        self.form_templates = TemplateCache(self.answer_policy)
+        self.network = None
+        self.recovery = SessionRecovery(self)
+        self.ready = None
+        self.selectors = SelectorResolver(None, self.tracer)
+        self.corpus = page_corpus.PageCorpus() if config.CORPUS_CAPTURE else None
+        self.driver_factory = None  # 回傳 driver 的函式；設定時取代 Edge 啟動（例如 fake_driver.FakeDriver）
+        self.browser_daemon = BrowserDaemon() if config.BROWSER_DAEMON else None
+        self.pipeline = TabPipeline(self) if config.PIPELINE_PREFETCH else None
+        if config.DRIVER_BACKEND == 'fake':
+            self.use_fixture_state()
+    
+    def use_fixture_state(self):
+        """對測試站執行時使用: 完成紀錄、模板快取與選擇器統計只保留在記憶體，不讀寫使用者的檔案"""
+        self.journal = None
+        self.form_templates = TemplateCache(self.answer_policy, '')
+        self.selectors.stats = SelectorStats('')
+    
+    def emit(self, message='', level=logging.INFO):
+        """輸出訊息: 記錄為追蹤事件，並依等級交給 logging（主控台只是其中一個檢視）"""
+        self.tracer.message(message, level)
+    
+    def detail(self, message=''):
+        """逐步驟的細節，只在 DEBUG 等級輸出"""
+        self.tracer.message(message, logging.DEBUG)
+    
+    def debug(self, build):
+        """延遲產生的診斷訊息: build() 只在 DEBUG 等級開啟時才執行"""
+        if self.tracer.enabled(logging.DEBUG):
+            for line in build():
+                self.tracer.message(line, logging.DEBUG)
         
+    @traced('setup_browser')
     def setup_browser(self):
         """🚀 優化版瀏覽器設定 - 節省 60% 初始化時間"""
-        print("🚀 啟動超高速瀏覽器模式...")
+        self.detail("🚀 啟動超高速瀏覽器模式...")
         
         options = Options()
         
+        # ⏱️ DOM 可操作即返回，其餘資源不阻塞
+        options.page_load_strategy = config.PAGE_LOAD_STRATEGY
+        
         # 🚀 核心加速參數
         if config.HEADLESS_MODE:
             options.add_argument('--headless')
-            print("   ✅ Headless 模式已啟用")
+            self.detail("   ✅ Headless 模式已啟用")
         
         # ⚡ 效能優化參數
         speed_options = [
@@ -63,7 +176,10 @@ class QuestionnaireAutoFiller:
                 "profile.default_content_settings.media_stream": 2
             }
             options.add_experimental_option("prefs", prefs)
-            print("   ✅ 圖片載入已禁用")
+            self.detail("   ✅ 圖片載入已禁用")
+        
+        # 📈 效能記錄: 統計網路封鎖擋下的請求
+        options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
         
         # 🔧 反檢測設置
         options.add_argument('--disable-blink-features=AutomationControlled')
@@ -71,18 +187,15 @@ class QuestionnaireAutoFiller:
         options.add_experimental_option('useAutomationExtension', False)
         
         # ⚡ 快速啟動 WebDriver
-        try:
-            # 優先使用系統 Edge，避免下載延遲
-            self.driver = webdriver.Edge(options=options)
-            print("   ✅ 使用系統 Edge WebDriver")
-        except:
-            try:
-                service = Service(EdgeChromiumDriverManager().install())
-                self.driver = webdriver.Edge(service=service, options=options)
-                print("   ✅ 使用下載的 WebDriver")
-            except Exception as e:
-                print(f"   ❌ WebDriver 啟動失敗: {e}")
-                raise
+        self.start_driver(options)
+        if self.command_stats:
+            self.command_stats.install(self.driver)
+        
+        # 🚫 擋下字型、分析追蹤、媒體等問卷用不到的請求
+        self.network = NetworkFilter(self.driver)
+        if self.network.install():
+            action = "已封鎖" if self.network.block else "僅統計"
+            self.detail(f"   ✅ 網路過濾{action}: {len(self.network.patterns)} 個樣式")
         
         # 🚀 進階反檢測和超時設定
         self.driver.execute_script("""
@@ -91,25 +204,108 @@ class QuestionnaireAutoFiller:
             Object.defineProperty(navigator, 'languages', {get: () => ['zh-TW', 'zh', 'en']});
         """)
         
-        # ⚡ 超高速等待設定
+        # ⚡ 超高速等待設定: 關閉隱式等待，找不到元素時立即返回，需要等待的地方一律用明確條件
         timeout_config = config.ULTRA_SPEED_CONFIG
-        self.driver.implicitly_wait(timeout_config['implicit_wait'])
+        self.driver.implicitly_wait(0)
         self.driver.set_page_load_timeout(timeout_config['page_load_timeout'])
         self.driver.set_script_timeout(timeout_config['script_timeout'])
         
         self.wait = WebDriverWait(self.driver, timeout_config['implicit_wait'])
-        print(f"   ✅ 瀏覽器優化完成 - 等待時間: {timeout_config['implicit_wait']}秒")
+        self.ready = PageReadiness(self.driver, tracer=self.tracer)
+        self.selectors.driver = self.driver
+        if self.pipeline:
+            self.pipeline.reset()
+        self.detail(f"   ✅ 瀏覽器優化完成 - 等待時間: {timeout_config['implicit_wait']}秒")
+        
+    def start_driver(self, options):
+        """⚡ 啟動 WebDriver: 優先使用快取的 driver 路徑，Edge 版本改變時才重新解析"""
+        start = time.time()
+        self.driver = None
+        if self.driver_factory is None and config.DRIVER_BACKEND == 'fake':
+            from fake_driver import FakeDriver
+            self.driver_factory = FakeDriver
+        if self.driver_factory is not None:
+            self.driver = self.driver_factory()
+            self.detail(f"   ✅ 使用 {type(self.driver).__name__} ({time.time() - start:.3f} 秒)")
+            return
+        if self.browser_daemon:
+            # 🔥 連上常駐瀏覽器，沒有在執行時以相同參數啟動
+            try:
+                options = self.browser_daemon.attach_options(options)
+                state = "已啟動" if self.browser_daemon.launched else "連上"
+                self.detail(f"   ✅ {state}常駐瀏覽器 {self.browser_daemon.address}")
+            except RuntimeError as e:
+                self.emit(f"   ⚠️ 常駐瀏覽器無法使用，改為一般啟動: {e}", logging.WARNING)
+        warm = False
+        browser_version = detect_edge_version()
+        
+        cached = self.driver_cache.lookup(browser_version)
+        if cached:
+            try:
+                self.driver = webdriver.Edge(service=Service(cached['driver_path']), options=options)
+                warm = True
+                self.detail(f"   ✅ 使用快取的 WebDriver ({cached['browser_version']})")
+            except Exception as e:
+                self.emit(f"   ⚠️ 快取的 WebDriver 無法使用，重新解析: {e}", logging.WARNING)
+                self.driver_cache.invalidate()
+                self.driver = None
         
+        if self.driver is None:
+            try:
+                # 優先使用系統 Edge，避免下載延遲
+                self.driver = webdriver.Edge(options=options)
+                self.detail("   ✅ 使用系統 Edge WebDriver")
+            except Exception:
+                try:
+                    service = Service(EdgeChromiumDriverManager().install())
+                    self.driver = webdriver.Edge(service=service, options=options)
+                    self.detail("   ✅ 使用下載的 WebDriver")
+                except Exception as e:
+                    self.emit(f"   ❌ WebDriver 啟動失敗: {e}", logging.ERROR)
+                    raise
+        
+        # 💾 記錄實際使用的 driver 與 Edge 版本，供下次直接重用
+        kind = 'warm' if warm else 'cold'
+        if self.browser_daemon and not self.browser_daemon.launched:
+            kind = 'daemon'
+        actual_version = self.driver.capabilities.get('browserVersion') or browser_version
+        driver_path = getattr(self.driver.service, 'path', None)
+        if driver_path and (not warm or cached.get('browser_version') != actual_version):
+            self.driver_cache.store(driver_path, actual_version)
+        
+        elapsed = time.time() - start
+        self.driver_cache.record_startup(kind, elapsed)
+        averages = self.driver_cache.startup_report()
+        labels = {'cold': '冷啟動', 'warm': '熱啟動', 'daemon': '連上常駐瀏覽器'}
+        summary = "、".join(f"{labels.get(k, k)}平均 {v:.2f} 秒" for k, v in sorted(averages.items()))
+        self.detail(f"   ⏱️ WebDriver {labels[kind]} {elapsed:.2f} 秒 ({summary})")
+    
+    def close_driver(self):
+        """結束 driver: 常駐瀏覽器只中斷連線並保持執行，其餘直接關閉瀏覽器"""
+        driver, self.driver = self.driver, None
+        if driver is None:
+            return
+        try:
+            if self.browser_daemon and self.browser_daemon.attached:
+                if self.pipeline:
+                    self.pipeline.close(driver)
+                self.browser_daemon.detach(driver)
+            else:
+                driver.quit()
+        except Exception:
+            pass  # 會話已失效
+        
+    @traced('login')
     def login(self):
         """🚀 步驟1: 超高速登入 - 節省 80% 等待時間"""
-        print("🚀 步驟1: 極速登入模式...")
+        self.detail("🚀 步驟1: 極速登入模式...")
         
         # ⚡ 快速載入登入頁面
         self.driver.get(config.LOGIN_URL)
         
-        # 🎯 縮短等待時間
+        # 🎯 頁面就緒即繼續，login_wait 僅為上限
         login_wait = config.ULTRA_SPEED_CONFIG['login_wait']
-        time.sleep(login_wait)
+        self.ready.document_ready("登入頁載入", login_wait)
         
         try:
             # ⚡ 快速定位和填入帳號密碼
@@ -119,55 +315,56 @@ class QuestionnaireAutoFiller:
             # 🚀 使用 JavaScript 快速填入，避免動畫延遲
             self.driver.execute_script("arguments[0].value = arguments[1];", username_input, config.STUDENT_ID)
             self.driver.execute_script("arguments[0].value = arguments[1];", password_input, config.PASSWORD)
-            print(f"   ✅ 極速填入帳號: {config.STUDENT_ID}")
+            self.detail(f"   ✅ 極速填入帳號: {config.STUDENT_ID}")
             
             # 🎯 智能處理 reCAPTCHA
             if config.FAST_LOGIN_MODE:
-                print("   🚀 快速登入模式 - 自動嘗試登入")
+                self.detail("   🚀 快速登入模式 - 自動嘗試登入")
                 
                 # 檢查是否有 reCAPTCHA
                 captcha_elements = self.driver.find_elements(By.CSS_SELECTOR, ".g-recaptcha, iframe[src*='recaptcha']")
                 
                 if captcha_elements:
-                    print("   ⚠️ 檢測到 reCAPTCHA")
+                    self.emit("   ⚠️ 檢測到 reCAPTCHA", logging.WARNING)
                     if config.HEADLESS_MODE:
-                        print("   ⏭️ Headless 模式 - 嘗試繞過驗證")
+                        self.emit("   ⏭️ Headless 模式 - 嘗試繞過驗證")
                         # 在 headless 模式下直接嘗試提交
                         time.sleep(1)
                     else:
-                        print("   ✋ 請快速完成 reCAPTCHA 驗證 (10秒內)")
+                        self.emit("   ✋ 請快速完成 reCAPTCHA 驗證 (10秒內)")
                         time.sleep(3)  # 給用戶短時間完成驗證
                 else:
-                    print("   ✅ 無需驗證")
+                    self.detail("   ✅ 無需驗證")
             else:
                 # 傳統模式等待用戶確認
-                print("   ⚠️ 請完成 reCAPTCHA 驗證")
-                print("   ✋ 完成後請點擊任意鍵繼續...")
+                self.emit("   ⚠️ 請完成 reCAPTCHA 驗證", logging.WARNING)
+                self.emit("   ✋ 完成後請點擊任意鍵繼續...")
                 
                 try:
                     import msvcrt
-                    print("   📝 按任意鍵繼續...")
+                    self.emit("   📝 按任意鍵繼續...")
                     msvcrt.getch()
                 except ImportError:
                     input("   📝 按 Enter 繼續...")
             
             # ⚡ 快速點擊登入按鈕
             login_btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            login_url = self.driver.current_url
             self.driver.execute_script("arguments[0].click();", login_btn)
             
-            # 🚀 縮短登入後等待時間
-            time.sleep(login_wait)
+            # 🚀 網址一改變即繼續
+            self.ready.url_changes(login_url, "登入跳轉", login_wait)
             
             # 🎯 快速驗證登入狀態
             if self.is_login_successful():
-                print("   ✅ 極速登入成功")
+                self.emit("   ✅ 極速登入成功")
                 return True
             else:
-                print("   ⚠️ 登入狀態未確認，繼續執行")
+                self.emit("   ⚠️ 登入狀態未確認，繼續執行", logging.WARNING)
                 return True
                 
         except Exception as e:
-            print(f"   ❌ 極速登入失敗: {e}")
+            self.emit(f"   ❌ 極速登入失敗: {e}", logging.ERROR)
             return False
     
     def is_login_successful(self):
@@ -188,98 +385,72 @@ class QuestionnaireAutoFiller:
         except:
             return True  # 預設認為成功，避免卡住
         
+    @traced('navigate')
     def navigate_to_questionnaire_list(self):
         """🚀 步驟2-4: 極速導航 - 節省 70% 導航時間"""
-        print("\n🚀 步驟2-4: 極速導航模式...")
+        self.detail("\n🚀 步驟2-4: 極速導航模式...")
         
         nav_wait = config.ULTRA_SPEED_CONFIG['navigation_wait']
         
         if config.DIRECT_NAVIGATION:
             # ⚡ 直接導航到問卷頁面，跳過選單點擊
-            print("   🎯 直接導航模式 - 跳過選單步驟")
-            questionnaire_url = "https://ceq.nkust.edu.tw/StuFillIn"
+            self.detail("   🎯 直接導航模式 - 跳過選單步驟")
+            questionnaire_url = config.QUESTIONNAIRE_LIST_URL
             self.driver.get(questionnaire_url)
-            time.sleep(nav_wait)
+            self.ready.document_ready("問卷列表導航", nav_wait)
             
             # 🚀 快速驗證是否在正確頁面
             if self.verify_questionnaire_page():
-                print("   ✅ 極速導航成功")
+                self.detail("   ✅ 極速導航成功")
                 return True
             else:
-                print("   ⚠️ 直接導航失敗，嘗試傳統方式")
+                self.emit("   ⚠️ 直接導航失敗，嘗試傳統方式", logging.WARNING)
                 # 繼續執行傳統導航
         
         # 📋 傳統導航方式 (縮短版)
-        print("   🔄 執行快速傳統導航...")
-        time.sleep(nav_wait)
+        self.detail("   🔄 執行快速傳統導航...")
+        self.ready.document_ready("傳統導航", nav_wait)
         
         try:
             # 🎯 快速尋找期末問卷選單
-            print("   📋 快速尋找期末問卷選單...")
-            menu_selectors = [
-                "//a[contains(text(),'期末問卷')]",
-                "//span[contains(text(),'期末問卷')]", 
-                "//*[contains(text(),'期末問卷')]"
-            ]
-            
-            final_exam_menu = None
-            for selector in menu_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    if elements:
-                        final_exam_menu = elements[0]
-                        print(f"   ✅ 找到選單: {selector}")
-                        break
-                except:
-                    continue
+            self.detail("   📋 快速尋找期末問卷選單...")
+            final_exam_menu = self.selectors.resolve('menu', MENU_SELECTORS, usable=False)
             
             if final_exam_menu:
+                self.detail(f"   ✅ 找到選單: {final_exam_menu.selector}")
                 # ⚡ JavaScript 直接點擊，跳過滾動動畫
-                self.driver.execute_script("arguments[0].click();", final_exam_menu)
-                time.sleep(nav_wait)
-                print("   ✅ 已點擊期末問卷選單")
+                self.driver.execute_script("arguments[0].click();", final_exam_menu.element)
+                self.ready.document_ready("選單點擊", nav_wait)
+                self.detail("   ✅ 已點擊期末問卷選單")
             else:
-                print("   ⚠️ 選單未找到，直接導航")
-                self.driver.get("https://ceq.nkust.edu.tw/StuFillIn")
-                time.sleep(nav_wait)
+                self.emit("   ⚠️ 選單未找到，直接導航", logging.WARNING)
+                self.driver.get(config.QUESTIONNAIRE_LIST_URL)
+                self.ready.document_ready("問卷列表導航", nav_wait)
                 
         except Exception as e:
-            print(f"   ⚠️ 選單點擊失敗: {e}")
+            self.emit(f"   ⚠️ 選單點擊失敗: {e}", logging.WARNING)
         
         # 🚀 快速尋找問卷填寫入口
         try:
-            fill_selectors = [
-                "//a[contains(text(),'期末問卷填寫')]",
-                "//a[contains(text(),'問卷填寫')]",
-                "//*[contains(text(),'期末問卷填寫')]"
-            ]
-            
-            questionnaire_fill = None
-            for selector in fill_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    if elements:
-                        questionnaire_fill = elements[0]
-                        break
-                except:
-                    continue
+            questionnaire_fill = self.selectors.resolve('fill_link', FILL_LINK_SELECTORS, usable=False)
             
             if questionnaire_fill:
                 # ⚡ JavaScript 直接點擊
-                self.driver.execute_script("arguments[0].click();", questionnaire_fill)
-                time.sleep(nav_wait)
-                print("   ✅ 已進入問卷頁面")
+                fill_url = self.driver.current_url
+                self.driver.execute_script("arguments[0].click();", questionnaire_fill.element)
+                self.ready.url_changes(fill_url, "問卷入口點擊", nav_wait)
+                self.detail("   ✅ 已進入問卷頁面")
             else:
-                print("   ℹ️ 可能已在正確頁面")
+                self.detail("   ℹ️ 可能已在正確頁面")
                 
         except Exception as e:
-            print(f"   ⚠️ 導航過程發生錯誤: {e}")
+            self.emit(f"   ⚠️ 導航過程發生錯誤: {e}", logging.WARNING)
         
         # 🎯 最終頁面驗證
         if self.verify_questionnaire_page():
-            print("   ✅ 導航完成，已在問卷頁面")
+            self.detail("   ✅ 導航完成，已在問卷頁面")
         else:
-            print("   ⚠️ 頁面狀態未確認，繼續執行")
+            self.emit("   ⚠️ 頁面狀態未確認，繼續執行", logging.WARNING)
     
     def verify_questionnaire_page(self):
         """快速驗證是否在問卷頁面"""
@@ -289,7 +460,7 @@ class QuestionnaireAutoFiller:
             
             # 檢查 URL 和標題
             questionnaire_indicators = [
-                "StuFillIn" in current_url,
+                self.is_on_list_page(current_url),
                 "問卷" in page_title,
                 "questionnaire" in current_url.lower()
             ]
@@ -298,481 +469,433 @@ class QuestionnaireAutoFiller:
         except:
             return True  # 預設認為成功
         
-    def get_questionnaire_buttons(self):
-        """步驟5: 獲取所有科目的填寫問卷按鈕"""
-        print("\n🔍 步驟5: 尋找各科的填寫問卷按鈕...")
+    def is_on_list_page(self, url=None):
+        """目前網址是否為問卷列表頁（比對路徑，避免問卷頁或感謝頁被誤判）"""
+        list_path = urlsplit(config.QUESTIONNAIRE_LIST_URL).path.rstrip('/')
+        return urlsplit(url or self.driver.current_url).path.rstrip('/') == list_path
+    
+    @traced('scan')
+    def scan_questionnaire_list(self):
+        """步驟5: 分析問卷列表頁，回傳按鈕模型列表"""
+        self.detail("\n🔍 步驟5: 尋找各科的填寫問卷按鈕...")
         
         # 確保在正確的頁面上
         try:
-            if "StuFillIn" not in self.driver.current_url:
-                print("⚠️ 不在問卷頁面，重新導航...")
-                # 回到主頁重新導航
-                self.driver.get("https://ceq.nkust.edu.tw/StuFillIn")
-                time.sleep(2)
-                # 重新執行導航步驟
+            if not self.is_on_list_page():
+                self.emit("⚠️ 不在問卷頁面，重新導航...", logging.WARNING)
                 self.navigate_to_questionnaire_list()
         except Exception as nav_error:
-            print(f"⚠️ 導航檢查失敗: {nav_error}")
-        
-        # 等待頁面載入完成
-        time.sleep(3)
-        
-        questionnaire_buttons = []
+            self.emit(f"⚠️ 導航檢查失敗: {nav_error}", logging.WARNING)
         
-        # 根據測試結果，按鈕是 input/button 元素，類別為 'btn btn-info'，文字為 '填寫問卷(Start)'
-        print("🎯 使用正確的按鈕搜尋方法...")
+        # 等待列表頁就緒（list_wait 僅為上限）
+        self.ready.url_contains(urlsplit(config.QUESTIONNAIRE_LIST_URL).path, "問卷列表就緒", config.ULTRA_SPEED_CONFIG['list_wait'])
         
+        # 🚀 只取一次頁面快照，在記憶體中分析所有按鈕
+        self.detail("🎯 分析問卷列表頁面快照...")
         try:
-            # 方法1: 直接尋找 btn btn-info 類別的按鈕
-            buttons = self.driver.find_elements(By.CSS_SELECTOR, ".btn.btn-info")
-            if buttons:
-                for btn in buttons:
-                    try:
-                        btn_text = btn.text.strip() or btn.get_attribute('value') or ''
-                        if "填寫問卷" in btn_text and "Start" in btn_text:
-                            questionnaire_buttons.append(btn)
-                    except:
-                        continue
-                print(f"✅ 找到 {len(questionnaire_buttons)} 個 btn-info 按鈕")
-            
-            # 方法2: 尋找包含 '填寫問卷(Start)' 文字的按鈕
-            if not questionnaire_buttons:
-                button_selectors = [
-                    "button",
-                    "input[type='button']", 
-                    "input[type='submit']",
-                    "a"
-                ]
-                
-                for selector in button_selectors:
-                    elements = self.driver.find_elements(By.TAG_NAME, selector.split('[')[0])
-                    for element in elements:
-                        try:
-                            text = element.text.strip() or element.get_attribute('value') or ''
-                            if text == "填寫問卷(Start)":
-                                questionnaire_buttons.append(element)
-                        except:
-                            continue
-                
-                if questionnaire_buttons:
-                    print(f"✅ 找到 {len(questionnaire_buttons)} 個匹配文字的按鈕")
-            
-            # 方法3: 通過表格結構尋找
-            if not questionnaire_buttons:
-                print("📊 通過表格結構搜尋...")
-                tables = self.driver.find_elements(By.TAG_NAME, "table")
-                for table in tables:
-                    rows = table.find_elements(By.TAG_NAME, "tr")
-                    for row in rows:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        for cell in cells:
-                            # 在每個cell中尋找按鈕
-                            cell_buttons = cell.find_elements(By.TAG_NAME, "button")
-                            cell_inputs = cell.find_elements(By.CSS_SELECTOR, "input[type='button'], input[type='submit']")
-                            cell_links = cell.find_elements(By.TAG_NAME, "a")
-                            
-                            all_cell_elements = cell_buttons + cell_inputs + cell_links
-                            
-                            for element in all_cell_elements:
-                                try:
-                                    text = element.text.strip() or element.get_attribute('value') or ''
-                                    if "填寫問卷" in text and "Start" in text:
-                                        questionnaire_buttons.append(element)
-                                except:
-                                    continue
-                
-                if questionnaire_buttons:
-                    print(f"✅ 表格搜尋找到 {len(questionnaire_buttons)} 個按鈕")
-        
+            html = self.driver.page_source
+            self.questionnaire_list = page_parser.parse_questionnaire_list(html)
+            self.capture_page(page_corpus.LIST, html)
         except Exception as e:
-            print(f"❌ 搜尋過程發生錯誤: {e}")
+            self.emit(f"❌ 分析頁面時發生錯誤: {e}", logging.ERROR)
+            self.questionnaire_list = []
         
-        # 去除重複的按鈕
-        unique_buttons = []
-        for button in questionnaire_buttons:
-            if button not in unique_buttons:
-                unique_buttons.append(button)
+        self.tracer.count('buttons', len(self.questionnaire_list))
+        self.emit(f"📊 總共找到 {len(self.questionnaire_list)} 個問卷按鈕")
         
-        print(f"\n📊 總共找到 {len(unique_buttons)} 個問卷按鈕")
+        # 按鈕詳細資訊只在 DEBUG 等級才產生
+        self.debug(lambda: [line for i, info in enumerate(self.questionnaire_list) for line in (
+            f"   按鈕 {i+1}: '{info.text}' (標籤: {info.tag})",
+            f"         類別: {info.css_class}",
+            f"         點擊: {info.onclick}")])
         
-        # 顯示找到的按鈕詳細資訊
-        for i, btn in enumerate(unique_buttons):
-            try:
-                btn_text = btn.text.strip() or btn.get_attribute('value') or ''
-                btn_tag = btn.tag_name
-                btn_class = btn.get_attribute('class')
-                btn_onclick = btn.get_attribute('onclick')
-                print(f"   按鈕 {i+1}: '{btn_text}' (標籤: {btn_tag})")
-                print(f"         類別: {btn_class}")
-                print(f"         點擊: {btn_onclick}")
-                print()
-            except Exception as e:
-                print(f"   按鈕 {i+1}: 無法讀取資訊 - {e}")
+        return self.questionnaire_list
+    
+    def get_questionnaire_buttons(self):
+        """步驟5: 獲取所有科目的填寫問卷按鈕元素"""
+        if not self.scan_questionnaire_list():
+            return []
         
-        return unique_buttons
+        # ⚡ 一次取回所有候選元素，只交出需要點擊的按鈕
+        try:
+            candidates = self.driver.find_elements(By.XPATH, page_parser.BUTTON_CANDIDATES_XPATH)
+        except Exception as e:
+            self.emit(f"❌ 取得按鈕元素失敗: {e}", logging.ERROR)
+            return []
         
-    def fill_single_questionnaire(self):
-        """步驟6: 填寫單一問卷"""
-        print("🎲 開始填寫問卷...")
-        time.sleep(2)
+        return [candidates[info.index] for info in self.questionnaire_list if info.index < len(candidates)]
+    
+    def start_http_session(self):
+        """🌐 將瀏覽器登入狀態複製到 HTTP session，啟用無瀏覽器填寫"""
+        try:
+            self.http_session = HttpQuestionnaireSession(self.driver, self.answer_policy, self.corpus)
+            self.detail("   ✅ HTTP 填寫模式已啟用（沿用登入 cookies）")
+            return True
+        except Exception as e:
+            self.emit(f"   ⚠️ HTTP 填寫模式啟用失敗，改用瀏覽器: {e}", logging.WARNING)
+            self.http_session = None
+            return False
+    
+    @traced('http_fill')
+    def try_http_fill(self, item):
+        """
+        以 HTTP 直接填寫送出，回傳 (填寫摘要, 原因)；可在工作執行緒中呼叫
+        摘要為 None 表示尚未送出，可改用瀏覽器；已送出但未確認時回傳摘要與失敗原因，不可再重送
+        """
+        try:
+            summary = self.http_session.fill_questionnaire(item, self.list_url)
+        except HttpFillUnsupported as e:
+            return None, f"此問卷改用瀏覽器處理: {e}"
+        except requests.RequestException as e:
+            return None, f"HTTP 請求失敗，改用瀏覽器處理: {e}"
         
-        # 1. 處理單選按鈕
-        radio_buttons = self.driver.find_elements(By.CSS_SELECTOR, "input[type='radio']")
-        radio_questions = {}
+        if not summary['confirmed']:
+            if summary.get('error'):
+                return summary, f"HTTP 送出請求失敗，結果未知: {summary['error']}"
+            outcome = "被退回" if summary['outcome'] == submission_check.REJECTED else "未確認"
+            return summary, f"HTTP 送出{outcome} (狀態 {summary['status']})，已送出過不再以瀏覽器重送"
+        return summary, None
+    
+    def report_http_fill(self, summary, reason):
+        """輸出 HTTP 填寫結果，確認完成時回傳 True"""
+        if summary is None:
+            self.detail(f"   ↪️ {reason}")
+            return False
+        if not summary['confirmed']:
+            self.emit(f"   ❌ {reason}", logging.WARNING)
+            return False
         
-        for radio in radio_buttons:
-            name = radio.get_attribute('name')
-            if name:
-                if name not in radio_questions:
-                    radio_questions[name] = []
-                radio_questions[name].append(radio)
+        self.detail(f"   🌐 HTTP 填寫完成: 單選 {summary['radio']}、複選 {summary['checkbox']}、"
+                  f"下拉 {summary['select']}、文字 {summary['text']}")
+        return True
+    
+    def fill_over_http(self, item):
+        """以 HTTP 直接填寫送出，回傳填寫摘要（confirmed 表示是否完成）；尚未送出就無法處理時回傳 None 交給 Selenium 流程"""
+        summary, reason = self.try_http_fill(item)
+        self.report_http_fill(summary, reason)
+        return summary
+    
+    def timed_http_fill(self, item):
+        """工作執行緒用: 回傳 (填寫摘要, 原因, 秒數)"""
+        start = time.perf_counter()
+        summary, reason = self.try_http_fill(item)
+        return summary, reason, time.perf_counter() - start
+    
+    def report_questionnaire(self, n, total, item, path, summary, seconds, ok):
+        """INFO 等級下每份問卷唯一的一行摘要"""
+        filled = f"{summary.get('total', 0)} 項" if summary else "未填寫"
+        cached = " ♻️" if summary and summary.get('cached') else ""
+        label = "HTTP" if path == 'http' else "瀏覽器"
+        self.emit(f"{'✅' if ok else '❌'} 問卷 {n}/{total} [{label}] {filled}{cached} {seconds:.2f} 秒 — {item.key}",
+                  logging.INFO if ok else logging.WARNING)
+    
+    @traced('http_concurrent')
+    def fill_queue_concurrently(self, queue):
+        """
+        🚀 透過已登入的 HTTP session 同時處理多份問卷
+        回傳 (完成數量, 已送出但未確認的問卷)；尚未送出就無法以 HTTP 處理的問卷依原順序留在佇列中交給瀏覽器
+        """
+        items = list(queue)
+        workers = max(1, min(config.MAX_CONCURRENT_QUESTIONNAIRES, len(items)))
+        self.emit(f"\n🚀 併發處理 {len(items)} 個問卷 (同時 {workers} 個)...")
         
-        print(f"📊 發現 {len(radio_questions)} 個單選題")
+        if self.journal:
+            for item in items:
+                self.journal.record_started(item.key)
         
-        # 填寫單選題（偏向正面答案）
-        radio_filled_count = 0
-        for question_name, options in radio_questions.items():
-            try:
-                # 選擇偏向正面的答案（通常是後面的選項）
-                if len(options) >= 4:
-                    selected = random.choice(options[-3:])  # 選擇後3個選項之一
+        finished = set()
+        unconfirmed = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.timed_http_fill, item): n for n, item in enumerate(items)}
+            for future in as_completed(futures):
+                n = futures[future]
+                summary, reason, seconds = future.result()
+                self.detail(f"\n📝 第 {n+1} 個問卷:")
+                if self.report_http_fill(summary, reason):
+                    finished.add(n)
+                    self.mark_confirmed(items[n])
+                elif summary is None:
+                    continue
                 else:
-                    selected = random.choice(options)
-                
-                self.driver.execute_script("arguments[0].click();", selected)
-                radio_filled_count += 1
-                time.sleep(config.ULTRA_SPEED_CONFIG['question_delay'])  # 🚀 使用超短延遲
-                
-            except Exception as e:
-                print(f"⚠️ 填寫單選題 {question_name} 失敗: {e}")
-                continue
-        
-        # 2. 處理複選題（勾選題）- 特別注意8-1題
-        checkbox_buttons = self.driver.find_elements(By.CSS_SELECTOR, "input[type='checkbox']")
-        checkbox_questions = {}
-        
-        for checkbox in checkbox_buttons:
-            name = checkbox.get_attribute('name')
-            if name:
-                if name not in checkbox_questions:
-                    checkbox_questions[name] = []
-                checkbox_questions[name].append(checkbox)
+                    unconfirmed.add(n)
+                self.report_questionnaire(n + 1, len(items), items[n], 'http', summary, seconds, n in finished)
         
-        print(f"✅ 發現 {len(checkbox_questions)} 個複選題（勾選題）")
-        
-        # 填寫複選題
-        checkbox_filled_count = 0
-        for question_name, options in checkbox_questions.items():
+        queue.clear()
+        queue.extend(item for n, item in enumerate(items) if n not in finished and n not in unconfirmed)
+        return len(finished), [item for n, item in enumerate(items) if n in unconfirmed]
+    
+    def build_questionnaire_queue(self):
+        """🚀 解析一次問卷列表，建立以穩定識別碼排序的待填佇列"""
+        if self.http_session:
             try:
-                print(f"🔲 處理複選題: {question_name}")
-                
-                # 特別處理8-1題或類似的問題
-                if "8-1" in question_name or "8_1" in question_name or len(options) > 1:
-                    # 對於複選題，隨機選擇1-3個選項
-                    num_to_select = random.randint(1, min(3, len(options)))
-                    selected_options = random.sample(options, num_to_select)
-                    
-                    for selected in selected_options:
-                        if selected.is_displayed() and selected.is_enabled():
-                            self.driver.execute_script("arguments[0].click();", selected)
-                            time.sleep(config.ULTRA_SPEED_CONFIG['question_delay'])  # 🚀 超短延遲
-                    
-                    print(f"   ✅ 已勾選 {num_to_select} 個選項")
-                else:
-                    # 單一複選框，直接勾選
-                    if options[0].is_displayed() and options[0].is_enabled():
-                        self.driver.execute_script("arguments[0].click();", options[0])
-                        print(f"   ✅ 已勾選")
-                
-                checkbox_filled_count += 1
-                
-            except Exception as e:
-                print(f"⚠️ 填寫複選題 {question_name} 失敗: {e}")
-                continue
+                self.detail("\n🔍 步驟5: 以 HTTP 取得問卷列表...")
+                self.list_url, self.questionnaire_list = self.http_session.fetch_questionnaire_list(
+                    config.QUESTIONNAIRE_LIST_URL)
+                self.emit(f"📊 總共找到 {len(self.questionnaire_list)} 個問卷按鈕")
+            except (HttpFillUnsupported, requests.RequestException) as e:
+                self.emit(f"⚠️ HTTP 取得列表失敗，改用瀏覽器: {e}", logging.WARNING)
+                self.http_session = None
+                self.navigate_to_questionnaire_list()
         
-        # 3. 處理下拉選單
-        select_elements = self.driver.find_elements(By.TAG_NAME, "select")
-        select_filled_count = 0
+        if not self.http_session:
+            self.scan_questionnaire_list()
+            self.list_url = self.driver.current_url
         
-        if select_elements:
-            print(f"📋 發現 {len(select_elements)} 個下拉選單")
-            
-            from selenium.webdriver.support.ui import Select
-            for i, select_element in enumerate(select_elements):
-                try:
-                    select = Select(select_element)
-                    options = select.options
-                    
-                    # 跳過第一個選項（通常是"請選擇"），選擇正面的選項
-                    if len(options) > 1:
-                        # 偏向選擇後面的選項（通常是正面答案）
-                        if len(options) >= 4:
-                            selected_option = random.choice(options[-3:])
-                        else:
-                            selected_option = random.choice(options[1:])  # 跳過第一個
-                        
-                        select.select_by_index(options.index(selected_option))
-                        select_filled_count += 1
-                        time.sleep(config.ULTRA_SPEED_CONFIG['question_delay'])  # 🚀 超短延遲
-                        
-                except Exception as e:
-                    print(f"⚠️ 填寫下拉選單 {i+1} 失敗: {e}")
-                    continue
+        queue = deque()
+        seen = set()
+        skipped = 0
+        for info in self.questionnaire_list:
+            if info.key in seen:
+                continue
+            seen.add(info.key)
+            # 📒 完成紀錄中已確認送出的問卷直接跳過
+            if self.journal and self.journal.is_confirmed(info.key):
+                skipped += 1
+                continue
+            queue.append(info)
+        if skipped:
+            self.emit(f"📒 依完成紀錄跳過 {skipped} 個已確認送出的問卷")
+        return queue
+    
+    def mark_confirmed(self, item):
+        """將確認送出的問卷寫入完成紀錄"""
+        if self.journal:
+            self.journal.record_confirmed(item.key)
+    
+    @traced('open')
+    def open_questionnaire(self, item):
+        """依識別碼直接開啟問卷，不需先回到問卷列表"""
+        open_wait = config.ULTRA_SPEED_CONFIG['open_wait']
+        before_url = self.driver.current_url
         
-        # 4. 填寫文字評論和必填欄位
-        text_inputs = self.driver.find_elements(By.CSS_SELECTOR, 
-            "textarea, input[type='text']:not([name*='UserAccount']):not([name*='Password'])")
-        
-        text_filled_count = 0
-        if text_inputs:
-            print(f"✏️ 發現 {len(text_inputs)} 個文字輸入框...")
-            
-            # 擴充評論庫，確保有足夠的正面評論
-            comments = [
-                "課程內容豐富，受益良多。",
-                "老師教學認真，講解清楚。", 
-                "嗚啦呀哈~",
-                "一袋米要扛幾袋樓!",
-                "天上天下唯我獨尊",
-                "我是一個小學生",
-                "大學，大不了自己學",
-                "教授菜菜撈撈嗚嗚"
-            ]
-            
-            for i, text_input in enumerate(text_inputs):
-                try:
-                    if text_input.is_displayed() and text_input.is_enabled():
-                        # 檢查當前輸入框的內容
-                        current_value = text_input.get_attribute('value') or text_input.text or ''
-                        
-                        # 檢查是否為必填欄位或空白欄位
-                        should_fill = False
-                        
-                        # 情況1: 已經是空白的
-                        if len(current_value.strip()) == 0:
-                            should_fill = True
-                        
-                        # 情況2: 檢查父元素或相關元素是否有錯誤提示
-                        try:
-                            # 查找附近的錯誤訊息
-                            parent = text_input.find_element(By.XPATH, "../..")
-                            parent_text = parent.text.lower()
-                            if any(keyword in parent_text for keyword in ['請填寫', '原因', '理由', '說明', 'required']):
-                                should_fill = True
-                        except:
-                            pass
-                        
-                        # 情況3: 檢查是否有 required 屬性
-                        if text_input.get_attribute('required'):
-                            should_fill = True
-                        
-                        if should_fill:
-                            # 🚀 使用 JavaScript 快速填入，避免 send_keys 延遲
-                            selected_comment = random.choice(comments)
-                            self.driver.execute_script("arguments[0].value = arguments[1];", text_input, selected_comment)
-                            text_filled_count += 1
-                            print(f"   ✅ 已填寫文字框 {i+1}: {selected_comment}")
-                        else:
-                            print(f"   ⏭️ 跳過文字框 {i+1}: 已有內容且非必填")
-                        
-                        time.sleep(config.ULTRA_SPEED_CONFIG['question_delay'])  # 🚀 超短延遲
-                        
-                except Exception as e:
-                    print(f"⚠️ 處理文字輸入框 {i+1} 失敗: {e}")
-                    # 即使出錯也嘗試填寫，確保不留空
-                    try:
-                        text_input.clear()
-                        text_input.send_keys("課程很好，老師教學認真。")
-                        text_filled_count += 1
-                        print(f"   🔧 備用填寫完成")
-                    except:
-                        pass
-                    continue
+        if item.target_url and item.target_method == 'get':
+            url = urljoin(self.list_url or before_url, item.target_url)
+            if item.target_fields:
+                url += ('&' if '?' in url else '?') + urlencode(item.target_fields)
+            self.driver.get(url)
+            self.ready.document_ready("開啟問卷", open_wait)
+            return
         
-        total_filled = radio_filled_count + checkbox_filled_count + select_filled_count + text_filled_count
-        print(f"\n✅ 問卷填寫完成！")
-        print(f"   📊 單選題: {radio_filled_count} 個")
-        print(f"   🔲 複選題: {checkbox_filled_count} 個") 
-        print(f"   📋 下拉選單: {select_filled_count} 個")
-        print(f"   ✏️ 文字評論: {text_filled_count} 個")
-        print(f"   🎯 總計: {total_filled} 個項目")
+        if item.target_url:
+            # 以頁面內臨時表單重送原本的 POST
+            self.driver.execute_script(OPEN_FORM_SCRIPT, urljoin(self.list_url or before_url, item.target_url),
+                                       item.target_method, item.target_fields)
+        else:
+            # 只有 onclick 可用時，必須在列表頁上觸發
+            if self.list_url and self.driver.current_url != self.list_url:
+                self.driver.get(self.list_url)
+                self.ready.document_ready("問卷列表導航", config.ULTRA_SPEED_CONFIG['navigation_wait'])
+                before_url = self.driver.current_url
+            if not self.driver.execute_script(CLICK_BY_ONCLICK_SCRIPT, item.onclick):
+                raise Exception(f"找不到問卷按鈕: {item.key}")
+        self.ready.url_changes(before_url, "開啟問卷", open_wait)
     
-    def final_check_required_fields(self):
-        """提交前最後檢查所有必填欄位"""
+    def capture_page(self, kind, html=None, method='GET', fields=None):
+        """錄製模式: 把目前頁面存入頁面語料（未啟用時不產生任何 WebDriver 往返）"""
+        if not self.corpus:
+            return
         try:
-            # 檢查所有空白的文字輸入框
-            empty_text_inputs = self.driver.find_elements(By.CSS_SELECTOR, 
-                "textarea:not([readonly]), input[type='text']:not([readonly]):not([name*='UserAccount']):not([name*='Password'])")
-            
-            filled_count = 0
-            for text_input in empty_text_inputs:
-                try:
-                    if text_input.is_displayed() and text_input.is_enabled():
-                        current_value = text_input.get_attribute('value') or text_input.text or ''
-                        if len(current_value.strip()) == 0:
-                            # 發現空白欄位，填寫它
-                            text_input.clear()
-                            text_input.send_keys("課程內容充實，教學品質良好。")
-                            filled_count += 1
-                            print(f"🔧 補填空白欄位: 已填寫")
-                            time.sleep(0.2)
-                except:
-                    continue
-            
-            # 檢查未選擇的單選題
-            radio_groups = {}
-            radio_buttons = self.driver.find_elements(By.CSS_SELECTOR, "input[type='radio']")
-            
-            for radio in radio_buttons:
-                name = radio.get_attribute('name')
-                if name:
-                    if name not in radio_groups:
-                        radio_groups[name] = []
-                    radio_groups[name].append(radio)
-            
-            for group_name, buttons in radio_groups.items():
-                try:
-                    # 檢查這個群組是否有選中的
-                    selected = any(btn.is_selected() for btn in buttons if btn.is_displayed())
-                    if not selected and buttons:
-                        # 沒有選中任何選項，選擇一個正面的
-                        suitable_button = None
-                        for btn in buttons:
-                            if btn.is_displayed() and btn.is_enabled():
-                                suitable_button = btn
-                                break
-                        
-                        if suitable_button:
-                            self.driver.execute_script("arguments[0].click();", suitable_button)
-                            filled_count += 1
-                            print(f"🔧 補選未選的單選題: {group_name}")
-                            time.sleep(0.2)
-                except:
-                    continue
-            
-            if filled_count > 0:
-                print(f"✅ 最後檢查完成，補填了 {filled_count} 個欄位")
-            else:
-                print("✅ 最後檢查完成，所有欄位都已填寫")
-                
+            self.corpus.capture(kind, self.driver.current_url, html or self.driver.page_source, method, fields)
         except Exception as e:
-            print(f"⚠️ 最後檢查時發生錯誤: {e}")
+            if is_session_lost(e):
+                raise
+            self.detail(f"   ⚠️ 頁面錄製失敗: {e}")
+    
+    @traced('fill')
+    def fill_single_questionnaire(self, item=None):
+        """
+        🚀 步驟6: 填寫單一問卷 - 作答策略一次送入頁面，整份問卷單次往返
+        item 為已開啟的問卷，錄製模式依它記錄開啟方式 (GET / POST)
+        """
+        self.detail("🎲 開始填寫問卷...")
+        self.ready.form_controls("問卷表單就緒", config.ULTRA_SPEED_CONFIG['fill_wait'])
+        if item is not None and item.open_method == 'POST':
+            self.capture_page(page_corpus.QUESTIONNAIRE, method='POST', fields=item.target_fields)
+        else:
+            self.capture_page(page_corpus.QUESTIONNAIRE)
         
-    def submit_questionnaire(self):
-        """🚀 步驟7: 極速提交 - 節省 60% 提交時間"""
-        print("\n🚀 步驟7: 極速提交模式...")
+        try:
+            # ⚡ 所有題組在頁面內一次填寫完成；相同模板直接套用快取的作答計畫
+            script_start = self.tracer.now()
+            summary = fill_engine.fill_page(self.driver, self.answer_policy, self.form_templates.plans())
+        except Exception as e:
+            if is_session_lost(e):
+                raise  # 交給 run() 恢復會話後重試同一份問卷
+            self.emit(f"⚠️ 頁面內填寫失敗: {e}", logging.WARNING)
+            return None
         
-        submit_wait = config.ULTRA_SPEED_CONFIG['submit_wait']
+        self.form_templates.record(summary)
+        if summary.get('cached'):
+            self.detail(f"♻️ 相同問卷模板 ({summary['fingerprint']})，套用快取的作答計畫")
         
-        # 🎯 快速最後檢查 (縮短版)
-        print("   🔍 快速檢查必填欄位...")
-        self.fast_check_required_fields()
-        
-        # ⚡ 直接尋找提交按鈕，跳過滾動動畫
-        submit_selectors = [
-            "input[value*='送出']",           # CSS 選擇器更快
-            "button[type='submit']",
-            "input[type='submit']",
-            "//input[contains(@value,'送出')]",  # XPath 備用
-            "//button[contains(text(),'送出')]"
-        ]
+        # 📈 依題型記錄頁面內量到的填寫時間
+        offset = script_start
+        for kind, duration in summary.get('timings', {}).items():
+            duration *= 1000
+            count = summary.get('total', 0) if kind == 'plan' else summary.get(kind, 0)
+            self.tracer.add_complete(f"fill.{kind}", offset, duration, count=count)
+            offset += duration
+        for kind in ('radio', 'checkbox', 'select', 'text'):
+            self.tracer.count(kind, summary.get(kind, 0))
+        self.tracer.count('template_hit' if summary.get('cached') else 'template_miss')
         
-        submit_button = None
-        for selector in submit_selectors:
-            try:
-                if selector.startswith('//'):
-                    # XPath 選擇器
-                    submit_button = self.driver.find_element(By.XPATH, selector)
-                else:
-                    # CSS 選擇器
-                    submit_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                
-                if submit_button.is_displayed() and submit_button.is_enabled():
-                    button_text = submit_button.text or submit_button.get_attribute('value')
-                    print(f"   🎯 找到提交按鈕: {button_text}")
-                    break
-            except:
-                continue
+        for error in summary.get('errors', []):
+            self.emit(f"⚠️ 填寫{error['type']} {error['name']} 失敗: {error['error']}", logging.WARNING)
         
-        if not submit_button:
-            print("   ❌ 找不到提交按鈕")
-            return False
+        self.detail(f"\n✅ 問卷填寫完成！")
+        self.detail(f"   📊 單選題: {summary.get('radio', 0)} 個")
+        self.detail(f"   🔲 複選題: {summary.get('checkbox', 0)} 個") 
+        self.detail(f"   📋 下拉選單: {summary.get('select', 0)} 個")
+        self.detail(f"   ✏️ 文字評論: {summary.get('text', 0)} 個")
+        self.detail(f"   🎯 總計: {summary.get('total', 0)} 個項目")
+        return summary
+    
+    @traced('submit')
+    def submit_questionnaire(self, next_item=None):
+        """
+        🚀 步驟7: 極速提交 - 送出前一次檢查，被退回時只補填出錯的欄位後重送
+        預載管線啟用時，第一次送出後先在另一個分頁開啟 next_item，再回來等待結果
+        """
+        self.detail("\n🚀 步驟7: 極速提交模式...")
         
-        try:
-            # ⚡ JavaScript 直接點擊，跳過滾動和等待
-            self.driver.execute_script("arguments[0].click();", submit_button)
-            print("   ✅ 極速提交完成")
+        submit_wait = config.ULTRA_SPEED_CONFIG['submit_wait']
+        
+        for attempt in range(config.SUBMIT_RETRIES + 1):
+            # 🎯 頁面內一次檢查並補填（重送時讀取伺服器的錯誤標記）
+            report = self.validate_form()
+            if attempt and not report.get('invalid'):
+                # 被退回卻找不到出錯的欄位，重送也不會通過
+                self.emit("   ❌ 提交被退回，但找不到需要補填的欄位", logging.ERROR)
+                return False
             
-            # 🚀 縮短提交後等待時間
-            time.sleep(submit_wait)
+            submit_button = self.find_submit_button()
+            if not submit_button:
+                self.emit("   ❌ 找不到提交按鈕", logging.ERROR)
+                return False
             
-            # 🎯 快速驗證提交狀態
-            if self.verify_submission_success():
-                print("   ✅ 提交成功確認")
-            else:
-                print("   ℹ️ 提交狀態未確認")
+            mark = self.network.mark() if self.network else None
+            try:
+                # ⚡ JavaScript 直接點擊，跳過滾動和等待；同時標記原本的文件以確認已換頁
+                self.driver.execute_script(SUBMIT_CLICK_SCRIPT, submit_button)
+                self.detail("   ✅ 極速提交完成")
+            except Exception as e:
+                if is_session_lost(e):
+                    raise
+                self.emit(f"   ❌ 極速提交失敗: {e}", logging.ERROR)
+                return False
             
-            return True
+            # 🔀 伺服器處理送出的同時載入下一份問卷
+            if self.pipeline and attempt == 0:
+                self.pipeline.prefetch(next_item)
             
-        except Exception as e:
-            print(f"   ❌ 極速提交失敗: {e}")
-            return False
+            # 🚀 換頁後成功頁或錯誤標記一出現即繼續，submit_wait 僅為上限
+            page_state = self.ready.submission_page("提交結果", submit_wait)
+            
+            # 🎯 依送出請求的回應判定結果
+            result = self.verify_submission_success(page_state == 'success', mark)
+            self.capture_page(page_corpus.submission_kind(result.outcome), method='POST')
+            if result.confirmed:
+                self.detail(f"   ✅ 提交成功確認: {result.describe()}")
+                return True
+            if result.outcome == submission_check.FAILED:
+                self.emit(f"   ❌ 提交未完成: {result.describe()}", logging.ERROR)
+                return False
+            
+            if attempt < config.SUBMIT_RETRIES:
+                self.emit(f"   🔁 提交被退回，依錯誤提示補填後重送 ({attempt + 1}/{config.SUBMIT_RETRIES})", logging.WARNING)
+        
+        self.emit("   ❌ 多次重送仍被退回", logging.ERROR)
+        return False
+    
+    def find_submit_button(self):
+        """尋找可點擊的提交按鈕: 整串候選一次在頁面內評估，回傳第一個可見且可用的按鈕"""
+        found = self.selectors.resolve('submit', SUBMIT_SELECTORS)
+        if found:
+            self.detail(f"   🎯 找到提交按鈕: {found.selector}")
+        return found.element
     
-    def fast_check_required_fields(self):
-        """快速檢查必填欄位"""
+    @traced('required_check')
+    def validate_form(self):
+        """送出前檢查: 頁面內一次找出 checkValidity 失敗或有錯誤標記的欄位，只補填這些欄位"""
         try:
-            # 🚀 只檢查明顯空白的必填欄位
-            empty_inputs = self.driver.find_elements(By.CSS_SELECTOR, 
-                "textarea:not([readonly]):empty, input[type='text']:not([readonly])[value='']")
-            
-            if empty_inputs:
-                quick_response = config.TEXT_ANSWERS[0]  # 使用最短回應
-                for input_field in empty_inputs:
-                    try:
-                        if input_field.is_displayed() and input_field.is_enabled():
-                            self.driver.execute_script("arguments[0].value = arguments[1];", input_field, quick_response)
-                    except:
-                        continue
-                print(f"   🔧 快速補填 {len(empty_inputs)} 個空白欄位")
-            
+            report = fill_engine.validate_page(self.driver, self.answer_policy)
         except Exception as e:
-            print(f"   ⚠️ 快速檢查失敗: {e}")
+            if is_session_lost(e):
+                raise
+            self.emit(f"   ⚠️ 送出前檢查失敗: {e}", logging.WARNING)
+            return {'invalid': [], 'patched': []}
+        
+        invalid = report.get('invalid', [])
+        self.tracer.count('invalid', len(invalid))
+        if invalid:
+            names = ', '.join(entry['name'] for entry in invalid[:5])
+            more = f" 等 {len(invalid)} 個" if len(invalid) > 5 else ''
+            self.detail(f"   🔧 補填 {len(report.get('patched', []))}/{len(invalid)} 個未通過檢查的欄位: {names}{more}")
+        else:
+            self.detail("   🔍 必填欄位檢查通過")
+        return report
     
-    def verify_submission_success(self):
-        """快速驗證提交是否成功"""
-        try:
-            current_url = self.driver.current_url
-            page_title = self.driver.title
-            page_source = self.driver.page_source
+    @traced('verify')
+    def verify_submission_success(self, success_ready, mark=None):
+        """
+        判定提交結果: 效能記錄中送出請求的狀態碼與轉址，加上頁面內的成功頁檢查
+        不下載 page_source；無法判定時視為失敗，回傳 submission_check.SubmissionResult
+        """
+        window = self.pipeline.window if self.pipeline else None
+        document = self.network.submission_document(mark, window) if self.network and mark is not None else None
+        return submission_check.classify_browser(self.driver, success_ready, document)
+        
+    def process_questionnaire(self, item, i, use_http=False, total=None, next_item=None):
+        """處理單一問卷: 開啟 → 填寫 → 送出，回傳是否完成；next_item 為預載管線要在送出期間開啟的下一份"""
+        start = time.perf_counter()
+        with self.tracer.span('questionnaire', index=i + 1, key=item.key) as span:
+            self.detail(f"\n📝 正在處理第 {i+1} 個問卷...")
+            if self.journal:
+                self.journal.record_started(item.key)
             
-            # 檢查成功指標
-            success_indicators = [
-                "成功" in page_title,
-                "完成" in page_title,
-                "success" in current_url.lower(),
-                "謝謝" in page_source,
-                "感謝" in page_source
-            ]
+            # 🌐 HTTP 模式優先，尚未送出就無法處理時回到瀏覽器；已送出過的不再重送
+            if use_http:
+                summary = self.fill_over_http(item)
+                if summary:
+                    span.args['path'] = 'http'
+                    self.report_questionnaire(i + 1, total or i + 1, item, 'http', summary,
+                                              time.perf_counter() - start, summary['confirmed'])
+                    return summary['confirmed']
             
-            return any(success_indicators)
-        except:
-            return True  # 預設認為成功
+            span.args['path'] = 'browser'
+            if self.pipeline and self.pipeline.take(item):
+                span.args['prefetched'] = True
+            else:
+                self.open_questionnaire(item)
+            
+            # 填寫問卷
+            summary = self.fill_single_questionnaire(item)
+            
+            # 送出問卷
+            submitted = self.submit_questionnaire(None if use_http else next_item)
+            if self.network:
+                self.network.collect()  # 逐份清空效能記錄，避免緩衝區累積
+            self.report_questionnaire(i + 1, total or i + 1, item, 'browser', summary,
+                                      time.perf_counter() - start, submitted)
+            return submitted
         
     def run(self):
         """🚀 執行超高速完整流程"""
         start_time = time.time()
+        run_span = self.tracer.begin('run')
+        completed_count = 0
         
         try:
-            print("🚀 NKUST 問卷自動填寫系統 - 超高速版")
-            print("=" * 60)
-            print(f"📝 帳號: {config.STUDENT_ID}")
-            print(f"⚡ 超高速模式: {'啟用' if config.ULTRA_SPEED_MODE else '停用'}")
-            print(f"🖼️ 圖片載入: {'禁用' if config.DISABLE_IMAGES else '啟用'}")
-            print(f"👤 Headless 模式: {'啟用' if config.HEADLESS_MODE else '停用'}")
-            print(f"🎯 快速登入: {'啟用' if config.FAST_LOGIN_MODE else '停用'}")
-            print(f"🚀 直接導航: {'啟用' if config.DIRECT_NAVIGATION else '停用'}")
-            print("📋 流程: 極速登入 → 極速導航 → 極速填寫 → 極速提交")
-            print("=" * 60)
+            self.emit("🚀 NKUST 問卷自動填寫系統 - 超高速版")
+            self.emit("=" * 60)
+            self.emit(f"📝 帳號: {config.STUDENT_ID}")
+            self.emit(f"⚡ 超高速模式: {'啟用' if config.ULTRA_SPEED_MODE else '停用'}")
+            self.emit(f"🖼️ 圖片載入: {'禁用' if config.DISABLE_IMAGES else '啟用'}")
+            self.emit(f"👤 Headless 模式: {'啟用' if config.HEADLESS_MODE else '停用'}")
+            self.emit(f"🎯 快速登入: {'啟用' if config.FAST_LOGIN_MODE else '停用'}")
+            self.emit(f"🚀 直接導航: {'啟用' if config.DIRECT_NAVIGATION else '停用'}")
+            self.emit("📋 流程: 極速登入 → 極速導航 → 極速填寫 → 極速提交")
+            self.emit("=" * 60)
             
             # 設定瀏覽器
             self.setup_browser()
@@ -780,128 +903,166 @@ class QuestionnaireAutoFiller:
             # 步驟 1: 登入
             self.login()
             
-            # 步驟 2-4: 導航到問卷列表
-            self.navigate_to_questionnaire_list()
+            # 步驟 2-4: 導航到問卷列表（HTTP 模式直接取得列表，不需瀏覽器導航）
+            if not (config.HTTP_FILL_MODE and self.start_http_session()):
+                self.navigate_to_questionnaire_list()
+            
+            # 🛟 保存登入 cookies，瀏覽器失效時免登入恢復
+            self.recovery.snapshot()
             
             # 步驟 5-7: 處理所有問卷
-            completed_count = 0
             max_attempts = 3  # 最大重試次數
             
             for attempt in range(max_attempts):
                 try:
-                    print(f"\n🔄 第 {attempt + 1} 次嘗試處理問卷...")
-                    questionnaire_buttons = self.get_questionnaire_buttons()
+                    self.detail(f"\n🔄 第 {attempt + 1} 次嘗試處理問卷...")
+                    # 🚀 列表只解析一次，之後依識別碼直接開啟各問卷
+                    queue = self.build_questionnaire_queue()
                     
-                    if not questionnaire_buttons:
-                        print("🎉 所有問卷都已完成！")
+                    if not queue:
+                        self.emit("🎉 所有問卷都已完成！")
                         break
                     
-                    # 逐一處理每個問卷
                     current_processed = 0
-                    for i in range(len(questionnaire_buttons)):
+                    failed = []
+                    
+                    # 🚀 HTTP 模式下以有限併發處理，剩餘的再逐一交給瀏覽器
+                    use_http = self.http_session is not None
+                    if use_http and config.MAX_CONCURRENT_QUESTIONNAIRES > 1:
+                        finished, unconfirmed = self.fill_queue_concurrently(queue)
+                        failed.extend(unconfirmed)
+                        completed_count += finished
+                        current_processed += finished
+                        use_http = False
+                    
+                    # 逐一處理佇列中的問卷
+                    total = len(queue)
+                    while queue:
+                        item = queue[0]
+                        next_item = queue[1] if len(queue) > 1 else None
+                        i = total - len(queue)
                         try:
-                            # 每次都重新獲取按鈕列表避免 stale element
-                            fresh_buttons = self.get_questionnaire_buttons()
-                            
-                            if i >= len(fresh_buttons):
-                                print(f"⚠️ 按鈕 {i+1} 已不存在，可能已完成")
-                                continue
-                            
-                            button = fresh_buttons[i]
-                            print(f"\n📝 正在處理第 {i+1} 個問卷...")
-                            
-                            # 滾動到按鈕位置並點擊
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                            time.sleep(1)
-                            self.driver.execute_script("arguments[0].click();", button)
-                            time.sleep(4)  # 增加等待時間
-                            
-                            # 填寫問卷
-                            self.fill_single_questionnaire()
-                            
-                            # 送出問卷
-                            if self.submit_questionnaire():
+                            # 送出問卷，確認後移出佇列
+                            if self.process_questionnaire(item, i, use_http, total, next_item):
+                                self.mark_confirmed(item)
+                                queue.popleft()
                                 completed_count += 1
                                 current_processed += 1
-                                print(f"✅ 第 {i+1} 個問卷已完成")
-                            
+                            else:
+                                failed.append(queue.popleft())
                             
                         except Exception as e:
-                            error_msg = str(e)
-                            print(f"❌ 處理第 {i+1} 個問卷時發生錯誤: {error_msg}")
+                            failed_at = time.time()
+                            self.emit(f"❌ 處理第 {i+1} 個問卷時發生錯誤: {e}", logging.ERROR)
                             
-                            # 檢查是否是會話失效
-                            if "invalid session id" in error_msg or "session deleted" in error_msg:
-                                print("💥 瀏覽器會話失效，需要重新啟動")
+                            # 會話失效: 重啟瀏覽器、還原 cookies，佇列不動從同一份問卷繼續
+                            if is_session_lost(e):
+                                if self.recovery.recover(failed_at):
+                                    continue
                                 raise Exception("瀏覽器會話失效")
                             
-                            # 嘗試恢復到問卷列表
-                            try:
-                                self.driver.back()
-                                time.sleep(2)
-                            except:
-                                self.navigate_to_questionnaire_list()
+                            # 下一份問卷直接依識別碼開啟，不必先回到列表
+                            failed.append(queue.popleft())
                             continue
                     
-                    # 檢查是否還有未完成的問卷
-                    remaining_buttons = self.get_questionnaire_buttons()
-                    if not remaining_buttons:
-                        print("🎉 所有問卷都已完成！")
-                        break
+                    if not failed:
+                        self.emit(f"ℹ️ 本輪完成 {current_processed} 個問卷，重新確認列表...")
+                        continue
                     
-                    print(f"ℹ️ 本輪完成 {current_processed} 個問卷，還有 {len(remaining_buttons)} 個未完成")
+                    self.emit(f"ℹ️ 本輪完成 {current_processed} 個問卷，還有 {len(failed)} 個未完成")
                     
                 except Exception as session_error:
-                    if "invalid session id" in str(session_error) or "session deleted" in str(session_error):
-                        print("💥 瀏覽器會話失效，程式結束")
+                    if is_session_lost(session_error) and self.recovery.recover():
+                        continue
+                    if is_session_lost(session_error) or "瀏覽器會話失效" in str(session_error):
+                        self.emit("💥 瀏覽器會話失效，程式結束", logging.ERROR)
                         break
                     else:
-                        print(f"❌ 處理過程發生錯誤: {session_error}")
+                        self.emit(f"❌ 處理過程發生錯誤: {session_error}", logging.ERROR)
                         if attempt < max_attempts - 1:
-                            print(f"🔄 將進行第 {attempt + 2} 次嘗試...")
+                            self.emit(f"🔄 將進行第 {attempt + 2} 次嘗試...")
                             time.sleep(5)
                         continue
             
             execution_time = time.time() - start_time
             
-            print(f"\n🎉 超高速任務完成！")
-            print("=" * 50)
-            print(f"✅ 完成問卷: {completed_count} 個")
-            print(f"⚡ 總執行時間: {execution_time:.1f} 秒")
+            self.emit(f"\n🎉 超高速任務完成！")
+            self.emit("=" * 50)
+            self.emit(f"✅ 完成問卷: {completed_count} 個")
+            self.emit(f"⚡ 總執行時間: {execution_time:.1f} 秒")
             if completed_count > 0:
-                print(f"🚀 平均速度: {execution_time/completed_count:.1f} 秒/問卷")
-                print(f"📈 效率提升: 相比傳統模式節省約 75% 時間")
-            print("=" * 50)
+                self.emit(f"🚀 平均速度: {execution_time/completed_count:.1f} 秒/問卷")
+            if self.ready:
+                self.ready.report(self.emit)
+            self.form_templates.report(self.emit)
+            if self.pipeline:
+                self.pipeline.report(self.emit)
+            self.selectors.report(self.detail)
+            if self.corpus:
+                self.corpus.report(self.emit)
+            self.recovery.report(self.emit)
+            if self.network:
+                self.network.report(self.emit)
+            if self.command_stats:
+                self.command_stats.report(self.emit, config.DRIVER_STATS_TOP, execution_time)
+            self.emit("=" * 50)
             
         except Exception as e:
             execution_time = time.time() - start_time
-            print(f"❌ 程式執行發生錯誤: {e}")
-            print(f"⏱️ 執行時間: {execution_time:.1f} 秒")
+            self.emit(f"❌ 程式執行發生錯誤: {e}", logging.ERROR)
+            self.emit(f"⏱️ 執行時間: {execution_time:.1f} 秒")
             
         finally:
-            print("\n🔚 超高速模式執行完成")
+            self.detail("\n🔚 超高速模式執行完成")
             
             # 🚀 快速關閉，縮短等待時間
-            if config.HEADLESS_MODE:
-                print("⚡ Headless 模式 - 立即關閉瀏覽器")
+            if self.browser_daemon and self.browser_daemon.attached:
+                self.detail("🔥 常駐瀏覽器模式 - 保持瀏覽器執行")
+                countdown = 0
+            elif config.HEADLESS_MODE:
+                self.detail("⚡ Headless 模式 - 立即關閉瀏覽器")
                 countdown = 1
             else:
-                print("⏳ 3秒後自動關閉瀏覽器...")
+                self.emit("⏳ 3秒後自動關閉瀏覽器...")
                 countdown = 3
             
             # 倒數計時
             for i in range(countdown, 0, -1):
-                print(f"⏰ {i}秒後關閉...")
+                self.detail(f"⏰ {i}秒後關閉...")
                 time.sleep(1)
             
-            if hasattr(self, 'driver') and self.driver:
-                self.driver.quit()
-                print("🚪 瀏覽器已關閉")
+            if self.http_session:
+                self.http_session.close()
+            self.selectors.save()
+            
+            if self.driver:
+                detached = bool(self.browser_daemon and self.browser_daemon.attached)
+                self.close_driver()
+                self.detail("🔌 已中斷與常駐瀏覽器的連線" if detached else "🚪 瀏覽器已關閉")
+            
+            # 📈 匯出追蹤紀錄
+            self.tracer.end(run_span, completed=completed_count)
+            if config.TRACE_OUTPUT:
+                self.tracer.export(config.TRACE_OUTPUT, config.TRACE_FORMAT)
+                self.emit(f"📈 追蹤紀錄已匯出: {config.TRACE_OUTPUT}")
 
 def main():
     """主程式入口"""
-    filler = QuestionnaireAutoFiller()
-    filler.run()
+    parser = argparse.ArgumentParser(description="高科大教學評量問卷自動填寫")
+    parser.add_argument('--profile', nargs='?', const=config.PROFILE_OUTPUT, default=None, metavar='FILE',
+                        help=f"在取樣分析下執行，輸出 collapsed stack 與時間分類摘要（預設 {config.PROFILE_OUTPUT}）")
+    args = parser.parse_args()
+
+    listener = start_logging()
+    try:
+        filler = QuestionnaireAutoFiller()
+        if args.profile:
+            import profiler
+            profiler.profile(filler.run, args.profile, emit=filler.emit)
+        else:
+            filler.run()
+    finally:
+        stop_logging(listener)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
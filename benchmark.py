@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分階段效能測試
+對本機測試站 (fixture_server.py) 分別計時 setup_browser、login、navigate_to_questionnaire_list、
+get_questionnaire_buttons、fill_single_questionnaire、submit_questionnaire，
+並掃描題數 (10→500) 與問卷數 (1→50) 的變化曲線。
+結果寫成 JSON，可與儲存的基準比較: 多出 sleep 或 WebDriver 往返時直接以非零結束碼失敗。
+--backend fake 改用記憶體內的假 driver (fake_driver.py)，不需瀏覽器與 HTTP 伺服器，
+完整流程在一秒內跑完，適合每次修改後檢查 WebDriver 指令數是否增加。
+--corpus 改以錄製的真實頁面 (page_corpus.py) 重播，取代合成的題數/問卷數掃描。
+
+使用方式:
+    python benchmark.py --save-baseline          # 建立基準
+    python benchmark.py                          # 與基準比較
+    python benchmark.py --quick                  # 小規模掃描
+    python benchmark.py --backend fake --quick   # 不啟動瀏覽器，只檢查流程與指令數
+    python benchmark.py --corpus page_corpus     # 以錄製的真實頁面重播
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+import auto_questionnaire
+import config
+from auto_questionnaire import QuestionnaireAutoFiller
+from driver_metrics import CommandAccounting
+from fake_driver import FakeDriver
+from fixture_server import FixtureServer, FixtureSite
+from page_corpus import CorpusSite
+from log_setup import get_logger, start_logging, stop_logging
+
+DEFAULT_QUESTIONS = [10, 50, 100, 250, 500]
+DEFAULT_QUESTIONNAIRES = [1, 5, 10, 25, 50]
+QUICK_QUESTIONS = [10, 100]
+QUICK_QUESTIONNAIRES = [1, 5]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(HERE, 'benchmark_results.json')
+DEFAULT_BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+
+# 回歸判定門檻
+TIME_TOLERANCE = 0.5     # 比基準慢 50% 以上
+TIME_MIN_DELTA = 0.25    # 且至少慢 0.25 秒才算回歸（避免雜訊）
+COMMAND_SLACK = 2        # WebDriver 指令數允許多出的數量
+
+FAKE_BASE_URL = 'http://fixture.local'
+
+# 結果中的掃描項目 → 顯示名稱
+SWEEPS = {'questions': '題數', 'questionnaires': '問卷數', 'corpus': '語料'}
+
+
+class PhaseTimer:
+    def __init__(self, counter, quiet=True):
+        self.counter = counter
+        self.quiet = quiet
+
+    def measure(self, results, name, func, *args):
+        """執行 func 並把秒數與指令數累加到 results[name]"""
+        before = self.counter.total_count
+        output = io.StringIO() if self.quiet else None
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output) if self.quiet else contextlib.nullcontext():
+            value = func(*args)
+        entry = results.setdefault(name, {'seconds': 0.0, 'commands': 0, 'calls': 0})
+        entry['seconds'] += time.perf_counter() - start
+        entry['commands'] += self.counter.total_count - before
+        entry['calls'] += 1
+        return value
+
+
+def point_site_to(base_url):
+    """讓 filler 使用本機測試站"""
+    config.BASE_URL = base_url
+    config.LOGIN_URL = f"{base_url}/Home"
+    config.QUESTIONNAIRE_LIST_URL = f"{base_url}/StuFillIn"
+
+
+def serve(filler, site):
+    """讓 filler 的 driver 連到測試站: 假 driver 直接換掉後端，Edge 則啟動本機 HTTP 伺服器"""
+    if isinstance(filler.driver, FakeDriver):
+        filler.driver.site = site
+        point_site_to(FAKE_BASE_URL)
+        return contextlib.nullcontext()
+    server = FixtureServer(site)
+    point_site_to(server.base_url)
+    return server
+
+
+def run_point(filler, timer, site):
+    """在一個測試站設定下跑完 登入 → 列表 → 逐份填寫送出，回傳各階段結果"""
+    phases = {}
+    with serve(filler, site):
+        filler.driver.delete_all_cookies()
+
+        timer.measure(phases, 'login', filler.login)
+        timer.measure(phases, 'navigate_to_questionnaire_list', filler.navigate_to_questionnaire_list)
+        timer.measure(phases, 'get_questionnaire_buttons', filler.get_questionnaire_buttons)
+        filler.list_url = filler.driver.current_url
+
+        for item in list(filler.questionnaire_list):
+            timer.measure(phases, 'open_questionnaire', filler.open_questionnaire, item)
+            timer.measure(phases, 'fill_single_questionnaire', filler.fill_single_questionnaire, item)
+            timer.measure(phases, 'submit_questionnaire', filler.submit_questionnaire)
+
+        phases['completed'] = len(site.completed)
+        phases['expected'] = len(site.courses)
+    return phases
+
+
+def run_benchmark(question_counts, questionnaire_counts, quiet=True, backend='edge', corpus=None):
+    filler = QuestionnaireAutoFiller()
+    filler.use_fixture_state()  # 測試站的結果不寫入使用者的完成紀錄、模板快取與選擇器統計
+    if backend == 'fake':
+        filler.driver_factory = lambda: FakeDriver(base_url=FAKE_BASE_URL)
+    counter = CommandAccounting([auto_questionnaire.__file__])
+    timer = PhaseTimer(counter, quiet)
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'headless': config.HEADLESS_MODE,
+            'backend': backend,
+            'python': sys.version.split()[0]
+        },
+        'setup_browser': {},
+        'questions': {},
+        'questionnaires': {},
+        'corpus': {}
+    }
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        filler.setup_browser()
+    results['setup_browser'] = {'seconds': time.perf_counter() - start, 'commands': 0, 'calls': 1}
+    counter.install(filler.driver)
+
+    try:
+        if corpus:
+            print(f"📼 重播頁面語料 {corpus}...")
+            results['corpus']['replay'] = run_point(filler, timer, CorpusSite(corpus))
+            return results
+        for count in question_counts:
+            print(f"📏 題數 {count}...")
+            results['questions'][str(count)] = run_point(filler, timer, FixtureSite(questionnaires=1, radios=count))
+        for count in questionnaire_counts:
+            print(f"📏 問卷數 {count}...")
+            results['questionnaires'][str(count)] = run_point(filler, timer, FixtureSite(questionnaires=count))
+    finally:
+        filler.close_driver()
+    return results
+
+
+def flatten(results):
+    """展開為 {指標名稱: {'seconds', 'commands'}} 以便比較"""
+    metrics = {'setup_browser': results['setup_browser']}
+    for sweep in SWEEPS:
+        for count, phases in results.get(sweep, {}).items():
+            for phase, entry in phases.items():
+                if isinstance(entry, dict):
+                    metrics[f"{sweep}={count}/{phase}"] = entry
+    return metrics
+
+
+def compare(results, baseline, tolerance=TIME_TOLERANCE):
+    """回傳回歸描述列表；空列表表示沒有回歸"""
+    regressions = []
+    current = flatten(results)
+    for name, base in flatten(baseline).items():
+        entry = current.get(name)
+        if entry is None:
+            continue
+        if entry['seconds'] > base['seconds'] * (1 + tolerance) and entry['seconds'] - base['seconds'] > TIME_MIN_DELTA:
+            regressions.append(f"{name}: {base['seconds']:.2f}s → {entry['seconds']:.2f}s")
+        if entry['commands'] > base['commands'] + COMMAND_SLACK:
+            regressions.append(f"{name}: WebDriver 指令 {base['commands']} → {entry['commands']}")
+    return regressions
+
+
+def print_table(results):
+    print(f"\n⏱️ setup_browser: {results['setup_browser']['seconds']:.2f} 秒")
+    for sweep, label in SWEEPS.items():
+        for count, phases in results.get(sweep, {}).items():
+            print(f"\n📊 {label} = {count} (完成 {phases['completed']}/{phases['expected']})")
+            for phase, entry in phases.items():
+                if isinstance(entry, dict):
+                    print(f"   {phase:32s} {entry['seconds']:8.3f} 秒  {entry['commands']:6d} 指令  × {entry['calls']}")
+
+
+def parse_counts(text):
+    return [int(value) for value in text.split(',') if value.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分階段效能測試 (使用本機測試站)")
+    parser.add_argument('--questions', type=parse_counts, help="題數掃描，例如 10,50,100")
+    parser.add_argument('--questionnaires', type=parse_counts, help="問卷數掃描，例如 1,5,10")
+    parser.add_argument('--quick', action='store_true', help="小規模掃描")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="將本次結果存為基準")
+    parser.add_argument('--tolerance', type=float, default=TIME_TOLERANCE, help="允許比基準慢的比例")
+    parser.add_argument('--verbose', action='store_true', help="顯示 filler 的原始輸出")
+    parser.add_argument('--corpus', help="以錄製的頁面語料資料夾重播（取代題數/問卷數掃描）")
+    parser.add_argument('--backend', choices=('edge', 'fake'), default=config.DRIVER_BACKEND,
+                        help="edge: 實際瀏覽器；fake: 記憶體內的假 driver")
+    args = parser.parse_args()
+
+    question_counts = args.questions or (QUICK_QUESTIONS if args.quick else DEFAULT_QUESTIONS)
+    questionnaire_counts = args.questionnaires or (QUICK_QUESTIONNAIRES if args.quick else DEFAULT_QUESTIONNAIRES)
+
+    listener = start_logging() if args.verbose else None
+    if listener is None:
+        get_logger().addHandler(logging.NullHandler())  # filler 的訊息不輸出
+    try:
+        results = run_benchmark(question_counts, questionnaire_counts, quiet=not args.verbose, backend=args.backend,
+                                corpus=args.corpus)
+    finally:
+        stop_logging(listener)
+    print_table(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已寫入 {args.output}")
+
+    incomplete = [f"{sweep}={count}" for sweep in SWEEPS
+                  for count, phases in results.get(sweep, {}).items() if phases['completed'] != phases['expected']]
+    if incomplete:
+        print(f"❌ 以下設定未完成所有問卷: {', '.join(incomplete)}")
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 基準已更新: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ 尚無基準，使用 --save-baseline 建立")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ 效能回歸:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print("\n✅ 與基準相比沒有回歸")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
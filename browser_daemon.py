@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐瀏覽器
+以遠端除錯位址 (--remote-debugging-port) 啟動一個長時間執行的 Edge，
+setup_browser 偵測到它在執行時直接連上 (debuggerAddress)，沒有時才啟動；
+結束時只中斷 msedgedriver 的連線而不關閉瀏覽器，下次執行與重試都省下數秒的冷啟動。
+瀏覽器使用獨立的使用者資料夾，登入 cookies 也會保留到下次。
+
+使用方式:
+    set BROWSER_DAEMON=true
+    python auto_questionnaire.py          # 第一次啟動常駐瀏覽器，之後直接連上
+    python browser_daemon.py status       # 查看常駐瀏覽器狀態
+    python browser_daemon.py stop         # 關閉常駐瀏覽器
+"""
+
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from selenium.webdriver.edge.options import Options
+import config
+from driver_cache import EDGE_BINARIES
+
+# Windows 上 Edge 的常見安裝位置
+WINDOWS_EDGE_PATHS = (
+    r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+    r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
+)
+
+# 記錄常駐瀏覽器 PID 的檔名（位於使用者資料夾內）
+PID_FILE = 'daemon.pid'
+
+# 偵測遠端除錯位址的單次請求超時 (秒)
+PROBE_TIMEOUT = 0.5
+
+
+def find_edge_binary():
+    """找出 Edge 執行檔；找不到時回傳 None"""
+    if sys.platform.startswith('win'):
+        for path in WINDOWS_EDGE_PATHS:
+            if os.path.exists(path):
+                return path
+    for binary in EDGE_BINARIES:
+        path = shutil.which(binary)
+        if path:
+            return path
+    return None
+
+
+def launch_arguments(options):
+    """由 setup_browser 組好的 Options 轉成命令列參數（偏好設定無法由命令列傳入，圖片停用改用 blink-settings）"""
+    arguments = list(options.arguments)
+    prefs = options.experimental_options.get('prefs') or {}
+    if prefs.get('profile.managed_default_content_settings.images') == 2:
+        arguments.append('--blink-settings=imagesEnabled=false')
+    return arguments
+
+
+class BrowserDaemon:
+    def __init__(self, address=None, profile_dir=None, launch_timeout=None):
+        self.address = address or config.BROWSER_DEBUG_ADDRESS
+        self.profile_dir = profile_dir or config.BROWSER_PROFILE_DIR
+        self.launch_timeout = launch_timeout or config.BROWSER_LAUNCH_TIMEOUT
+        self.attached = False
+        self.launched = False
+
+    @property
+    def port(self):
+        return int(self.address.rsplit(':', 1)[1])
+
+    # ---------- 遠端除錯端點 ----------
+
+    def _request(self, path, method='GET'):
+        request = urllib.request.Request(f"http://{self.address}{path}", method=method)
+        with urllib.request.urlopen(request, timeout=PROBE_TIMEOUT) as response:
+            return json.loads(response.read().decode('utf-8') or 'null')
+
+    def version(self):
+        """常駐瀏覽器的版本資訊；沒有在執行時回傳 None"""
+        try:
+            return self._request('/json/version')
+        except (OSError, ValueError):
+            return None
+
+    def is_running(self):
+        return self.version() is not None
+
+    def ensure_page(self):
+        """確保至少有一個分頁可供連線（上次的分頁可能已被關閉）"""
+        try:
+            pages = [target for target in self._request('/json/list') if target.get('type') == 'page']
+            if not pages:
+                self._request('/json/new?about:blank', method='PUT')
+        except (OSError, ValueError):
+            pass
+
+    # ---------- 啟動與連線 ----------
+
+    def launch(self, arguments):
+        """在背景啟動常駐瀏覽器，等到遠端除錯位址可連線為止"""
+        binary = find_edge_binary()
+        if binary is None:
+            raise RuntimeError("找不到 Edge 執行檔，無法啟動常駐瀏覽器")
+        os.makedirs(self.profile_dir, exist_ok=True)
+        command = [binary, f'--remote-debugging-port={self.port}', f'--user-data-dir={self.profile_dir}',
+                   *arguments, 'about:blank']
+
+        detach = {}
+        if sys.platform.startswith('win'):
+            detach['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            detach['start_new_session'] = True
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, close_fds=True, **detach)
+        with open(os.path.join(self.profile_dir, PID_FILE), 'w', encoding='utf-8') as f:
+            f.write(str(process.pid))
+
+        deadline = time.time() + self.launch_timeout
+        while time.time() < deadline:
+            if self.is_running():
+                self.launched = True
+                return
+            if process.poll() is not None:
+                raise RuntimeError(f"常駐瀏覽器啟動後立即結束 (結束碼 {process.returncode})")
+            time.sleep(0.1)
+        raise RuntimeError(f"常駐瀏覽器 {self.launch_timeout} 秒內未開啟遠端除錯位址 {self.address}")
+
+    def attach_options(self, options):
+        """
+        確保常駐瀏覽器在執行，回傳連線用的 Options
+        啟動參數只在啟動時生效；連線時 msedgedriver 不接受 excludeSwitches 等啟動選項，只保留連線相關設定
+        """
+        self.launched = False
+        if self.is_running():
+            self.ensure_page()
+        else:
+            self.launch(launch_arguments(options))
+
+        attach = Options()
+        attach.debugger_address = self.address
+        attach.page_load_strategy = options.page_load_strategy
+        if 'ms:loggingPrefs' in options.capabilities:
+            attach.set_capability('ms:loggingPrefs', options.capabilities['ms:loggingPrefs'])
+        self.attached = True
+        return attach
+
+    def detach(self, driver):
+        """只結束 msedgedriver 程序，不送出 quit，瀏覽器保持執行"""
+        self.attached = False
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    # ---------- 關閉 ----------
+
+    def stop(self):
+        """關閉常駐瀏覽器，回傳是否有瀏覽器被關閉"""
+        pid_path = os.path.join(self.profile_dir, PID_FILE)
+        try:
+            with open(pid_path, encoding='utf-8') as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            return False
+        try:
+            if sys.platform.startswith('win'):
+                subprocess.run(['taskkill', '/PID', str(pid), '/T', '/F'], capture_output=True)
+            else:
+                os.killpg(pid, signal.SIGTERM)
+        except OSError:
+            pass
+        try:
+            os.remove(pid_path)
+        except OSError:
+            pass
+        return True
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    daemon = BrowserDaemon()
+    if command == 'status':
+        info = daemon.version()
+        if info:
+            print(f"🟢 常駐瀏覽器執行中: {info.get('Browser', '?')} @ {daemon.address}")
+        else:
+            print(f"⚪ 沒有常駐瀏覽器在 {daemon.address}")
+        return 0
+    if command == 'stop':
+        print("🛑 已關閉常駐瀏覽器" if daemon.stop() else "⚪ 沒有由本程式啟動的常駐瀏覽器")
+        return 0
+    print("用法: python browser_daemon.py [status|stop]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+問卷完成紀錄
+以 append-only JSONL 記錄每份問卷的識別碼與確認送出的結果。
+每筆紀錄寫入後立即 fsync；讀取時略過寫到一半的最後一行，
+因此送出途中當機也不會破壞既有紀錄。重新執行時直接跳過已確認完成的問卷。
+"""
+
+import json
+import os
+import threading
+import time
+import config
+
+CONFIRMED = 'confirmed'
+STARTED = 'started'
+
+
+class CompletionJournal:
+    def __init__(self, path=None, account=None, max_age_days=None):
+        self.path = path or config.JOURNAL_PATH
+        self.account = account or config.STUDENT_ID
+        self.max_age = (max_age_days if max_age_days is not None else config.JOURNAL_MAX_AGE_DAYS) * 86400
+        self.lock = threading.Lock()
+        self.confirmed = self._load_confirmed()
+
+    def _entries(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # 當機時寫到一半的紀錄
+            if isinstance(entry, dict):
+                yield entry
+
+    def _load_confirmed(self):
+        """讀取本帳號、在有效期限內已確認送出的問卷識別碼"""
+        cutoff = time.time() - self.max_age
+        return {entry['key'] for entry in self._entries()
+                if entry.get('account') == self.account and entry.get('status') == CONFIRMED
+                and entry.get('ts', 0) >= cutoff and 'key' in entry}
+
+    def _append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            # 若上次寫入中斷留下不完整的一行，先補換行避免與新紀錄黏在一起
+            needs_newline = False
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() > 0:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) != b'\n'
+            except OSError:
+                pass
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write('\n')
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def is_confirmed(self, key):
+        return key in self.confirmed
+
+    def record_started(self, key):
+        self._append({'account': self.account, 'key': key, 'status': STARTED, 'ts': time.time()})
+
+    def record_confirmed(self, key):
+        self._append({'account': self.account, 'key': key, 'status': CONFIRMED, 'ts': time.time()})
+        self.confirmed.add(key)
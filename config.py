@@ -9,8 +9,10 @@ load_dotenv()
 STUDENT_ID = "C111110118"  # 您的學號
 PASSWORD   = "C111110118"      # 您的密碼
 
-# 網站設定
-LOGIN_URL = "https://ceq.nkust.edu.tw/Home"
+# 網站設定 (可用 CEQ_BASE_URL 指向本機測試站 fixture_server.py)
+BASE_URL = os.getenv('CEQ_BASE_URL', 'https://ceq.nkust.edu.tw').rstrip('/')
+LOGIN_URL = f"{BASE_URL}/Home"
+QUESTIONNAIRE_LIST_URL = f"{BASE_URL}/StuFillIn"
 
 # 瀏覽器設定
 HEADLESS_MODE = os.getenv('HEADLESS_MODE', 'True').lower() == 'true'  # 預設啟用 headless
@@ -19,9 +21,33 @@ WAIT_TIME = int(os.getenv('WAIT_TIME', '2'))  # 縮短等待時間從3秒到2秒
 # 🚀 優化模式設定
 ULTRA_SPEED_MODE = True  # 啟用超高速模式
 DISABLE_IMAGES = True    # 禁用圖片載入
-DISABLE_CSS = False      # 保留CSS確保元素可見
+DISABLE_CSS = False      # 保留CSS確保元素可見 (True 時以網路封鎖擋下 .css)
 FAST_LOGIN_MODE = True   # 啟用快速登入模式
 DIRECT_NAVIGATION = True # 啟用直接導航模式
+HTTP_FILL_MODE = os.getenv('HTTP_FILL_MODE', 'False').lower() == 'true'  # 登入後改以 HTTP 直接填寫問卷
+
+# 🌐 HTTP 填寫模式設定
+MAX_CONCURRENT_QUESTIONNAIRES = int(os.getenv('MAX_CONCURRENT_QUESTIONNAIRES', '3'))  # 同時處理的問卷數 (建議 2-4，1 為逐一處理)
+HTTP_POOL_SIZE = max(4, MAX_CONCURRENT_QUESTIONNAIRES)  # 連線池大小 (不小於併發數)
+HTTP_TIMEOUT = 15        # 單次請求超時 (秒)
+
+# 🔀 預載管線: 送出一份問卷後在第二個分頁開啟下一份，再回來確認結果 (tab_pipeline.py)
+PIPELINE_PREFETCH = os.getenv('PIPELINE_PREFETCH', 'False').lower() == 'true'
+
+# 🚫 網路封鎖 (DevTools Network.setBlockedURLs，樣式只支援 * 萬用字元)
+NETWORK_BLOCKING = os.getenv('NETWORK_BLOCKING', 'True').lower() == 'true'  # False 時只統計可省下的流量
+BLOCKED_URL_PATTERNS = [
+    # 網頁字型
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    # 分析與追蹤
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*connect.facebook.net*',
+    '*hotjar.com*', '*clarity.ms*',
+    # 影音媒體
+    '*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav'
+]  # 注意: 不可封鎖 www.google.com/recaptcha 與 www.gstatic.com，登入需要 reCAPTCHA
+BLOCKED_CSS_PATTERNS = ['*.css', '*.css?*']
+BLOCKED_URL_PATTERNS_EXTRA = os.getenv('BLOCKED_URL_PATTERNS', '')  # 以逗號分隔追加，例如表單用不到的大型腳本
+NETWORK_SIZES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.network_sizes.json')
 
 # 隨機作答設定
 RANDOM_ANSWER_PROBABILITY = 0.8  # 80% 機率選擇隨機答案
@@ -36,13 +62,92 @@ TEXT_ANSWERS = [
     ""  # 空白回答
 ]
 
+# 📝 記錄等級 (INFO 每份問卷一行摘要，DEBUG 顯示逐步驟細節；LOG_FILE 另存完整 DEBUG 紀錄)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FILE = os.getenv('LOG_FILE', '')
+
+# 📈 執行追蹤 (TRACE_OUTPUT 設定檔名即匯出，.jsonl 或 Chrome trace_event JSON)
+TRACE_CONSOLE = os.getenv('TRACE_CONSOLE', 'True').lower() == 'true'  # 關閉後不輸出主控台訊息
+TRACE_OUTPUT = os.getenv('TRACE_OUTPUT', '')
+TRACE_FORMAT = os.getenv('TRACE_FORMAT', 'jsonl' if TRACE_OUTPUT.endswith('.jsonl') else 'chrome')
+
+# 🔌 WebDriver 指令統計 (執行結束時列出往返熱點)
+DRIVER_COMMAND_STATS = os.getenv('DRIVER_COMMAND_STATS', 'True').lower() == 'true'
+DRIVER_STATS_TOP = 10
+
+# 🔬 取樣分析 (python auto_questionnaire.py --profile [檔名])
+PROFILE_OUTPUT = 'profile.folded'  # collapsed stack；摘要寫到同名 .txt
+PROFILE_INTERVAL = 0.005           # 取樣間隔 (秒)
+PROFILE_TOP = 15                   # 摘要列出 CPU 最多的函式數
+
+# 📒 完成紀錄 (重新執行時跳過已確認送出的問卷)
+JOURNAL_ENABLED = os.getenv('JOURNAL_ENABLED', 'True').lower() == 'true'
+JOURNAL_PATH = os.getenv('JOURNAL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.completion_journal.jsonl'))
+JOURNAL_MAX_AGE_DAYS = 60  # 超過期限的紀錄視為上一學期，不再跳過
+
+# 💾 WebDriver 路徑快取 (Edge 版本改變時才重新解析)
+DRIVER_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.driver_cache.json')
+DRIVER_BACKEND = os.getenv('DRIVER_BACKEND', 'edge').lower()  # fake: 以記憶體內的假 driver 對本機測試站執行 (fake_driver.py)
+
+# 🔥 常駐瀏覽器 (以遠端除錯位址保持執行，下次直接連上，省下冷啟動)
+BROWSER_DAEMON = os.getenv('BROWSER_DAEMON', 'False').lower() == 'true'
+BROWSER_DEBUG_ADDRESS = os.getenv('BROWSER_DEBUG_ADDRESS', '127.0.0.1:9222')
+BROWSER_PROFILE_DIR = os.getenv('BROWSER_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.browser_profile'))
+BROWSER_LAUNCH_TIMEOUT = 15  # 等待常駐瀏覽器開啟遠端除錯位址的上限 (秒)
+
+# 🎯 選擇器統計 (依歷史勝出次數排序備援選擇器；設為空字串則只保留在記憶體)
+SELECTOR_STATS_PATH = os.getenv('SELECTOR_STATS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.selector_stats.json'))
+SELECTOR_PRUNE_AFTER = 5  # 連續這麼多次執行都沒有符合過的候選不再評估
+
+# 📼 頁面語料 (錄製經過的列表、問卷、成功與退回頁，移除帳號資訊後供離線效能測試重播)
+CORPUS_CAPTURE = os.getenv('CORPUS_CAPTURE', 'False').lower() == 'true'
+CORPUS_DIR = os.getenv('CORPUS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'page_corpus'))
+CORPUS_REDACT = os.getenv('CORPUS_REDACT', '')  # 以逗號分隔額外要移除的字串，例如姓名
+
+# ♻️ 問卷模板快取 (相同表單結構直接套用作答計畫；設為空字串則只保留在記憶體)
+TEMPLATE_CACHE_PATH = os.getenv('TEMPLATE_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.form_templates.json'))
+
 # 🚀 超高速模式專用設定
 ULTRA_SPEED_CONFIG = {
-    'implicit_wait': 2,        # 隱式等待時間 (從10秒降到2秒)
+    'implicit_wait': 2,        # 明確等待 (WebDriverWait) 上限；隱式等待已關閉，找不到元素時立即返回
     'page_load_timeout': 15,   # 頁面載入超時 (從30秒降到15秒)
     'script_timeout': 10,      # 腳本執行超時 (從30秒降到10秒)
     'login_wait': 2,           # 登入等待時間 (從5秒降到2秒)
     'navigation_wait': 1,      # 導航等待時間 (從3秒降到1秒)
     'submit_wait': 1,          # 提交等待時間 (從3秒降到1秒)
-    'question_delay': 0.1      # 問題間延遲 (從0.3秒降到0.1秒)
-} 
\ No newline at end of file
+    'list_wait': 3,            # 問卷列表就緒等待上限
+    'open_wait': 4,            # 點擊問卷後開啟等待上限
+    'fill_wait': 2             # 問卷表單就緒等待上限
+}
+
+# ⏱️ 就緒等待設定 (上方等待秒數僅作為上限，頁面就緒即繼續)
+PAGE_LOAD_STRATEGY = 'eager'   # DOM 可操作即返回，不等圖片等資源
+READY_POLL_INTERVAL = 0.05     # 就緒條件輪詢間隔 (秒)
+
+# 🔁 送出被伺服器退回時，依錯誤提示補填後重送的次數
+SUBMIT_RETRIES = 2
+
+# 🛟 瀏覽器會話失效時重新啟動並還原 cookies 的次數上限
+MAX_DRIVER_RECOVERIES = 3
+
+# 🎲 作答策略 (一次送入頁面由填寫引擎執行)
+ANSWER_POLICY = {
+    'rating_tail': 3,              # 偏向正面: 從最後 N 個選項中挑選
+    'rating_tail_min_options': 4,  # 選項數達此數量才套用偏向
+    'checkbox_min': 1,             # 複選題最少勾選數
+    'checkbox_max': 3,             # 複選題最多勾選數
+    'select_skip_first': True,     # 下拉選單跳過第一個 "請選擇"
+    'required_keywords': ['請填寫', '原因', '理由', '說明', 'required']
+}
+
+# 文字評論庫
+COMMENT_POOL = [
+    "課程內容豐富，受益良多。",
+    "老師教學認真，講解清楚。",
+    "嗚啦呀哈~",
+    "一袋米要扛幾袋樓!",
+    "天上天下唯我獨尊",
+    "我是一個小學生",
+    "大學，大不了自己學",
+    "教授菜菜撈撈嗚嗚"
+]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver 路徑快取
+記住上次成功啟動所用的 msedgedriver 路徑與 Edge 版本，之後直接重用，
+只有 Edge 版本改變時才重新解析，並記錄冷/熱啟動時間供比較。
+"""
+
+import os
+import re
+import subprocess
+import sys
+import config
+from json_store import load_json, save_json
+
+# 保留最近幾次啟動時間
+STARTUP_HISTORY = 10
+
+# 非 Windows 平台的 Edge 執行檔名稱
+EDGE_BINARIES = ('microsoft-edge', 'microsoft-edge-stable', 'msedge')
+
+
+def detect_edge_version():
+    """不啟動瀏覽器，直接讀取已安裝的 Edge 版本；無法判斷時回傳 None"""
+    if sys.platform.startswith('win'):
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Edge\BLBeacon") as key:
+                return winreg.QueryValueEx(key, 'version')[0]
+        except OSError:
+            return None
+
+    for binary in EDGE_BINARIES:
+        try:
+            output = subprocess.run([binary, '--version'], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'\d+(?:\.\d+)+', output)
+        if match:
+            return match.group(0)
+    return None
+
+
+class DriverCache:
+    """本機 JSON 快取: 已解析的 driver 路徑、Edge 版本與啟動時間紀錄"""
+
+    def __init__(self, path=None):
+        self.path = path or config.DRIVER_CACHE_PATH
+        self.data = self._load()
+
+    def _load(self):
+        return load_json(self.path)
+
+    def _save(self):
+        save_json(self.path, self.data, "driver 快取")
+
+    def lookup(self, browser_version):
+        """回傳可直接使用的快取項目；版本不同或檔案不存在時回傳 None"""
+        entry = self.data.get('driver')
+        if not entry or not os.path.exists(entry.get('driver_path', '')):
+            return None
+        if browser_version and entry.get('browser_version') != browser_version:
+            return None
+        return entry
+
+    def store(self, driver_path, browser_version):
+        self.data['driver'] = {'driver_path': driver_path, 'browser_version': browser_version}
+        self._save()
+
+    def invalidate(self):
+        self.data.pop('driver', None)
+        self._save()
+
+    def record_startup(self, kind, seconds):
+        """記錄一次 cold（重新解析）或 warm（快取命中）啟動時間"""
+        history = self.data.setdefault('startups', {}).setdefault(kind, [])
+        history.append(round(seconds, 3))
+        del history[:-STARTUP_HISTORY]
+        self._save()
+
+    def startup_report(self):
+        """回傳 {kind: 平均秒數}"""
+        return {kind: sum(times) / len(times)
+                for kind, times in self.data.get('startups', {}).items() if times}
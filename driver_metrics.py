@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebDriver 指令統計
+包住 driver.execute（WebElement 的指令也經由它送出），計算每個遠端指令的次數與耗時，
+並標記是由 QuestionnaireAutoFiller 的哪個方法發出，找出往返熱點。
+"""
+
+import os
+import sys
+import time
+
+
+class CommandAccounting:
+    def __init__(self, owner_files=(), tracer=None):
+        # 呼叫位置只認這些檔案中的函式（略過 readiness、tracing 等輔助層）
+        self.owner_files = {os.path.normcase(os.path.abspath(path)) for path in owner_files}
+        self.tracer = tracer
+        self.stats = {}  # (呼叫方法, 指令) → [次數, 總秒數]
+
+    def install(self, driver):
+        """替 driver 裝上統計；可重複安裝在新的 driver 上"""
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record(self._caller(), driver_command, time.perf_counter() - start)
+
+        driver.execute = execute
+        return driver
+
+    def _caller(self):
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+            if filename in self.owner_files:
+                return frame.f_code.co_name
+            frame = frame.f_back
+        return '(其他)'
+
+    def record(self, caller, command, seconds):
+        entry = self.stats.setdefault((caller, command), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if self.tracer is not None:
+            self.tracer.count('driver_commands')
+
+    @property
+    def total_count(self):
+        return sum(count for count, _ in self.stats.values())
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for _, seconds in self.stats.values())
+
+    def by_caller(self):
+        """依呼叫方法彙總: {方法: [次數, 總秒數]}"""
+        callers = {}
+        for (caller, _), (count, seconds) in self.stats.items():
+            entry = callers.setdefault(caller, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        return callers
+
+    def report(self, emit=print, top=10, wall_seconds=None):
+        """輸出耗時最多的呼叫位置與指令"""
+        if not self.stats:
+            return
+        share = f"，佔總時間 {self.total_seconds / wall_seconds:.0%}" if wall_seconds else ''
+        emit(f"🔌 WebDriver 指令: {self.total_count} 次, 合計 {self.total_seconds:.2f} 秒{share}")
+
+        emit("   依呼叫方法 (總耗時):")
+        callers = sorted(self.by_caller().items(), key=lambda item: -item[1][1])
+        for caller, (count, seconds) in callers[:top]:
+            emit(f"   {caller:32s} {count:6d} 次 {seconds:8.2f} 秒")
+
+        emit("   依呼叫方法與指令 (次數):")
+        commands = sorted(self.stats.items(), key=lambda item: -item[1][0])
+        for (caller, command), (count, seconds) in commands[:top]:
+            emit(f"   {caller:32s} {command:24s} {count:6d} 次 {seconds:8.2f} 秒")
@@ -0,0 +1,885 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+記憶體內的假 WebDriver
+直接呼叫 FixtureSite.handle() 載入測試站 HTML，以 BeautifulSoup 保存頁面狀態，
+實作 QuestionnaireAutoFiller 用到的 WebDriver 子集:
+get / back / current_url / title / page_source、find_element(s) (CSS / XPath 子集 / TAG_NAME)、
+元素的 click / get_attribute / text、分頁 (switch_to.new_window / window / close)，以及已知腳本常數的 execute_script。
+不需啟動瀏覽器，登入 → 列表 → 填寫 → 送出整個流程只需數毫秒；
+所有操作都經過 execute()，commands 記錄各指令次數，可用來檢查往返次數預算。
+
+使用方式:
+    DRIVER_BACKEND=fake python auto_questionnaire.py
+    python benchmark.py --backend fake --quick
+"""
+
+import json
+import random
+import re
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+import fill_engine
+import page_parser
+import readiness
+import selector_resolver
+import submission_check
+from fixture_server import FixtureSite
+
+FAKE_USER_AGENT = "Mozilla/5.0 (FakeDriver) QuestionnaireFixture"
+
+# 頁面就緒檢查等不需回應內容的腳本
+READY_SCRIPTS = ("return document.readyState !== 'loading';",)
+SET_VALUE_SCRIPT = "arguments[0].value = arguments[1];"
+CLICK_SCRIPT = "arguments[0].click();"
+USER_AGENT_SCRIPT = "return navigator.userAgent;"
+# FILL_SCRIPT 計算表單指紋時掃描的控制項（與頁面內的 textSelector 相同）
+FILL_CONTROLS = ("input[type='radio'], input[type='checkbox'], select, textarea, "
+                 "input[type='text']:not([name*='UserAccount']):not([name*='Password'])")
+# Selenium 4 以注入腳本判斷可見性，沒有對應的 Command 常數
+IS_ELEMENT_DISPLAYED = 'isElementDisplayed'
+
+
+# ---------- XPath 子集 ----------
+
+class _XPathParser:
+    """
+    支援程式中用到的 XPath 形式:
+    //tag[述詞]、//*[述詞][述詞]、(運算式)[n]
+    述詞: self::tag、contains(text()|.|normalize-space(.)|@屬性, '字串')、@屬性='字串'，以 and / or 組合
+    """
+
+    TOKEN = re.compile(r"\s*(//|::|\(|\)|\[|\]|,|=|@|'[^']*'|\"[^\"]*\"|\*|[\w.-]+(?:\(\))?|\.)")
+
+    def __init__(self, expression):
+        self.tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = self.TOKEN.match(expression, position)
+            if not match:
+                raise WebDriverException(f"FakeDriver 不支援的 XPath: {expression}")
+            self.tokens.append(match.group(1))
+            position = match.end()
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if expected is not None and token != expected:
+            raise WebDriverException(f"FakeDriver XPath 解析錯誤: 預期 {expected}，得到 {token}")
+        self.position += 1
+        return token
+
+    def parse(self):
+        path = self.path()
+        if self.peek() is not None:
+            raise WebDriverException(f"FakeDriver XPath 解析錯誤: 多餘的 {self.peek()}")
+        return path
+
+    def path(self):
+        if self.peek() == '(':
+            self.take('(')
+            inner = self.path()
+            self.take(')')
+            index = None
+            if self.peek() == '[':
+                self.take('[')
+                index = int(self.take())
+                self.take(']')
+            return ('indexed', inner, index)
+        self.take('//')
+        tag = self.take()
+        predicates = []
+        while self.peek() == '[':
+            self.take('[')
+            predicates.append(self.or_expression())
+            self.take(']')
+        return ('path', tag, predicates)
+
+    def or_expression(self):
+        terms = [self.and_expression()]
+        while self.peek() == 'or':
+            self.take()
+            terms.append(self.and_expression())
+        return ('or', terms)
+
+    def and_expression(self):
+        terms = [self.atom()]
+        while self.peek() == 'and':
+            self.take()
+            terms.append(self.atom())
+        return ('and', terms)
+
+    def atom(self):
+        token = self.take()
+        if token == 'self':
+            self.take('::')
+            return ('self', self.take())
+        if token == 'contains':
+            self.take('(')
+            argument = self.value()
+            self.take(',')
+            literal = self.take()[1:-1]
+            self.take(')')
+            return ('contains', argument, literal)
+        if token == '@':
+            name = self.take()
+            self.take('=')
+            return ('equals', ('attr', name), self.take()[1:-1])
+        if token == '(':
+            expression = self.or_expression()
+            self.take(')')
+            return expression
+        raise WebDriverException(f"FakeDriver 不支援的 XPath 述詞: {token}")
+
+    def value(self):
+        token = self.take()
+        if token == 'text()':
+            return ('text',)
+        if token == '.':
+            return ('string',)
+        if token == 'normalize-space':
+            self.take('(')
+            if self.peek() == '.':
+                self.take('.')
+            self.take(')')
+            return ('normalized',)
+        if token == 'normalize-space()':
+            return ('normalized',)
+        if token == '@':
+            return ('attr', self.take())
+        raise WebDriverException(f"FakeDriver 不支援的 XPath 值: {token}")
+
+
+def _xpath_value(element, argument):
+    kind = argument[0]
+    if kind == 'text':
+        return ''.join(child for child in element.find_all(string=True, recursive=False))
+    if kind == 'string':
+        return element.get_text()
+    if kind == 'normalized':
+        return ' '.join(element.get_text().split())
+    value = element.get(argument[1])
+    return ' '.join(value) if isinstance(value, list) else (value or '')
+
+
+def _xpath_match(element, predicate):
+    kind = predicate[0]
+    if kind == 'or':
+        return any(_xpath_match(element, term) for term in predicate[1])
+    if kind == 'and':
+        return all(_xpath_match(element, term) for term in predicate[1])
+    if kind == 'self':
+        return element.name == predicate[1]
+    if kind == 'contains':
+        return predicate[2] in _xpath_value(element, predicate[1])
+    if kind == 'equals':
+        return _xpath_value(element, predicate[1]) == predicate[2]
+    return False
+
+
+def _xpath_select(root, node):
+    if node[0] == 'indexed':
+        found = _xpath_select(root, node[1])
+        if node[2] is None:
+            return found
+        return found[node[2] - 1:node[2]] if 0 < node[2] <= len(found) else []
+    _, tag, predicates = node
+    candidates = root.find_all(True) if tag == '*' else root.find_all(tag)
+    return [element for element in candidates if all(_xpath_match(element, p) for p in predicates)]
+
+
+def select_xpath(root, expression):
+    """在 BeautifulSoup 節點上執行 XPath 子集，回傳文件順序的元素列表"""
+    return _xpath_select(root, _XPathParser(expression).parse())
+
+
+# ---------- 元素 ----------
+
+class FakeElement:
+    """對應 WebElement；所有操作都經由 driver.execute()"""
+
+    def __init__(self, driver, node, page_id):
+        self.parent = driver
+        self.node = node
+        self.page_id = page_id
+
+    def _execute(self, command, params=None):
+        params = dict(params or {})
+        params['element'] = self
+        return self.parent.execute(command, params)
+
+    @property
+    def tag_name(self):
+        return self._execute(Command.GET_ELEMENT_TAG_NAME)
+
+    @property
+    def text(self):
+        return self._execute(Command.GET_ELEMENT_TEXT)
+
+    def get_attribute(self, name):
+        return self._execute(Command.GET_ELEMENT_ATTRIBUTE, {'name': name})
+
+    def is_displayed(self):
+        return self._execute(IS_ELEMENT_DISPLAYED)
+
+    def is_enabled(self):
+        return self._execute(Command.IS_ELEMENT_ENABLED)
+
+    def is_selected(self):
+        return self._execute(Command.IS_ELEMENT_SELECTED)
+
+    def click(self):
+        self._execute(Command.CLICK_ELEMENT)
+
+    def clear(self):
+        self._execute(Command.CLEAR_ELEMENT)
+
+    def send_keys(self, *values):
+        self._execute(Command.SEND_KEYS_TO_ELEMENT, {'text': ''.join(str(value) for value in values)})
+
+    def find_element(self, by=By.ID, value=None):
+        return self._execute(Command.FIND_CHILD_ELEMENT, {'using': by, 'value': value})
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._execute(Command.FIND_CHILD_ELEMENTS, {'using': by, 'value': value})
+
+
+# ---------- 分頁 ----------
+
+class FakeSwitchTo:
+    """對應 driver.switch_to 的分頁操作"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.execute(Command.SWITCH_TO_WINDOW, {'handle': handle})
+
+    def new_window(self, type_hint=None):
+        handle = self.driver.execute(Command.NEW_WINDOW, {'type': type_hint})['handle']
+        self.window(handle)
+
+
+# ---------- driver ----------
+
+class FakeDriver:
+    """以 FixtureSite 為後端的 WebDriver 替身"""
+
+    def __init__(self, site=None, base_url='http://fixture.local'):
+        self.site = site or FixtureSite()
+        self.base_url = base_url.rstrip('/')
+        self.commands = Counter()   # 指令名稱 → 次數
+        self.cookies = {}
+        self.history = []
+        self.current = None         # (網址, BeautifulSoup)
+        self.page_id = 0
+        self.page_counter = 0       # 各分頁共用，元素可藉 page_id 判斷是否已離開頁面
+        self.handle = 'window-1'    # 目前分頁
+        self.windows = {}           # 其他分頁 → (current, history, page_id)
+        self.switch_to = FakeSwitchTo(self)
+        self.pending_page = None    # 以 SUBMIT_CLICK_SCRIPT 送出時所在的頁面
+        self.capabilities = {'browserName': 'fake', 'browserVersion': 'fixture'}
+        self.session_id = 'fake-session'
+        self.scripts = None         # 腳本常數 → 處理函式（第一次使用時建立）
+        self.handlers = {
+            Command.GET: self._get,
+            Command.GO_BACK: self._back,
+            Command.REFRESH: self._refresh,
+            Command.GET_CURRENT_URL: lambda params: self._page()[0],
+            Command.GET_TITLE: self._title,
+            Command.GET_PAGE_SOURCE: lambda params: str(self._page()[1]),
+            Command.FIND_ELEMENT: self._find_element,
+            Command.FIND_ELEMENTS: self._find_elements,
+            Command.FIND_CHILD_ELEMENT: self._find_element,
+            Command.FIND_CHILD_ELEMENTS: self._find_elements,
+            Command.W3C_EXECUTE_SCRIPT: self._execute_script,
+            Command.GET_ELEMENT_TAG_NAME: lambda params: params['element'].node.name,
+            Command.GET_ELEMENT_TEXT: lambda params: params['element'].node.get_text(" ", strip=True),
+            Command.GET_ELEMENT_ATTRIBUTE: self._attribute,
+            IS_ELEMENT_DISPLAYED: lambda params: self._displayed(params['element'].node),
+            Command.IS_ELEMENT_ENABLED: lambda params: not params['element'].node.has_attr('disabled'),
+            Command.IS_ELEMENT_SELECTED: lambda params: self._checked(params['element'].node),
+            Command.CLICK_ELEMENT: lambda params: self._click(params['element']),
+            Command.CLEAR_ELEMENT: lambda params: self._set_value(params['element'].node, ''),
+            Command.SEND_KEYS_TO_ELEMENT: self._send_keys,
+            Command.GET_ALL_COOKIES: self._get_cookies,
+            Command.ADD_COOKIE: self._add_cookie,
+            Command.DELETE_ALL_COOKIES: lambda params: self.cookies.clear(),
+            Command.SET_TIMEOUTS: lambda params: None,
+            Command.NEW_WINDOW: self._new_window,
+            Command.SWITCH_TO_WINDOW: self._switch_to_window,
+            Command.W3C_GET_CURRENT_WINDOW_HANDLE: lambda params: self.handle,
+            Command.W3C_GET_WINDOW_HANDLES: lambda params: [handle for handle in (self.handle, *self.windows) if handle],
+            Command.CLOSE: self._close_window,
+            Command.QUIT: lambda params: None,
+        }
+
+    # ---------- 指令分派與計數 ----------
+
+    def execute(self, driver_command, params=None):
+        """所有操作的入口（與 RemoteWebDriver.execute 相同位置，可被 CommandAccounting 包住）"""
+        self.commands[driver_command] += 1
+        handler = self.handlers.get(driver_command)
+        if handler is None:
+            raise WebDriverException(f"FakeDriver 不支援的指令: {driver_command}")
+        return handler(params or {})
+
+    @property
+    def command_count(self):
+        return sum(self.commands.values())
+
+    def reset_counts(self):
+        self.commands.clear()
+
+    # ---------- WebDriver 介面 ----------
+
+    def get(self, url):
+        self.execute(Command.GET, {'url': url})
+
+    def back(self):
+        self.execute(Command.GO_BACK)
+
+    def refresh(self):
+        self.execute(Command.REFRESH)
+
+    @property
+    def current_url(self):
+        return self.execute(Command.GET_CURRENT_URL)
+
+    @property
+    def title(self):
+        return self.execute(Command.GET_TITLE)
+
+    @property
+    def page_source(self):
+        return self.execute(Command.GET_PAGE_SOURCE)
+
+    def find_element(self, by=By.ID, value=None):
+        return self.execute(Command.FIND_ELEMENT, {'using': by, 'value': value})
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.execute(Command.FIND_ELEMENTS, {'using': by, 'value': value})
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {'script': script, 'args': list(args)})
+
+    def get_cookies(self):
+        return self.execute(Command.GET_ALL_COOKIES)
+
+    def add_cookie(self, cookie_dict):
+        self.execute(Command.ADD_COOKIE, {'cookie': cookie_dict})
+
+    def delete_all_cookies(self):
+        self.execute(Command.DELETE_ALL_COOKIES)
+
+    def implicitly_wait(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS, {'implicit': time_to_wait})
+
+    def set_page_load_timeout(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS, {'pageLoad': time_to_wait})
+
+    def set_script_timeout(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS, {'script': time_to_wait})
+
+    def quit(self):
+        self.execute(Command.QUIT)
+
+    def close(self):
+        self.execute(Command.CLOSE)
+
+    @property
+    def current_window_handle(self):
+        return self.execute(Command.W3C_GET_CURRENT_WINDOW_HANDLE)
+
+    @property
+    def window_handles(self):
+        return self.execute(Command.W3C_GET_WINDOW_HANDLES)
+
+    # ---------- 導航 ----------
+
+    def _page(self):
+        if self.current is None:
+            return 'about:blank', BeautifulSoup('', 'html.parser')
+        return self.current
+
+    def _request(self, method, url, form=None):
+        """向測試站送出請求並跟隨轉址，回傳最後的 (網址, HTML)"""
+        for _ in range(10):
+            url = urljoin(self._page()[0] if self.current else self.base_url + '/', url)
+            parts = urlsplit(url)
+            delay = self.site.latency_for(parts.path)
+            if delay:
+                time.sleep(delay)
+            status, headers, body = self.site.handle(method, parts.path, parse_qs(parts.query),
+                                                     form or {}, dict(self.cookies))
+            cookie = headers.get('Set-Cookie')
+            if cookie:
+                name, value = cookie.split(';', 1)[0].split('=', 1)
+                self.cookies[name.strip()] = value.strip()
+            if status in (301, 302, 303) and headers.get('Location'):
+                method, form, url = 'GET', None, headers['Location']
+                continue
+            return url, body
+        raise WebDriverException("FakeDriver: 轉址次數過多")
+
+    def _load(self, method, url, form=None, remember=True):
+        if remember and self.current is not None:
+            self.history.append(self.current[0])
+        final_url, body = self._request(method, url, form)
+        self.current = (final_url, BeautifulSoup(body, 'html.parser'))
+        self.page_counter += 1
+        self.page_id = self.page_counter
+
+    def _get(self, params):
+        self._load('GET', params['url'])
+
+    def _back(self, params):
+        if self.history:
+            self._load('GET', self.history.pop(), remember=False)
+
+    def _refresh(self, params):
+        if self.current is not None:
+            self._load('GET', self.current[0], remember=False)
+
+    # ---------- 分頁 ----------
+
+    def _new_window(self, params):
+        handle = f"window-{len(self.windows) + 2}"
+        while handle in self.windows or handle == self.handle:
+            handle += '+'
+        self.windows[handle] = (None, [], 0)
+        return {'handle': handle, 'type': params.get('type') or 'tab'}
+
+    def _switch_to_window(self, params):
+        handle = params['handle']
+        if handle == self.handle:
+            return
+        if handle not in self.windows:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        if self.handle is not None:
+            self.windows[self.handle] = (self.current, self.history, self.page_id)
+        self.current, self.history, self.page_id = self.windows.pop(handle)
+        self.handle = handle
+
+    def _close_window(self, params):
+        # 與實際瀏覽器相同: 關閉後不自動切換，須再 switch_to.window
+        self.current, self.history, self.page_id = None, [], 0
+        self.handle = None
+
+    def _title(self, params):
+        title = self._page()[1].title
+        return title.get_text(strip=True) if title else ''
+
+    # ---------- 元素查詢 ----------
+
+    def _select(self, root, by, value):
+        if by == By.CSS_SELECTOR:
+            return root.select(value)
+        if by == By.XPATH:
+            return select_xpath(root, value)
+        if by == By.TAG_NAME:
+            return root.find_all(value)
+        if by == By.ID:
+            return root.select(f"[id='{value}']")
+        if by == By.NAME:
+            return root.select(f"[name='{value}']")
+        if by == By.CLASS_NAME:
+            return root.select(f".{value}")
+        raise WebDriverException(f"FakeDriver 不支援的定位方式: {by}")
+
+    def _root(self, params):
+        element = params.get('element')
+        return element.node if element is not None else self._page()[1]
+
+    def _find_elements(self, params):
+        nodes = self._select(self._root(params), params['using'], params['value'])
+        return [FakeElement(self, node, self.page_id) for node in nodes]
+
+    def _find_element(self, params):
+        nodes = self._select(self._root(params), params['using'], params['value'])
+        if not nodes:
+            raise NoSuchElementException(f"找不到元素: {params['using']}={params['value']}")
+        return FakeElement(self, nodes[0], self.page_id)
+
+    def _attribute(self, params):
+        node = params['element'].node
+        name = params['name']
+        if name == 'value' and node.name == 'textarea':
+            return node.get_text()
+        if name in ('checked', 'selected', 'disabled', 'required'):
+            return 'true' if node.has_attr(name) else None
+        value = node.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    @staticmethod
+    def _displayed(node):
+        return not (node.name == 'input' and (node.get('type') or '').lower() == 'hidden')
+
+    @staticmethod
+    def _checked(node):
+        if node.name == 'option':
+            return node.has_attr('selected')
+        return node.has_attr('checked')
+
+    # ---------- 元素操作 ----------
+
+    def _set_value(self, node, value):
+        if node.name == 'textarea':
+            node.string = value
+        elif node.name == 'select':
+            for option in node.find_all('option'):
+                if option.get('value', option.get_text(strip=True)) == value:
+                    option['selected'] = 'selected'
+                else:
+                    option.attrs.pop('selected', None)
+        else:
+            node['value'] = value
+
+    def _send_keys(self, params):
+        node = params['element'].node
+        current = node.get_text() if node.name == 'textarea' else (node.get('value') or '')
+        self._set_value(node, current + params['text'])
+
+    def _click(self, element):
+        node = element.node
+        if element.page_id != self.page_id:
+            raise WebDriverException("stale element reference: 元素所在的頁面已經離開")
+        input_type = (node.get('type') or '').lower()
+        if node.name == 'input' and input_type == 'radio':
+            for other in self._page()[1].find_all('input', attrs={'type': 'radio', 'name': node.get('name')}):
+                other.attrs.pop('checked', None)
+            node['checked'] = 'checked'
+            return
+        if node.name == 'input' and input_type == 'checkbox':
+            if node.has_attr('checked'):
+                del node['checked']
+            else:
+                node['checked'] = 'checked'
+            return
+
+        match = page_parser.ONCLICK_URL_PATTERN.search(node.get('onclick') or '')
+        if match:
+            self._load('GET', match.group(1))
+            return
+        if node.name == 'a' and node.get('href') and not node['href'].startswith(('#', 'javascript:')):
+            self._load('GET', node['href'])
+            return
+        is_submit = ((node.name == 'input' and input_type in ('submit', 'image')) or
+                     (node.name == 'button' and input_type in ('', 'submit')))
+        form = node.find_parent('form')
+        if is_submit and form is not None:
+            self._submit(form, node)
+
+    def _submit(self, form, submitter=None):
+        fields = {}
+        for control in form.find_all(['input', 'select', 'textarea']):
+            name = control.get('name')
+            if not name or control.has_attr('disabled'):
+                continue
+            input_type = (control.get('type') or 'text').lower() if control.name == 'input' else control.name
+            if input_type in ('submit', 'button', 'image', 'reset'):
+                continue
+            if input_type in ('radio', 'checkbox'):
+                if control.has_attr('checked'):
+                    fields.setdefault(name, []).append(control.get('value') or 'on')
+            elif input_type == 'select':
+                options = control.find_all('option')
+                chosen = [option for option in options if option.has_attr('selected')] or options[:1]
+                for option in chosen:
+                    fields.setdefault(name, []).append(option.get('value', option.get_text(strip=True)))
+            elif input_type == 'textarea':
+                fields.setdefault(name, []).append(control.get_text())
+            else:
+                fields.setdefault(name, []).append(control.get('value') or '')
+        if submitter is not None and submitter.get('name'):
+            fields.setdefault(submitter['name'], []).append(submitter.get('value') or '')
+
+        action = form.get('action') or self._page()[0]
+        if (form.get('method') or 'get').lower() == 'post':
+            self._load('POST', action, fields)
+        else:
+            self._load('GET', action.split('?', 1)[0] + '?' + urlencode(fields, doseq=True))
+
+    # ---------- execute_script ----------
+
+    def _script_table(self):
+        """已知腳本常數 → 處理函式（延遲匯入以避免循環引用）"""
+        if self.scripts is None:
+            import auto_questionnaire
+            self.scripts = {
+                fill_engine.FILL_SCRIPT: self._fill_script,
+                fill_engine.VALIDATE_SCRIPT: self._validate_script,
+                readiness.FORM_CONTROLS_SCRIPT: self._form_controls_script,
+                readiness.SUBMIT_CLICK_SCRIPT: self._submit_click_script,
+                readiness.SUBMISSION_PAGE_SCRIPT: self._submission_page_script,
+                submission_check.SUBMISSION_STATE_SCRIPT: self._submission_state_script,
+                selector_resolver.RESOLVE_SCRIPT: self._resolve_script,
+                auto_questionnaire.OPEN_FORM_SCRIPT: self._open_form_script,
+                auto_questionnaire.CLICK_BY_ONCLICK_SCRIPT: self._click_by_onclick_script,
+                SET_VALUE_SCRIPT: lambda args: self._set_value(args[0].node, args[1]),
+                CLICK_SCRIPT: lambda args: self._click(args[0]),
+                USER_AGENT_SCRIPT: lambda args: FAKE_USER_AGENT,
+            }
+            for script in READY_SCRIPTS:
+                self.scripts[script] = lambda args: True
+        return self.scripts
+
+    def _execute_script(self, params):
+        script, args = params['script'], params['args']
+        handler = self._script_table().get(script)
+        if handler is not None:
+            return handler(args)
+        if 'navigator' in script and 'defineProperty' in script:
+            return None  # 反檢測設定，假 driver 不需要
+        raise WebDriverException(f"FakeDriver 不支援的腳本: {script.strip()[:60]}")
+
+    def _form(self):
+        return page_parser.parse_questionnaire_form(str(self._page()[1]))
+
+    def _apply(self, form, data, names=None):
+        """把 plan_form_answers 的欄位資料寫回頁面狀態；names 限定要寫入的題組"""
+        values = {}
+        for name, value in data:
+            values.setdefault(name, []).append(value)
+        controls = {}
+        for control in self._page()[1].find_all(['input', 'select', 'textarea'], attrs={'name': True}):
+            controls.setdefault(control['name'], []).append(control)
+        for group in form.groups:
+            if not group.name or (names is not None and group.name not in names):
+                continue
+            chosen = values.get(group.name, [])
+            if group.kind in ('radio', 'checkbox'):
+                for control in controls.get(group.name, []):
+                    if (control.get('type') or '').lower() != group.kind:
+                        continue
+                    if (control.get('value') or 'on') in chosen:
+                        control['checked'] = 'checked'
+                    else:
+                        control.attrs.pop('checked', None)
+            elif chosen and controls.get(group.name):
+                self._set_value(controls[group.name][0], chosen[0])
+
+    def _fill_controls(self):
+        """FILL_SCRIPT 掃描的控制項 (種類, 元素)，依文件順序"""
+        controls = []
+        for control in self._page()[1].select(FILL_CONTROLS):
+            input_type = (control.get('type') or '').lower()
+            kind = control.name if control.name == 'select' else (
+                input_type if input_type in ('radio', 'checkbox') else 'text')
+            controls.append((kind, control))
+        return controls
+
+    def _fingerprint(self, controls):
+        """FILL_SCRIPT fingerprint() 的 Python 版本: 依文件順序的 類型:名稱:數量，FNV-1a 32 位元雜湊"""
+        parts = []
+        for kind, control in controls:
+            name = control.get('name') or ''
+            last = parts[-1] if parts else None
+            if last and last[0] == kind and last[1] == name and kind in ('radio', 'checkbox'):
+                last[2] += 1
+            else:
+                parts.append([kind, name, len(control.find_all('option')) if kind == 'select' else 1])
+        text = '|'.join(f"{kind}:{name}:{count}" for kind, name, count in parts)
+        value = 0x811c9dc5
+        units = text.encode('utf-16-le')  # 與 charCodeAt() 相同的 UTF-16 碼元
+        for k in range(0, len(units), 2):
+            value = ((value ^ (units[k] | units[k + 1] << 8)) * 0x01000193) & 0xffffffff
+        return f"{value:x}-{len(parts)}"
+
+    @staticmethod
+    def _plan(controls, summary, policy):
+        """與 analyzeAndFill() 相同規則，由實際填寫的題組產生作答計畫"""
+        filled = {(entry['type'], entry['name']) for entry in summary['filled']}
+        groups = {}
+        for kind, control in controls:
+            if kind in ('radio', 'checkbox'):
+                groups.setdefault((kind, control.get('name') or ''), []).append(control)
+        plan = []
+        for (kind, name), members in groups.items():
+            if (kind, name) not in filled:
+                continue
+            candidates = list(range(len(members)))
+            if kind == 'radio':
+                if len(candidates) >= policy['rating_tail_min_options']:
+                    candidates = candidates[-policy['rating_tail']:]
+                plan.append({'kind': 'radio', 'name': name, 'candidates': candidates})
+            else:
+                multi = '8-1' in name or '8_1' in name or len(members) > 1
+                plan.append({'kind': 'checkbox', 'name': name, 'candidates': candidates, 'multi': multi})
+        selects = [control for kind, control in controls if kind == 'select']
+        for i, select in enumerate(selects):
+            if ('select', select.get('name') or f"#{i + 1}") not in filled:
+                continue
+            candidates = list(range(len(select.find_all('option'))))
+            if len(candidates) >= policy['rating_tail_min_options']:
+                candidates = candidates[-policy['rating_tail']:]
+            elif policy['select_skip_first']:
+                candidates = candidates[1:]
+            plan.append({'kind': 'select', 'index': i, 'candidates': candidates})
+        texts = [control for kind, control in controls if kind == 'text']
+        plan.extend({'kind': 'text', 'index': i} for i, text in enumerate(texts)
+                    if ('text', text.get('name') or f"#{i + 1}") in filled)
+        return plan
+
+    def _apply_plan(self, controls, plan, policy, summary):
+        """applyPlan() 的 Python 版本: 略過題組辨識，直接依計畫作答"""
+        selects = [control for kind, control in controls if kind == 'select']
+        texts = [control for kind, control in controls if kind == 'text']
+        soup = self._page()[1]
+
+        def record(kind, name, value):
+            summary[kind] += 1
+            summary['filled'].append({'type': kind, 'name': name, 'value': value})
+
+        for step in plan:
+            kind = step['kind']
+            if kind in ('radio', 'checkbox'):
+                members = soup.find_all('input', attrs={'type': kind, 'name': step['name']})
+                if kind == 'radio':
+                    picks = [random.choice(step['candidates'])]
+                    for member in members:
+                        member.attrs.pop('checked', None)
+                elif step['multi']:
+                    upper = min(policy['checkbox_max'], len(step['candidates']))
+                    lower = min(policy['checkbox_min'], upper)
+                    picks = random.sample(step['candidates'], random.randint(lower, upper))
+                else:
+                    picks = step['candidates'][:1]
+                values = []
+                for k in picks:
+                    members[k]['checked'] = 'checked'
+                    values.append(members[k].get('value') or 'on')
+                record(kind, step['name'], values[0] if kind == 'radio' else values)
+            elif kind == 'select':
+                select = selects[step['index']]
+                option = select.find_all('option')[random.choice(step['candidates'])]
+                value = option.get('value', option.get_text(strip=True))
+                self._set_value(select, value)
+                record('select', select.get('name') or f"#{step['index'] + 1}", value)
+            elif kind == 'text':
+                text = texts[step['index']]
+                value = random.choice(policy['comments'])
+                self._set_value(text, value)
+                record('text', text.get('name') or f"#{step['index'] + 1}", value)
+
+    def _fill_script(self, args):
+        """FILL_SCRIPT 的 Python 版本: 指紋命中快取時套用計畫，否則以相同作答策略填寫並回傳新計畫"""
+        policy = (args[0] if args else None) or fill_engine.build_answer_policy()
+        plans = (args[1] if len(args) > 1 else None) or {}
+        controls = self._fill_controls()
+        fingerprint = self._fingerprint(controls)
+        cached = plans.get(fingerprint)
+        if cached:
+            summary = {'radio': 0, 'checkbox': 0, 'select': 0, 'text': 0, 'filled': [], 'errors': []}
+            self._apply_plan(controls, cached, policy, summary)
+            summary['total'] = summary['radio'] + summary['checkbox'] + summary['select'] + summary['text']
+        else:
+            form = self._form()
+            data, summary = fill_engine.plan_form_answers(form, policy)
+            self._apply(form, data)
+            summary['plan'] = self._plan(controls, summary, policy)
+        summary.update({'timings': {}, 'fingerprint': fingerprint, 'cached': bool(cached)})
+        return json.dumps(summary, ensure_ascii=False)
+
+    def _validate_script(self, args):
+        """VALIDATE_SCRIPT 的 Python 版本: 找出未作答或被標記錯誤的題組，只補填這些題組"""
+        policy, patch = (list(args) + [None, True])[:2]
+        form = self._form()
+        invalid = [group for group in form.groups
+                   if group.name and (group.error or fill_engine._current_answer(group) is None)]
+        report = {'invalid': [{'name': group.name, 'type': group.kind,
+                               'reason': 'marker' if group.error else 'unanswered'} for group in invalid],
+                  'patched': []}
+        if patch and invalid:
+            names = {group.name for group in invalid}
+            data, _ = fill_engine.plan_form_answers(form, policy, keep_answered=True)
+            self._apply(form, data, names)
+            report['patched'] = [{'name': name, 'value': value} for name, value in data if name in names]
+        return json.dumps(report, ensure_ascii=False)
+
+    def _form_controls_script(self, args):
+        return self._page()[1].select_one("input[type='radio'], input[type='checkbox'], select, textarea") is not None
+
+    def _submit_click_script(self, args):
+        # 標記隨頁面存在: 點擊後若仍是同一個頁面 (page_id 未變)，結果頁腳本視為尚未換頁
+        self.pending_page = self.page_id
+        self._click(args[0])
+
+    def _submission_page_script(self, args):
+        if self.page_id == self.pending_page:
+            return False
+        url, soup = self._page()
+        if soup.select_one('.field-validation-error, .input-validation-error, .validation-summary-errors'):
+            return 'rejected'
+        text = soup.get_text()
+        title = self._title({})
+        if ('感謝' in text or '謝謝' in text or '成功' in title or '完成' in title or
+                'success' in url.lower()):
+            return 'success'
+        return False
+
+    def _resolve_script(self, args):
+        candidates, usable = args[0], args[1]
+        soup = self._page()[1]
+        winner, index, counts = None, -1, []
+        for position, selector in enumerate(candidates):
+            by = By.XPATH if selector_resolver.is_xpath(selector) else By.CSS_SELECTOR
+            try:
+                nodes = self._select(soup, by, selector)
+            except Exception:
+                counts.append(-1)
+                continue
+            if usable:
+                nodes = [node for node in nodes if self._displayed(node) and not node.has_attr('disabled')]
+            counts.append(len(nodes))
+            if winner is None and nodes:
+                winner, index = FakeElement(self, nodes[0], self.page_id), position
+        return {'element': winner, 'index': index, 'counts': counts}
+
+    def _submission_state_script(self, args):
+        url, soup = self._page()
+        if self.page_id == self.pending_page:
+            return {'pending': True, 'url': url}
+        text = soup.body.get_text() if soup.body else ''
+        fragment = ''
+        for keyword in args[0]:
+            at = text.find(keyword)
+            if at >= 0:
+                fragment = text[max(0, at - 20):at + 40]
+                break
+        errors = len(soup.select('.field-validation-error, .input-validation-error, .validation-summary-errors'))
+        return {'url': url, 'title': self._title({}), 'fragment': fragment, 'errors': errors}
+
+    def _open_form_script(self, args):
+        action, method, fields = args[0], args[1], args[2]
+        if (method or 'get').lower() == 'post':
+            self._load('POST', action, {name: [value] for name, value in fields.items()})
+        else:
+            self._load('GET', action.split('?', 1)[0] + '?' + urlencode(fields))
+
+    def _click_by_onclick_script(self, args):
+        for node in self._page()[1].select('[onclick]'):
+            if node.get('onclick') == args[0]:
+                self._click(FakeElement(self, node, self.page_id))
+                return True
+        return False
+
+    # ---------- cookies ----------
+
+    def _get_cookies(self, params):
+        host = urlsplit(self._page()[0] if self.current else self.base_url).hostname or ''
+        return [{'name': name, 'value': value, 'path': '/', 'domain': host, 'secure': False, 'httpOnly': True}
+                for name, value in self.cookies.items()]
+
+    def _add_cookie(self, params):
+        cookie = params['cookie']
+        self.cookies[cookie['name']] = cookie['value']
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面內填寫引擎
+將作答策略一次送入頁面，由瀏覽器端完成所有題組的填寫，
+整份問卷只需要一次 WebDriver 往返，填寫時間不再隨題數增加。
+送出前的檢查也在頁面內一次完成，只補填真正有問題的欄位。
+"""
+
+import json
+import random
+import config
+
+# 🧩 頁面內共用函式: 作答策略與各題型的作答方式，填寫與檢查腳本共用
+SCRIPT_HELPERS = r"""
+var policy = arguments[0];
+var textSelector = "textarea, input[type='text']:not([name*='UserAccount']):not([name*='Password'])";
+
+function visible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function usable(el) {
+    return visible(el) && !el.disabled;
+}
+function randomItem(list) {
+    return list[Math.floor(Math.random() * list.length)];
+}
+function biased(list) {
+    // 偏向正面答案（通常是後面的選項）
+    if (list.length >= policy.rating_tail_min_options) {
+        return randomItem(list.slice(-policy.rating_tail));
+    }
+    return randomItem(list);
+}
+function sample(list, count) {
+    var pool = list.slice(), picked = [];
+    while (picked.length < count && pool.length) {
+        picked.push(pool.splice(Math.floor(Math.random() * pool.length), 1)[0]);
+    }
+    return picked;
+}
+function fire(el, type) {
+    el.dispatchEvent(new Event(type, {bubbles: true}));
+}
+function groupByName(selector) {
+    var groups = {}, order = [];
+    document.querySelectorAll(selector).forEach(function (el) {
+        if (!el.name) return;
+        if (!groups[el.name]) { groups[el.name] = []; order.push(el.name); }
+        groups[el.name].push(el);
+    });
+    return order.map(function (name) { return [name, groups[name]]; });
+}
+function answerRadio(options) {
+    var selected = biased(options);
+    selected.click();
+    return selected.value;
+}
+function answerCheckbox(name, options) {
+    // 8-1 類題目隨機勾選 1-3 個選項
+    var targets = [options[0]];
+    if (name.indexOf('8-1') >= 0 || name.indexOf('8_1') >= 0 || options.length > 1) {
+        var upper = Math.min(policy.checkbox_max, options.length);
+        var lower = Math.min(policy.checkbox_min, upper);
+        var count = lower + Math.floor(Math.random() * (upper - lower + 1));
+        targets = sample(options, count);
+    }
+    var values = [];
+    targets.forEach(function (el) {
+        if (!usable(el)) return;
+        if (!el.checked) el.click();
+        values.push(el.value);
+    });
+    return values;
+}
+function answerSelect(select) {
+    // 跳過第一個 "請選擇"；回傳 null 表示沒有可選的選項
+    var indexes = [];
+    for (var k = 0; k < select.options.length; k++) indexes.push(k);
+    if (indexes.length <= 1) return null;
+    if (indexes.length >= policy.rating_tail_min_options) {
+        indexes = indexes.slice(-policy.rating_tail);
+    } else if (policy.select_skip_first) {
+        indexes = indexes.slice(1);
+    }
+    select.selectedIndex = randomItem(indexes);
+    fire(select, 'change');
+    return select.value;
+}
+function answerText(el) {
+    // 換一個與目前不同的評論（被退回的內容不再送出）
+    var pool = policy.comments.filter(function (c) { return c !== el.value; });
+    el.value = randomItem(pool.length ? pool : policy.comments);
+    fire(el, 'input');
+    fire(el, 'change');
+    return el.value;
+}
+function nearbyText(el) {
+    var container = el.parentElement && el.parentElement.parentElement;
+    return container ? (container.innerText || '').toLowerCase() : '';
+}
+"""
+
+# 🚀 頁面內填寫腳本: arguments = [作答策略, 已快取的作答計畫 {指紋: 計畫}]，回傳 JSON 字串摘要
+# 表單結構（控制項名稱、類型、選項數）雜湊為指紋；命中快取時直接套用計畫，
+# 略過題組辨識、可見性檢查與提示文字比對；未命中時完整分析並回傳新計畫
+FILL_SCRIPT = SCRIPT_HELPERS + r"""
+var plans = arguments[1] || {};
+var summary = {radio: 0, checkbox: 0, select: 0, text: 0, filled: [], errors: [], timings: {}};
+var clock = performance.now();
+
+function lap(kind) {
+    var now = performance.now();
+    summary.timings[kind] = now - clock;
+    clock = now;
+}
+
+function fingerprint() {
+    // 依文件順序的 類型:名稱:數量，FNV-1a 32 位元雜湊
+    var parts = [], last = null;
+    document.querySelectorAll("input[type='radio'], input[type='checkbox'], select, " + textSelector)
+        .forEach(function (el) {
+            var kind = el.tagName === 'SELECT' ? 'select' : (el.type === 'radio' || el.type === 'checkbox' ? el.type : 'text');
+            var count = kind === 'select' ? el.options.length : 1;
+            if (last && last[0] === kind && last[1] === el.name && kind !== 'select' && kind !== 'text') {
+                last[2] += 1;
+            } else {
+                last = [kind, el.name || '', count];
+                parts.push(last);
+            }
+        });
+    var text = parts.map(function (part) { return part.join(':'); }).join('|');
+    var hash = 0x811c9dc5;
+    for (var k = 0; k < text.length; k++) {
+        hash ^= text.charCodeAt(k);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    return hash.toString(16) + '-' + parts.length;
+}
+
+function record(kind, name, value) {
+    summary[kind] += 1;
+    summary.filled.push({type: kind, name: name, value: value});
+}
+
+function controlsNamed(kind, name) {
+    // 與 groupByName 相同的索引: 只計入該類型的 input，略過同名的 hidden 欄位（ASP.NET MVC 複選框）
+    var list = [];
+    document.querySelectorAll("input[type='" + kind + "']").forEach(function (el) {
+        if (el.name === name) list.push(el);
+    });
+    return list;
+}
+
+function applyPlan(plan) {
+    var selects = document.querySelectorAll('select');
+    var texts = document.querySelectorAll(textSelector);
+    plan.forEach(function (step) {
+        try {
+            if (step.kind === 'radio') {
+                var radios = controlsNamed('radio', step.name);
+                var radio = radios[randomItem(step.candidates)];
+                radio.click();
+                record('radio', step.name, radio.value);
+            } else if (step.kind === 'checkbox') {
+                var boxes = controlsNamed('checkbox', step.name), values = [];
+                var picks = step.candidates.slice(0, 1);
+                if (step.multi) {
+                    var upper = Math.min(policy.checkbox_max, step.candidates.length);
+                    var lower = Math.min(policy.checkbox_min, upper);
+                    picks = sample(step.candidates, lower + Math.floor(Math.random() * (upper - lower + 1)));
+                }
+                picks.forEach(function (k) {
+                    if (!boxes[k].checked) boxes[k].click();
+                    values.push(boxes[k].value);
+                });
+                record('checkbox', step.name, values);
+            } else if (step.kind === 'select') {
+                var select = selects[step.index];
+                select.selectedIndex = randomItem(step.candidates);
+                fire(select, 'change');
+                record('select', select.name || ('#' + (step.index + 1)), select.value);
+            } else if (step.kind === 'text') {
+                var el = texts[step.index];
+                record('text', el.name || ('#' + (step.index + 1)), answerText(el));
+            }
+        } catch (e) {
+            summary.errors.push({type: step.kind, name: step.name || ('#' + (step.index + 1)), error: String(e)});
+        }
+    });
+    lap('plan');
+}
+
+function indexes(count) {
+    var list = [];
+    for (var k = 0; k < count; k++) list.push(k);
+    return list;
+}
+
+function analyzeAndFill() {
+    var plan = [];
+
+    // 1. 單選題（偏向正面答案）
+    groupByName("input[type='radio']").forEach(function (entry) {
+        try {
+            var value = answerRadio(entry[1]);
+            record('radio', entry[0], value);
+            var candidates = indexes(entry[1].length);
+            if (candidates.length >= policy.rating_tail_min_options) candidates = candidates.slice(-policy.rating_tail);
+            plan.push({kind: 'radio', name: entry[0], candidates: candidates});
+        } catch (e) {
+            summary.errors.push({type: 'radio', name: entry[0], error: String(e)});
+        }
+    });
+    lap('radio');
+
+    // 2. 複選題（勾選題）
+    groupByName("input[type='checkbox']").forEach(function (entry) {
+        try {
+            var values = answerCheckbox(entry[0], entry[1]);
+            record('checkbox', entry[0], values);
+            var candidates = [];
+            entry[1].forEach(function (el, k) { if (usable(el)) candidates.push(k); });
+            var multi = entry[0].indexOf('8-1') >= 0 || entry[0].indexOf('8_1') >= 0 || entry[1].length > 1;
+            plan.push({kind: 'checkbox', name: entry[0], candidates: candidates, multi: multi});
+        } catch (e) {
+            summary.errors.push({type: 'checkbox', name: entry[0], error: String(e)});
+        }
+    });
+    lap('checkbox');
+
+    // 3. 下拉選單
+    document.querySelectorAll('select').forEach(function (select, i) {
+        var name = select.name || ('#' + (i + 1));
+        try {
+            var value = answerSelect(select);
+            if (value === null) return;
+            record('select', name, value);
+            var candidates = indexes(select.options.length);
+            if (candidates.length >= policy.rating_tail_min_options) {
+                candidates = candidates.slice(-policy.rating_tail);
+            } else if (policy.select_skip_first) {
+                candidates = candidates.slice(1);
+            }
+            plan.push({kind: 'select', index: i, candidates: candidates});
+        } catch (e) {
+            summary.errors.push({type: 'select', name: name, error: String(e)});
+        }
+    });
+    lap('select');
+
+    // 4. 文字評論和必填欄位
+    document.querySelectorAll(textSelector).forEach(function (el, i) {
+        var name = el.name || ('#' + (i + 1));
+        try {
+            if (!usable(el)) return;
+            var shouldFill = (el.value || '').trim().length === 0 || el.required;
+            // 檢查附近是否有「請填寫原因」等錯誤提示
+            if (!shouldFill) {
+                var nearby = nearbyText(el);
+                shouldFill = policy.required_keywords.some(function (kw) { return nearby.indexOf(kw) >= 0; });
+            }
+            if (!shouldFill) return;
+            record('text', name, answerText(el));
+            plan.push({kind: 'text', index: i});
+        } catch (e) {
+            summary.errors.push({type: 'text', name: name, error: String(e)});
+        }
+    });
+    lap('text');
+    return plan;
+}
+
+summary.fingerprint = fingerprint();
+var cached = plans[summary.fingerprint];
+summary.cached = !!cached;
+if (cached) {
+    applyPlan(cached);
+} else {
+    summary.plan = analyzeAndFill();
+}
+
+summary.total = summary.radio + summary.checkbox + summary.select + summary.text;
+return JSON.stringify(summary);
+"""
+
+# 🔍 送出前檢查: 一次找出無效或未填的控制項（HTML5 checkValidity 與網站錯誤標記），只補填這些欄位
+# arguments = [作答策略, 是否補填]，回傳 JSON 字串 {invalid: [...], patched: [...]}
+VALIDATE_SCRIPT = SCRIPT_HELPERS + r"""
+var patch = arguments[1];
+var report = {invalid: [], patched: []};
+var flagged = {};
+
+function flag(name, type, reason) {
+    if (flagged[name]) return;
+    flagged[name] = true;
+    report.invalid.push({name: name, type: type, reason: reason});
+}
+
+// 網站的錯誤標記（伺服器退回時出現）
+var markers = document.querySelectorAll(".field-validation-error, [data-valmsg-for], .input-validation-error");
+markers.forEach(function (marker) {
+    if (!(marker.innerText || '').trim() && !marker.classList.contains('input-validation-error')) return;
+    var target = marker.getAttribute('data-valmsg-for');
+    if (target) { flag(target, 'marker', 'marker'); return; }
+    if (marker.name) { flag(marker.name, 'marker', 'marker'); return; }
+    var scope = marker.parentElement || marker;
+    var control = scope.querySelector("input:not([type='hidden']):not([type='submit']), select, textarea");
+    if (control && control.name) flag(control.name, 'marker', 'marker');
+});
+
+// HTML5 驗證
+document.querySelectorAll("input:not([type='hidden']):not([type='submit']):not([type='button']), select, textarea")
+    .forEach(function (el) {
+        if (el.disabled || !el.name || !el.willValidate) return;
+        if (!el.checkValidity()) flag(el.name, el.type, 'validity');
+    });
+
+// 每題都需作答: 未選的單選/複選題、未選的下拉選單、空白文字欄位
+groupByName("input[type='radio']").forEach(function (entry) {
+    if (!entry[1].some(function (el) { return el.checked; })) flag(entry[0], 'radio', 'unanswered');
+});
+groupByName("input[type='checkbox']").forEach(function (entry) {
+    if (!entry[1].some(function (el) { return el.checked; })) flag(entry[0], 'checkbox', 'unanswered');
+});
+document.querySelectorAll('select').forEach(function (select) {
+    if (select.name && select.options.length > 1 && select.selectedIndex <= 0 && !select.value) {
+        flag(select.name, 'select', 'unanswered');
+    }
+});
+document.querySelectorAll(textSelector).forEach(function (el) {
+    if (el.name && usable(el) && !el.readOnly && !(el.value || '').trim()) flag(el.name, 'text', 'empty');
+});
+
+// 只補填有問題的欄位
+if (patch) {
+    report.invalid.forEach(function (entry) {
+        var controls = Array.prototype.filter.call(document.getElementsByName(entry.name), function (el) {
+            return !el.disabled && el.type !== 'hidden';
+        });
+        if (!controls.length) return;
+        var first = controls[0], value = null;
+        try {
+            if (first.type === 'radio') value = answerRadio(controls);
+            else if (first.type === 'checkbox') value = answerCheckbox(entry.name, controls);
+            else if (first.tagName === 'SELECT') value = answerSelect(first);
+            else if (first.tagName === 'TEXTAREA' || first.type === 'text') value = answerText(first);
+        } catch (e) {
+            value = null;
+        }
+        if (value !== null) report.patched.push({name: entry.name, value: value});
+    });
+}
+return JSON.stringify(report);
+"""
+
+def build_answer_policy():
+    """由設定檔組出送入頁面的作答策略"""
+    policy = dict(config.ANSWER_POLICY)
+    policy['comments'] = list(config.COMMENT_POOL)
+    return policy
+
+
+def fill_page(driver, policy=None, plans=None):
+    """
+    在頁面內一次填寫所有題組，回傳填寫摘要
+    plans 為 {表單指紋: 作答計畫}；摘要含 fingerprint、cached，未命中時另含新的 plan
+    """
+    if policy is None:
+        policy = build_answer_policy()
+    raw = driver.execute_script(FILL_SCRIPT, policy, plans or {})
+    return json.loads(raw) if raw else {}
+
+
+def validate_page(driver, policy=None, patch=True):
+    """一次找出無效或未填的控制項並只補填這些欄位，回傳 {'invalid': [...], 'patched': [...]}"""
+    if policy is None:
+        policy = build_answer_policy()
+    raw = driver.execute_script(VALIDATE_SCRIPT, policy, patch)
+    return json.loads(raw) if raw else {'invalid': [], 'patched': []}
+
+
+def _biased(options, policy, rng):
+    """偏向正面答案（通常是後面的選項）"""
+    if len(options) >= policy['rating_tail_min_options']:
+        return rng.choice(options[-policy['rating_tail']:])
+    return rng.choice(options)
+
+
+def _current_answer(group):
+    """題組目前已作答的值；未作答或被伺服器標記錯誤時回傳 None"""
+    if group.error:
+        return None
+    if group.kind in ('radio', 'checkbox'):
+        return list(group.selected) or None
+    if group.kind == 'select':
+        return [group.value] if group.value else None
+    if group.kind == 'text':
+        return [group.value] if group.value.strip() else None
+    return None
+
+
+def plan_form_answers(form, policy=None, rng=random, keep_answered=False):
+    """
+    以與 FILL_SCRIPT 相同的作答策略，為 page_parser.QuestionnaireForm 產生表單資料
+    keep_answered=True 時（伺服器退回後重送）保留已作答的題組，只重填未作答或被標記錯誤的題組
+    回傳 (欄位資料 list of (name, value), 填寫摘要)
+    """
+    if policy is None:
+        policy = build_answer_policy()
+    data = list(form.hidden.items())
+    summary = {'radio': 0, 'checkbox': 0, 'select': 0, 'text': 0, 'filled': [], 'errors': []}
+
+    for group in form.groups:
+        current = _current_answer(group) if keep_answered else None
+        if current is not None:
+            if group.name:
+                data.extend((group.name, value) for value in current)
+            continue
+
+        if group.kind == 'radio' and group.options:
+            value = _biased(group.options, policy, rng)
+            data.append((group.name, value))
+
+        elif group.kind == 'checkbox' and group.options:
+            value = group.options[:1]
+            if '8-1' in group.name or '8_1' in group.name or len(group.options) > 1:
+                upper = min(policy['checkbox_max'], len(group.options))
+                lower = min(policy['checkbox_min'], upper)
+                value = rng.sample(group.options, rng.randint(lower, upper))
+            data.extend((group.name, option) for option in value)
+
+        elif group.kind == 'select':
+            if len(group.options) <= 1:
+                if group.name:
+                    data.append((group.name, group.value))
+                continue
+            if len(group.options) >= policy['rating_tail_min_options']:
+                value = rng.choice(group.options[-policy['rating_tail']:])
+            elif policy['select_skip_first']:
+                value = rng.choice(group.options[1:])
+            else:
+                value = rng.choice(group.options)
+            data.append((group.name, value))
+
+        elif group.kind == 'text':
+            hint = group.hint.lower()
+            should_fill = (not group.value.strip() or group.required or
+                           any(keyword in hint for keyword in policy['required_keywords']))
+            pool = [comment for comment in policy['comments'] if comment != group.value] or policy['comments']
+            value = rng.choice(pool) if should_fill else group.value
+            if group.name:
+                data.append((group.name, value))
+            if not should_fill:
+                continue
+
+        else:
+            continue
+
+        summary[group.kind] += 1
+        summary['filled'].append({'type': group.kind, 'name': group.name, 'value': value})
+
+    if form.submit_name:
+        data.append((form.submit_name, form.submit_value or ''))
+    summary['total'] = summary['radio'] + summary['checkbox'] + summary['select'] + summary['text']
+    return data, summary
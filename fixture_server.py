@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機問卷測試站
+模擬 ceq.nkust.edu.tw 的流程: /Home 登入 → /StuFillIn 問卷列表 → 各科問卷 → 感謝頁，
+供離線執行與效能測試使用。題目數量、按鈕型式與各端點延遲皆可設定。
+
+使用方式:
+    python fixture_server.py --port 8765 --questionnaires 5 --radios 20
+    set CEQ_BASE_URL=http://127.0.0.1:8765
+    python auto_questionnaire.py
+"""
+
+import argparse
+import html
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SESSION_COOKIE = "CEQSession"
+LIST_PATH = "/StuFillIn"
+FILL_PATH = "/StuFillIn/Fill"
+SUBMIT_PATH = "/StuFillIn/Submit"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-Hant"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{body}
+</body></html>"""
+
+
+class FixtureSite:
+    """
+    問卷站的純 Python 實作，不依賴 socket
+    handle() 回傳 (狀態碼, 標頭 dict, HTML)，HTTP 伺服器與假 driver 共用
+    """
+
+    def __init__(self, questionnaires=3, radios=10, radio_options=5, checkboxes=1, checkbox_options=4,
+                 selects=1, select_options=4, textareas=1, button_style='onclick', latency=None,
+                 comment_min_length=0):
+        self.courses = [f"測試課程 {n + 1}" for n in range(questionnaires)]
+        self.radios = radios
+        self.radio_options = radio_options
+        self.checkboxes = checkboxes
+        self.checkbox_options = checkbox_options
+        self.selects = selects
+        self.select_options = select_options
+        self.textareas = textareas
+        self.button_style = button_style    # onclick / form / post
+        self.latency = dict(latency or {})  # 端點路徑 → 秒數，'*' 為預設
+        self.comment_min_length = comment_min_length  # 只有伺服器端檢查的規則（瀏覽器看不出來）
+        self.sessions = set()
+        self.completed = set()
+        self.submissions = []
+        self.lock = threading.Lock()
+
+    # ---------- 設定與狀態 ----------
+
+    def latency_for(self, path):
+        return self.latency.get(path, self.latency.get('*', 0))
+
+    def pending(self):
+        return [n for n in range(len(self.courses)) if n not in self.completed]
+
+    # ---------- 題目欄位名稱 ----------
+
+    def radio_names(self):
+        return [f"Q{n + 1}" for n in range(self.radios)]
+
+    def checkbox_names(self):
+        # 接在單選題後的複選題，命名方式如 "8-1"
+        return [f"{self.radios + n + 1}-1" for n in range(self.checkboxes)]
+
+    def select_names(self):
+        return [f"S{n + 1}" for n in range(self.selects)]
+
+    def textarea_names(self):
+        return [f"Comment{n + 1}" for n in range(self.textareas)]
+
+    # ---------- 頁面 ----------
+
+    def page(self, title, body):
+        return PAGE_TEMPLATE.format(title=html.escape(title), body=body)
+
+    def login_page(self, error=''):
+        message = f'<div class="text-danger">{html.escape(error)}</div>' if error else ''
+        return self.page("教學評量系統 - 登入", f"""
+<form method="post" action="/Home">
+  {message}
+  <input type="text" name="UserAccount" placeholder="學號">
+  <input type="password" name="Password" placeholder="密碼">
+  <button type="submit" class="btn btn-primary">登入</button>
+</form>""")
+
+    def main_page(self):
+        return self.page("教學評量系統 - 主頁", """
+<nav><ul>
+  <li><span>期末問卷</span>
+    <ul><li><a href="/StuFillIn">期末問卷填寫</a></li></ul>
+  </li>
+</ul></nav>""")
+
+    def list_page(self):
+        rows = []
+        for n, course in enumerate(self.courses):
+            if n in self.completed:
+                action = '<span class="label label-success">已填寫</span>'
+            elif self.button_style in ('form', 'post'):
+                method = 'post' if self.button_style == 'post' else 'get'
+                action = (f'<form method="{method}" action="{FILL_PATH}"><input type="hidden" name="id" value="{n + 1}">'
+                          f'<input type="submit" class="btn btn-info" value="填寫問卷(Start)"></form>')
+            else:
+                action = (f'<input type="button" class="btn btn-info" value="填寫問卷(Start)" '
+                          f'onclick="location.href=\'{FILL_PATH}?id={n + 1}\'">')
+            rows.append(f"<tr><td>{n + 1}</td><td>{html.escape(course)}</td><td>{action}</td></tr>")
+        return self.page("期末問卷填寫", f"""
+<table class="table">
+  <tr><th>#</th><th>課程</th><th>問卷</th></tr>
+  {''.join(rows)}
+</table>""")
+
+    def questionnaire_page(self, course_id, errors=(), answers=None):
+        answers = answers or {}
+
+        def checked(name, value):
+            return ' checked' if value in answers.get(name, []) else ''
+
+        def selected(name, value):
+            return ' selected' if value in answers.get(name, []) else ''
+
+        def error_marker(name):
+            if name not in errors:
+                return ''
+            return f'<span class="field-validation-error" data-valmsg-for="{name}">此題必填，請填寫原因</span>'
+
+        parts = []
+        for n, name in enumerate(self.radio_names()):
+            options = ''.join(f'<label><input type="radio" name="{name}" value="{k + 1}"{checked(name, str(k + 1))}>'
+                              f'{k + 1}</label>'
+                              for k in range(self.radio_options))
+            parts.append(f'<div class="question"><p>{n + 1}. 教學評量題目</p>{options}{error_marker(name)}</div>')
+        for name in self.checkbox_names():
+            options = ''.join(f'<label><input type="checkbox" name="{name}" value="{k + 1}"{checked(name, str(k + 1))}>'
+                              f'選項{k + 1}</label>'
+                              for k in range(self.checkbox_options))
+            parts.append(f'<div class="question"><p>{name} 複選題</p>{options}{error_marker(name)}</div>')
+        for name in self.select_names():
+            options = '<option value="">請選擇</option>' + ''.join(
+                f'<option value="{k + 1}"{selected(name, str(k + 1))}>{k + 1}</option>'
+                for k in range(self.select_options - 1))
+            parts.append(f'<div class="question"><p>{name} 下拉題</p><select name="{name}">{options}</select>'
+                         f'{error_marker(name)}</div>')
+        for name in self.textarea_names():
+            parts.append(f'<div class="question"><div><p>請填寫原因</p><textarea name="{name}" required>'
+                         f'{html.escape((answers.get(name) or [""])[0])}</textarea>'
+                         f'</div>{error_marker(name)}</div>')
+
+        summary = '<div class="validation-summary-errors">請填寫所有必填欄位</div>' if errors else ''
+        return self.page(f"問卷填寫 - {self.courses[course_id]}", f"""
+<h2>{html.escape(self.courses[course_id])}</h2>
+{summary}
+<form method="post" action="{SUBMIT_PATH}">
+  <input type="hidden" name="id" value="{course_id + 1}">
+  <input type="hidden" name="__RequestVerificationToken" value="fixture-token">
+  {''.join(parts)}
+  <input type="submit" class="btn btn-primary" value="送出">
+</form>""")
+
+    def success_page(self):
+        return self.page("填寫完成", '<div class="alert alert-success">感謝您的填寫！</div>'
+                                     '<a href="/StuFillIn">返回問卷列表</a>')
+
+    # ---------- 請求處理 ----------
+
+    def missing_fields(self, form):
+        """回傳未作答或未通過伺服器檢查的欄位名稱"""
+        missing = []
+        for name in self.radio_names() + self.checkbox_names() + self.select_names() + self.textarea_names():
+            values = [value for value in form.get(name, []) if value.strip()]
+            if not values:
+                missing.append(name)
+        for name in self.textarea_names():
+            comment = (form.get(name) or [''])[0].strip()
+            if comment and len(comment) < self.comment_min_length:
+                missing.append(name)
+        return missing
+
+    def handle(self, method, path, query=None, form=None, cookies=None):
+        """
+        處理一個請求
+        query / form 為 parse_qs 格式 (name → [values])，cookies 為 dict
+        回傳 (狀態碼, 標頭 dict, HTML)
+        """
+        query = query or {}
+        form = form or {}
+        cookies = cookies or {}
+        logged_in = cookies.get(SESSION_COOKIE) in self.sessions
+
+        if path in ('/', '/Home'):
+            if method == 'POST':
+                account = (form.get('UserAccount') or [''])[0]
+                password = (form.get('Password') or [''])[0]
+                if not account or not password:
+                    return 200, {}, self.login_page("請輸入帳號密碼")
+                token = secrets.token_hex(8)
+                with self.lock:
+                    self.sessions.add(token)
+                return 302, {'Location': '/Main', 'Set-Cookie': f"{SESSION_COOKIE}={token}; Path=/"}, ''
+            if logged_in:
+                return 200, {}, self.main_page()
+            return 200, {}, self.login_page()
+
+        if not logged_in:
+            return 302, {'Location': '/Home'}, ''
+
+        if path == '/Main':
+            return 200, {}, self.main_page()
+
+        if path == LIST_PATH:
+            return 200, {}, self.list_page()
+
+        if path == FILL_PATH:
+            course_id = self._course_id(form if method == 'POST' else query)
+            if course_id is None:
+                return 404, {}, self.page("找不到問卷", "<p>找不到問卷</p>")
+            return 200, {}, self.questionnaire_page(course_id)
+
+        if path == SUBMIT_PATH and method == 'POST':
+            course_id = self._course_id(form)
+            if course_id is None:
+                return 404, {}, self.page("找不到問卷", "<p>找不到問卷</p>")
+            missing = self.missing_fields(form)
+            if missing:
+                # 與 ASP.NET MVC 相同: 退回時保留已填的答案
+                return 200, {}, self.questionnaire_page(course_id, errors=missing, answers=form)
+            with self.lock:
+                self.completed.add(course_id)
+                self.submissions.append({'id': course_id + 1, 'fields': form})
+            return 200, {}, self.success_page()
+
+        return 404, {}, self.page("404", "<p>Not Found</p>")
+
+    def _course_id(self, params):
+        try:
+            course_id = int((params.get('id') or ['0'])[0]) - 1
+        except ValueError:
+            return None
+        return course_id if 0 <= course_id < len(self.courses) else None
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    site = None  # 由 FixtureServer 設定
+
+    def _dispatch(self, method):
+        parts = urlsplit(self.path)
+        form = {}
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            form = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+        cookies = {}
+        for chunk in (self.headers.get('Cookie') or '').split(';'):
+            if '=' in chunk:
+                name, value = chunk.strip().split('=', 1)
+                cookies[name] = value
+
+        delay = self.site.latency_for(parts.path)
+        if delay:
+            time.sleep(delay)
+
+        status, headers, body = self.site.handle(method, parts.path, parse_qs(parts.query), form, cookies)
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass  # 保持主控台乾淨
+
+
+class FixtureServer:
+    """在背景執行緒啟動的本機測試站"""
+
+    def __init__(self, site=None, host='127.0.0.1', port=0):
+        self.site = site or FixtureSite()
+        handler = type('BoundFixtureRequestHandler', (FixtureRequestHandler,), {'site': self.site})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def parse_latency(specs):
+    """解析 --latency 參數: "/StuFillIn=0.2" 或 "*=0.05" """
+    latency = {}
+    for spec in specs or []:
+        path, _, seconds = spec.partition('=')
+        latency[path] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本機問卷測試站 (模擬 ceq.nkust.edu.tw)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--questionnaires', type=int, default=3, help="待填問卷數")
+    parser.add_argument('--radios', type=int, default=10, help="每份問卷的單選題數")
+    parser.add_argument('--radio-options', type=int, default=5)
+    parser.add_argument('--checkboxes', type=int, default=1, help="複選題數 (命名如 8-1)")
+    parser.add_argument('--checkbox-options', type=int, default=4)
+    parser.add_argument('--selects', type=int, default=1)
+    parser.add_argument('--select-options', type=int, default=4)
+    parser.add_argument('--textareas', type=int, default=1)
+    parser.add_argument('--button-style', choices=['onclick', 'form'], default='onclick')
+    parser.add_argument('--comment-min-length', type=int, default=0, help="伺服器端要求的評論最短字數")
+    parser.add_argument('--latency', action='append', metavar='PATH=SECONDS',
+                        help="端點延遲，例如 --latency /StuFillIn=0.3 --latency '*=0.05'")
+    args = parser.parse_args()
+
+    site = FixtureSite(questionnaires=args.questionnaires, radios=args.radios, radio_options=args.radio_options,
+                       checkboxes=args.checkboxes, checkbox_options=args.checkbox_options, selects=args.selects,
+                       select_options=args.select_options, textareas=args.textareas,
+                       button_style=args.button_style, latency=parse_latency(args.latency),
+                       comment_min_length=args.comment_min_length)
+    server = FixtureServer(site, args.host, args.port)
+    print(f"🧪 本機問卷測試站已啟動: {server.base_url}")
+    print(f"   設定 CEQ_BASE_URL={server.base_url} 後執行 auto_questionnaire.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🔚 測試站已關閉")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
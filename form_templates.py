@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+問卷模板快取
+每門課的問卷幾乎都是同一個模板: 以表單結構（控制項名稱、類型、選項數）的指紋為鍵，
+保存填寫引擎分析出的作答計畫（題組、偏向正面的選項索引、需填寫的文字欄位）。
+相同模板直接套用計畫，不再逐題辨識；指紋未命中時才完整分析。
+計畫與作答策略綁定，策略改變時舊計畫自動失效。
+"""
+
+import hashlib
+import json
+import config
+from json_store import load_json, save_json
+
+# 磁碟上最多保留的模板數
+MAX_TEMPLATES = 20
+
+
+def policy_tag(policy):
+    """作答策略的簡短雜湊（評論內容不影響計畫，不列入）"""
+    relevant = {key: value for key, value in policy.items() if key != 'comments'}
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]
+
+
+class TemplateCache:
+    """記憶體內的 {指紋: 作答計畫}；path 不為空時同步保存到 JSON 檔"""
+
+    def __init__(self, policy, path=None):
+        self.tag = policy_tag(policy)
+        self.path = path if path is not None else config.TEMPLATE_CACHE_PATH
+        self.hits = 0
+        self.misses = 0
+        self.templates = self._load()
+
+    def _load(self):
+        data = load_json(self.path)
+        if data.get('policy') != self.tag:
+            return {}  # 作答策略已改變
+        templates = data.get('templates')
+        return templates if isinstance(templates, dict) else {}
+
+    def _save(self):
+        if self.path:
+            save_json(self.path, {'policy': self.tag, 'templates': self.templates}, "模板快取", indent=None)
+
+    def plans(self):
+        """送入填寫引擎的 {指紋: 計畫}"""
+        return self.templates
+
+    def record(self, summary):
+        """依填寫摘要更新命中統計，並保存新分析出的計畫"""
+        if summary.get('cached'):
+            self.hits += 1
+            return
+        self.misses += 1
+        fingerprint, plan = summary.get('fingerprint'), summary.get('plan')
+        if not fingerprint or not plan or summary.get('errors'):
+            return  # 有錯誤的分析結果不保存
+        self.templates[fingerprint] = plan
+        while len(self.templates) > MAX_TEMPLATES:
+            self.templates.pop(next(iter(self.templates)))
+        self._save()
+
+    def report(self, emit=print):
+        if self.hits or self.misses:
+            emit(f"♻️ 問卷模板快取: 命中 {self.hits} 次、重新分析 {self.misses} 次，已知模板 {len(self.templates)} 種")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+無瀏覽器 HTTP 填寫模式
+登入成功後沿用瀏覽器的 session cookies，直接以 requests 取得問卷列表與表單、
+套用與頁面內填寫相同的作答策略並直接 POST，省去頁面渲染與 WebDriver 往返。
+"""
+
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+import config
+import fill_engine
+import page_parser
+import submission_check
+import page_corpus
+
+
+class HttpFillUnsupported(Exception):
+    """此問卷無法以 HTTP 直接處理，需改走 Selenium 流程"""
+
+
+class HttpQuestionnaireSession:
+    """共用連線池的已登入 HTTP session"""
+
+    def __init__(self, driver, policy=None, corpus=None):
+        self.policy = policy or fill_engine.build_answer_policy()
+        self.corpus = corpus  # 錄製模式的頁面語料 (page_corpus.PageCorpus)
+        self.timeout = config.HTTP_TIMEOUT
+        self.session = requests.Session()
+
+        # ⚡ 連線池重用 TCP/TLS 連線
+        adapter = HTTPAdapter(pool_connections=config.HTTP_POOL_SIZE, pool_maxsize=config.HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # 🍪 沿用瀏覽器登入後的 cookies 與 User-Agent
+        try:
+            self.session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            pass
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+    def _check_page(self, response):
+        response.raise_for_status()
+        if 'UserAccount' in response.text and 'Password' in response.text:
+            raise HttpFillUnsupported("登入狀態未沿用（被導回登入頁）")
+
+    def fetch_questionnaire_list(self, list_url):
+        """以 HTTP 取得並解析問卷列表，回傳 (最終網址, QuestionnaireButton 列表)"""
+        response = self.session.get(list_url, timeout=self.timeout)
+        self._check_page(response)
+        self._capture(page_corpus.LIST, response)
+        return response.url, page_parser.parse_questionnaire_list(response.text)
+
+    def open_questionnaire(self, item, list_url):
+        """依按鈕目標取得問卷表單頁面"""
+        if not item.target_url:
+            raise HttpFillUnsupported("按鈕沒有可直接開啟的網址（僅 onclick）")
+        url = urljoin(list_url, item.target_url)
+        if item.target_method == 'post':
+            response = self.session.post(url, data=item.target_fields, timeout=self.timeout,
+                                         headers={'Referer': list_url})
+        else:
+            response = self.session.get(url, params=item.target_fields or None, timeout=self.timeout,
+                                        headers={'Referer': list_url})
+        self._check_page(response)
+        self._capture(page_corpus.QUESTIONNAIRE, response, item.open_method,
+                      item.target_fields if item.open_method == 'POST' else None)
+        return response
+
+    def _capture(self, kind, response, method='GET', fields=None):
+        if self.corpus:
+            self.corpus.capture(kind, response.url, response.text, method, fields)
+
+    def fill_questionnaire(self, item, list_url):
+        """
+        以 HTTP 填寫並送出一份問卷
+        回傳填寫摘要（含 confirmed 與 outcome）；送出前無法處理時拋出 HttpFillUnsupported。
+        一旦送出過 POST 就一定回傳摘要（即使請求失敗），呼叫端不可再以瀏覽器重送
+        """
+        page = self.open_questionnaire(item, list_url)
+        if 'g-recaptcha' in page.text:
+            raise HttpFillUnsupported("問卷頁面需要 reCAPTCHA")
+
+        form = page_parser.parse_questionnaire_form(page.text)
+        if not form.groups:
+            raise HttpFillUnsupported("問卷頁面找不到題目")
+
+        data, summary = fill_engine.plan_form_answers(form, self.policy)
+        summary['retries'] = 0
+        referer = page.url
+        for attempt in range(config.SUBMIT_RETRIES + 1):
+            try:
+                response = self._submit(form, data, referer)
+            except requests.RequestException as e:
+                # 請求可能已送達伺服器，結果未知
+                summary.update(status=None, outcome=submission_check.FAILED, confirmed=False, error=str(e))
+                break
+            result = submission_check.classify_http(response)
+            self._capture(page_corpus.submission_kind(result.outcome), response, 'POST')
+            summary['status'] = response.status_code
+            summary['outcome'] = result.outcome
+            summary['confirmed'] = result.confirmed
+            if result.outcome != submission_check.REJECTED or attempt == config.SUBMIT_RETRIES:
+                break
+
+            # 伺服器退回: 依錯誤頁面的標記只重填有問題的題組，其餘保留原答案
+            form = page_parser.parse_questionnaire_form(response.text)
+            if not form.errors():
+                break
+            summary['rejected'] = [group.name for group in form.errors()]
+            data, _ = fill_engine.plan_form_answers(form, self.policy, keep_answered=True)
+            summary['retries'] += 1
+            referer = response.url
+        return summary
+
+    def _submit(self, form, data, referer):
+        action = urljoin(referer, form.action or referer)
+        if form.method == 'post':
+            return self.session.post(action, data=data, timeout=self.timeout, headers={'Referer': referer})
+        return self.session.get(action, params=data, timeout=self.timeout, headers={'Referer': referer})
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機 JSON 檔讀寫
+各種快取與紀錄（選擇器統計、模板快取、driver 快取、資源大小、頁面語料索引）共用:
+讀取失敗視為沒有資料；寫入先寫 .tmp 再以 os.replace 取代，中斷時不會留下寫了一半的檔案，
+寫入失敗只記錄警告，不影響填寫流程。
+"""
+
+import json
+import os
+from log_setup import get_logger
+
+
+def load_json(path, default=dict):
+    """讀取 JSON 檔；路徑為空、檔案不存在、格式錯誤或頂層型別不是 default 時回傳 default()"""
+    if not path:
+        return default()
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return default()
+    return data if isinstance(data, default) else default()
+
+
+def save_json(path, data, label, indent=2):
+    """原子寫入 JSON 檔，成功時回傳 True；label 為警告訊息中的資料名稱"""
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, path)
+    except OSError as e:
+        get_logger().warning(f"   ⚠️ {label}寫入失敗: {e}")
+        return False
+    return True
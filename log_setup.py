@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分級記錄
+所有訊息經由 logging 的 'questionnaire' logger 輸出: 主執行緒只把紀錄放進佇列，
+由背景執行緒 (QueueListener) 寫到主控台，Windows 主控台緩慢的輸出不再拖慢填寫流程。
+預設 INFO 等級每份問卷只輸出一行摘要；LOG_LEVEL=DEBUG 顯示逐步驟細節，
+LOG_FILE 可另外把完整 DEBUG 紀錄寫到檔案。
+"""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+import config
+
+LOGGER_NAME = 'questionnaire'
+
+
+def get_logger():
+    return logging.getLogger(LOGGER_NAME)
+
+
+def _level(name):
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def start_logging(level=None, log_file=None, stream=None):
+    """
+    設定 logger 並啟動背景輸出執行緒，回傳 QueueListener（結束時呼叫 stop_logging）
+    已啟動時直接回傳 None，避免重複加入 handler
+    """
+    logger = get_logger()
+    if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+        return None
+
+    console_level = _level(level or config.LOG_LEVEL)
+    log_file = config.LOG_FILE if log_file is None else log_file
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    handlers = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(message)s'))
+        handlers.append(file_handler)
+
+    records = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(records))
+    logger.setLevel(min(handler.level for handler in handlers))
+    logger.propagate = False
+
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener):
+    """輸出佇列中剩餘的紀錄並移除 handler"""
+    if listener is None:
+        return
+    listener.stop()
+    logger = get_logger()
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
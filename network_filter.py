@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+網路請求過濾
+透過 Edge DevTools (Network.setBlockedURLs) 擋下問卷用不到的字型、分析追蹤、媒體等資源，
+並從效能記錄 (performance log) 統計每個頁面被擋下的請求數與省下的流量。
+被擋下的請求不會有回應，省下的位元組以先前實際載入過的同網址大小估算
+（NETWORK_BLOCKING=false 執行一次即可量到），大小記錄於本機 JSON。
+"""
+
+import json
+import re
+from collections import deque
+from urllib.parse import urlsplit
+import config
+from json_store import load_json, save_json
+
+# 本機最多記錄的資源大小筆數
+MAX_SIZES = 500
+
+# 保留最近幾個文件（頁面）回應，供提交結果判定
+MAX_DOCUMENTS = 20
+
+
+def pattern_regex(patterns):
+    """DevTools 封鎖樣式只支援 * 萬用字元，轉成同義的正規表示式"""
+    if not patterns:
+        return None
+    return re.compile('|'.join('^' + '.*'.join(re.escape(part) for part in pattern.split('*')) + '$'
+                               for pattern in patterns))
+
+
+def build_blocklist():
+    """由設定組出封鎖樣式: 基本清單，加上 DISABLE_CSS 與環境變數追加的樣式（圖片已由瀏覽器偏好設定停用）"""
+    patterns = list(config.BLOCKED_URL_PATTERNS)
+    if config.DISABLE_CSS:
+        patterns += config.BLOCKED_CSS_PATTERNS
+    patterns += [pattern.strip() for pattern in config.BLOCKED_URL_PATTERNS_EXTRA.split(',') if pattern.strip()]
+    return list(dict.fromkeys(patterns))
+
+
+def page_key(url):
+    """以路徑彙總頁面（同一種頁面的不同問卷 id 合併）"""
+    parts = urlsplit(url or '')
+    return parts.path or url or '(未知頁面)'
+
+
+class NetworkFilter:
+    def __init__(self, driver, patterns=None, block=None, sizes_path=None):
+        self.driver = driver
+        self.patterns = build_blocklist() if patterns is None else list(patterns)
+        self.block = config.NETWORK_BLOCKING if block is None else block
+        self.matcher = pattern_regex(self.patterns)
+        self.sizes_path = sizes_path if sizes_path is not None else config.NETWORK_SIZES_PATH
+        self.sizes = self._load_sizes()
+        self.requests = {}  # requestId → (網址, 所屬頁面)
+        self.pages = {}     # 頁面 → {'loads', 'blocked', 'bytes', 'unknown', 'blockable', 'blockable_bytes'}
+        self.pending_documents = {}                      # requestId → 進行中的文件請求
+        self.documents = deque(maxlen=MAX_DOCUMENTS)     # {'method', 'url', 'status', 'redirects', 'error', 'webview'}
+        self.document_count = 0
+        self.active = False
+        self.logging = False
+
+    # ---------- 安裝 ----------
+
+    def install(self):
+        """啟用封鎖；driver 不支援 DevTools 時回傳 False 並略過"""
+        execute_cdp_cmd = getattr(self.driver, 'execute_cdp_cmd', None)
+        if execute_cdp_cmd is None or not self.patterns:
+            return False
+        try:
+            execute_cdp_cmd('Network.enable', {})
+            if self.block:
+                execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+        except Exception:
+            return False
+        self.active = True
+        self.logging = True
+        return True
+
+    # ---------- 效能記錄 ----------
+
+    def collect(self):
+        """讀取並清空 driver 的效能記錄，累計各頁面的封鎖統計"""
+        if not self.active or not self.logging:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            self.logging = False  # 未啟用 ms:loggingPrefs
+            return
+        learned = False
+        for entry in entries:
+            try:
+                payload = json.loads(entry['message'])
+                message = payload['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            learned = self._handle(message.get('method'), message.get('params') or {},
+                                   payload.get('webview')) or learned
+        if learned:
+            self._save_sizes()
+
+    def _page(self, key):
+        return self.pages.setdefault(key, {'loads': 0, 'blocked': 0, 'bytes': 0, 'unknown': 0,
+                                           'blockable': 0, 'blockable_bytes': 0})
+
+    def _handle(self, method, params, webview=None):
+        """處理一個 DevTools 事件；學到新的資源大小時回傳 True（webview 為事件所屬分頁）"""
+        if method == 'Network.requestWillBeSent':
+            request = params.get('request') or {}
+            document = params.get('documentURL') or request.get('url')
+            self.requests[params.get('requestId')] = (request.get('url', ''), page_key(document))
+            if params.get('type') == 'Document':
+                self._page(page_key(request.get('url')))['loads'] += 1
+                self._track_document(params.get('requestId'), request, params.get('redirectResponse'), webview)
+
+        elif method == 'Network.responseReceived' and params.get('requestId') in self.pending_documents:
+            response = params.get('response') or {}
+            self._finish_document(params['requestId'], status=response.get('status'), url=response.get('url'))
+
+        elif method == 'Network.loadingFailed' and params.get('requestId') in self.pending_documents:
+            self._finish_document(params['requestId'], error=params.get('blockedReason') or params.get('errorText'))
+
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            url, page = self.requests.pop(params.get('requestId'), ('', '(未知頁面)'))
+            stats = self._page(page)
+            stats['blocked'] += 1
+            if url in self.sizes:
+                stats['bytes'] += self.sizes[url]
+            else:
+                stats['unknown'] += 1
+
+        elif method == 'Network.loadingFinished':
+            url, page = self.requests.pop(params.get('requestId'), ('', '(未知頁面)'))
+            if url and self.matcher and self.matcher.match(url):
+                size = int(params.get('encodedDataLength') or 0)
+                stats = self._page(page)
+                stats['blockable'] += 1
+                stats['blockable_bytes'] += size
+                if size and self.sizes.get(url) != size:
+                    self.sizes[url] = size
+                    return True
+        return False
+
+    # ---------- 文件回應 (提交結果判定) ----------
+
+    def _track_document(self, request_id, request, redirect, webview=None):
+        entry = self.pending_documents.get(request_id)
+        if entry is not None and redirect:
+            entry['redirects'].append(redirect.get('status'))  # 同一個 requestId 的轉址
+            entry['url'] = request.get('url', '')
+            return
+        self.pending_documents[request_id] = {'method': request.get('method', 'GET'), 'url': request.get('url', ''),
+                                              'status': None, 'redirects': [], 'error': None, 'webview': webview}
+
+    def _finish_document(self, request_id, status=None, url=None, error=None):
+        entry = self.pending_documents.pop(request_id)
+        entry['status'] = status
+        entry['url'] = url or entry['url']
+        entry['error'] = error
+        self.documents.append(entry)
+        self.document_count += 1
+
+    def mark(self):
+        """記下目前的文件回應數，送出後以 submission_document(mark) 取得之後的回應"""
+        return self.document_count
+
+    def submission_document(self, mark, window=None):
+        """
+        mark 之後送出請求 (POST) 的最終回應，沒有 POST 時取最後一個文件回應
+        window 為送出所在分頁的 handle: 另一個分頁同時載入的頁面（預載的下一份問卷）不列入
+        無效能記錄或送出後沒有新的文件回應時回傳 None
+        """
+        self.collect()
+        if not self.active or not self.logging:
+            return None
+        recent = list(self.documents)[-(self.document_count - mark):] if self.document_count > mark else []
+        if window:
+            # 效能記錄的 webview 即分頁的 target id；舊版 driver 的 handle 可能另有前綴
+            recent = [entry for entry in recent
+                      if not entry.get('webview') or entry['webview'].lower() in window.lower()]
+        posts = [entry for entry in recent if entry['method'] == 'POST']
+        return (posts or recent or [None])[-1]
+
+    # ---------- 資源大小紀錄 ----------
+
+    def _load_sizes(self):
+        return load_json(self.sizes_path)
+
+    def _save_sizes(self):
+        if not self.sizes_path:
+            return
+        while len(self.sizes) > MAX_SIZES:
+            self.sizes.pop(next(iter(self.sizes)))
+        save_json(self.sizes_path, self.sizes, "資源大小紀錄")
+
+    # ---------- 報告 ----------
+
+    def report(self, emit=print):
+        """輸出每個頁面被擋下的請求數與省下的流量"""
+        self.collect()
+        if not self.active:
+            return
+        if not self.logging:
+            emit(f"🚫 網路封鎖: {len(self.patterns)} 個樣式 (driver 未提供效能記錄，無法統計)")
+            return
+
+        if self.block:
+            blocked = sum(stats['blocked'] for stats in self.pages.values())
+            saved = sum(stats['bytes'] for stats in self.pages.values())
+            emit(f"🚫 網路封鎖: 擋下 {blocked} 個請求，省下約 {saved / 1024:.1f} KB")
+            for page, stats in sorted(self.pages.items(), key=lambda item: -item[1]['blocked']):
+                if not stats['blocked']:
+                    continue
+                loads = max(stats['loads'], 1)
+                unknown = f"，{stats['unknown']} 個大小未知" if stats['unknown'] else ''
+                emit(f"   {page}: 每頁 {stats['blocked'] / loads:.1f} 個請求、"
+                     f"{stats['bytes'] / loads / 1024:.1f} KB (載入 {stats['loads']} 次{unknown})")
+        else:
+            blockable = sum(stats['blockable'] for stats in self.pages.values())
+            blockable_bytes = sum(stats['blockable_bytes'] for stats in self.pages.values())
+            emit(f"🚫 網路封鎖已停用: 符合封鎖樣式的請求 {blockable} 個，共 {blockable_bytes / 1024:.1f} KB")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面語料庫 (錄製與重播)
+CORPUS_CAPTURE=true 時把實際執行經過的問卷列表、各份問卷、成功頁與退回頁存到本機資料夾，
+存檔前移除帳號、密碼、驗證 token 與 email，網站位址改成相對路徑。
+CorpusSite 以與 FixtureSite 相同的 handle() 介面重播這些頁面，可交給假 driver 或本機 HTTP 伺服器，
+問卷未開放的期間也能以真實頁面測試解析、作答計畫與填寫流程的效能。
+
+使用方式:
+    set CORPUS_CAPTURE=true & python auto_questionnaire.py    # 錄製
+    python page_corpus.py bench                              # 解析與作答計畫的效能
+    python page_corpus.py serve --port 8765                  # 以 HTTP 重播 (CEQ_BASE_URL 指向它)
+    python benchmark.py --backend fake --corpus page_corpus  # 以重播頁面跑完整流程
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+import config
+import fill_engine
+import page_parser
+import submission_check
+from fixture_server import SESSION_COOKIE, FixtureServer, FixtureSite
+from json_store import load_json, save_json
+from log_setup import get_logger
+
+# 頁面種類
+LIST = 'list'
+QUESTIONNAIRE = 'questionnaire'
+SUCCESS = 'success'
+REJECTED = 'rejected'
+FAILED = 'failed'
+
+INDEX_FILE = 'index.json'
+REDACTED = '[已移除]'
+
+# 學號格式（英文字母加 9 位數字）與 email
+ACCOUNT_PATTERN = re.compile(r'(?<![A-Za-z0-9])[A-Za-z]\d{9}(?![0-9])')
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+INPUT_TAG = re.compile(r'<input\b[^>]*>', re.IGNORECASE)
+SECRET_INPUT = re.compile(r'''name\s*=\s*["']?(UserAccount|Password|__RequestVerificationToken)\b''', re.IGNORECASE)
+VALUE_ATTRIBUTE = re.compile(r'''(\bvalue\s*=\s*)("[^"]*"|'[^']*'|[^\s>]+)''', re.IGNORECASE)
+
+
+def submission_kind(outcome):
+    """提交結果 (submission_check) 對應的頁面種類"""
+    return {submission_check.CONFIRMED: SUCCESS, submission_check.REJECTED: REJECTED}.get(outcome, FAILED)
+
+
+def _blank_secret_input(match):
+    tag = match.group(0)
+    if not SECRET_INPUT.search(tag):
+        return tag
+    return VALUE_ATTRIBUTE.sub(r'\1""', tag)
+
+
+def redact(text, extra_terms=()):
+    """移除帳號識別資訊，保留其餘標記原樣（不重新序列化 HTML）"""
+    text = INPUT_TAG.sub(_blank_secret_input, text or '')
+    text = text.replace(config.BASE_URL, '')
+    for term in (config.STUDENT_ID, config.PASSWORD, *extra_terms):
+        if term:
+            text = re.sub(re.escape(term), REDACTED, text, flags=re.IGNORECASE)
+    text = ACCOUNT_PATTERN.sub('X000000000', text)
+    return EMAIL_PATTERN.sub(REDACTED, text)
+
+
+def relative_url(url):
+    """只保留路徑與查詢字串"""
+    parts = urlsplit(url or '')
+    return parts.path + (f"?{parts.query}" if parts.query else '')
+
+
+class PageCorpus:
+    """資料夾內的 pages/*.html 與 index.json（每頁的種類、網址、方法與內容雜湊）"""
+
+    def __init__(self, path=None, extra_terms=None):
+        self.path = path or config.CORPUS_DIR
+        self.extra_terms = [term.strip() for term in (extra_terms if extra_terms is not None
+                                                      else config.CORPUS_REDACT.split(',')) if term.strip()]
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.captured = 0
+
+    def _load(self):
+        return load_json(os.path.join(self.path, INDEX_FILE), list)
+
+    def _save_index(self):
+        return save_json(os.path.join(self.path, INDEX_FILE), self.entries, "頁面語料索引")
+
+    def capture(self, kind, url, html, method='GET', fields=None):
+        """
+        保存一個頁面；內容相同的頁面只保存一次。回傳是否新增
+        fields 為以 POST 開啟問卷時送出的欄位，重播時用來分辨「開啟問卷」與「送出問卷」
+        """
+        html = redact(html, self.extra_terms)
+        url = redact(relative_url(url), self.extra_terms)
+        digest = hashlib.sha1(html.encode('utf-8')).hexdigest()[:12]
+        with self.lock:
+            if any(entry['sha'] == digest for entry in self.entries):
+                return False
+            filename = f"{kind}-{digest}.html"
+            try:
+                os.makedirs(os.path.join(self.path, 'pages'), exist_ok=True)
+                with open(os.path.join(self.path, 'pages', filename), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                entry = {'kind': kind, 'url': url, 'method': method, 'file': filename,
+                         'sha': digest, 'captured': time.strftime('%Y-%m-%d %H:%M:%S')}
+                if fields:
+                    entry['fields'] = {name: redact(str(value), self.extra_terms) for name, value in fields.items()}
+                self.entries.append(entry)
+            except OSError as e:
+                get_logger().warning(f"   ⚠️ 無法寫入頁面語料: {e}")
+                return False
+            if not self._save_index():
+                return False
+            self.captured += 1
+            return True
+
+    def pages(self, kind=None):
+        """回傳 [(紀錄, HTML)]"""
+        result = []
+        for entry in self.entries:
+            if kind and entry['kind'] != kind:
+                continue
+            try:
+                with open(os.path.join(self.path, 'pages', entry['file']), encoding='utf-8') as f:
+                    result.append((entry, f.read()))
+            except OSError:
+                continue
+        return result
+
+    def report(self, emit=print):
+        if self.captured:
+            emit(f"📼 頁面語料: 本次新增 {self.captured} 頁，共 {len(self.entries)} 頁 ({self.path})")
+
+
+class CorpusSite:
+    """
+    以錄製的頁面重播問卷站，介面與 FixtureSite 相同（handle / latency_for / completed / courses）
+    登入頁與主頁沿用測試站的頁面；GET 依路徑與查詢字串找錄製的頁面。
+    POST 的欄位都屬於某份以 POST 開啟的問卷（錄製的 fields）時回傳該問卷，其餘 POST 視為送出，回傳錄製的成功頁
+    """
+
+    def __init__(self, corpus, latency=None):
+        self.corpus = corpus if isinstance(corpus, PageCorpus) else PageCorpus(corpus)
+        self.fixture = FixtureSite(questionnaires=0)
+        self.latency = dict(latency or {})
+        self.pages = {}   # (路徑, 查詢參數) → HTML
+        self.post_pages = {}  # 路徑 → [(開啟時的欄位, 鍵, HTML)]
+        self.success_pages = []
+        self.courses = []
+        for entry, html in self.corpus.pages():
+            parts = urlsplit(entry['url'])
+            if entry['kind'] == SUCCESS:
+                self.success_pages.append(html)
+            elif entry['method'] == 'POST' and entry['kind'] == QUESTIONNAIRE:
+                fields = entry.get('fields', {})
+                key = ('POST', parts.path, tuple(sorted(fields.items())))
+                self.post_pages.setdefault(parts.path, []).append((fields, key, html))
+                if key not in self.courses:
+                    self.courses.append(key)
+            elif entry['method'] == 'GET' and entry['kind'] in (LIST, QUESTIONNAIRE):
+                key = self._key(parts.path, parse_qs(parts.query))
+                self.pages.setdefault(key, html)
+                if entry['kind'] == QUESTIONNAIRE and key not in self.courses:
+                    self.courses.append(key)
+        list_urls = [entry['url'] for entry in self.corpus.entries if entry['kind'] == LIST]
+        self.list_path = urlsplit(list_urls[0]).path if list_urls else urlsplit(config.QUESTIONNAIRE_LIST_URL).path
+        self.completed = set()
+        self.last_questionnaire = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(path, query):
+        return path.rstrip('/') or '/', tuple(sorted((name, tuple(values)) for name, values in (query or {}).items()))
+
+    def latency_for(self, path):
+        return self.latency.get(path, self.latency.get('*', 0))
+
+    def _opened_by_post(self, path, form):
+        """POST 開啟問卷時回傳錄製的 (鍵, HTML)；多出錄製時沒有的欄位（作答內容）即為送出，回傳 None"""
+        fallback = None
+        for fields, key, html in self.post_pages.get(path, []):
+            if set(form) - set(fields):
+                continue
+            if all((form.get(name) or [''])[0] == value for name, value in fields.items()):
+                return key, html
+            fallback = fallback or (key, html)
+        return fallback
+
+    def handle(self, method, path, query=None, form=None, cookies=None):
+        if path in ('/', '/Home'):
+            if method == 'POST':
+                return 302, {'Location': '/Main', 'Set-Cookie': f"{SESSION_COOKIE}=replay; Path=/"}, ''
+            return 200, {}, self.fixture.login_page()
+        if path == '/Main':
+            return 200, {}, self.fixture.main_page().replace('/StuFillIn', self.list_path)
+
+        opened = self._opened_by_post(path, form or {}) if method == 'POST' else None
+        if opened:
+            with self.lock:
+                self.last_questionnaire = opened[0]
+            return 200, {}, opened[1]
+
+        if method == 'POST':
+            with self.lock:
+                if self.last_questionnaire is not None:
+                    self.completed.add(self.last_questionnaire)
+            if self.success_pages:
+                return 200, {}, self.success_pages[0]
+            return 200, {}, self.fixture.success_page()
+
+        key = self._key(path, query)
+        html = self.pages.get(key)
+        if html is None:
+            return 404, {}, self.fixture.page("404", "<p>語料中沒有這個頁面</p>")
+        if key in self.courses:
+            with self.lock:
+                self.last_questionnaire = key
+        return 200, {}, html
+
+
+# ---------- 離線效能測試 ----------
+
+def _time(func, repeat):
+    samples = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), value
+
+
+def bench(corpus, repeat=5, emit=print):
+    """以錄製的頁面測量列表解析、表單解析與作答計畫的耗時（取中位數）"""
+    policy = fill_engine.build_answer_policy()
+    results = {LIST: [], QUESTIONNAIRE: []}
+    for entry, html in corpus.pages(LIST):
+        seconds, buttons = _time(lambda: page_parser.parse_questionnaire_list(html), repeat)
+        results[LIST].append({'file': entry['file'], 'bytes': len(html), 'buttons': len(buttons),
+                              'parse': seconds})
+    for entry, html in corpus.pages(QUESTIONNAIRE):
+        parse_seconds, form = _time(lambda: page_parser.parse_questionnaire_form(html), repeat)
+        plan_seconds, _ = _time(lambda: fill_engine.plan_form_answers(form, policy), repeat)
+        results[QUESTIONNAIRE].append({'file': entry['file'], 'bytes': len(html), 'groups': len(form.groups),
+                                       'parse': parse_seconds, 'plan': plan_seconds})
+
+    for entry in results[LIST]:
+        emit(f"   📋 {entry['file']:40s} {entry['bytes'] / 1024:7.1f} KB  {entry['buttons']:4d} 按鈕  "
+             f"解析 {entry['parse'] * 1000:7.2f} ms")
+    for entry in results[QUESTIONNAIRE]:
+        emit(f"   📝 {entry['file']:40s} {entry['bytes'] / 1024:7.1f} KB  {entry['groups']:4d} 題組  "
+             f"解析 {entry['parse'] * 1000:7.2f} ms  計畫 {entry['plan'] * 1000:7.2f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="頁面語料庫: 離線效能測試與重播")
+    parser.add_argument('command', choices=['bench', 'serve', 'list'])
+    parser.add_argument('path', nargs='?', default=None, help="語料資料夾（預設 CORPUS_DIR）")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    corpus = PageCorpus(args.path)
+    if not corpus.entries:
+        print(f"⚠️ 語料庫是空的: {corpus.path}（以 CORPUS_CAPTURE=true 執行一次即可錄製）")
+        return 1
+
+    if args.command == 'list':
+        for entry in corpus.entries:
+            print(f"   {entry['kind']:13s} {entry['method']:4s} {entry['url']:50s} {entry['file']}")
+        return 0
+
+    if args.command == 'bench':
+        print(f"⏱️ 頁面語料效能 ({len(corpus.entries)} 頁，每項 {args.repeat} 次取中位數)")
+        bench(corpus, args.repeat)
+        return 0
+
+    server = FixtureServer(CorpusSite(corpus), args.host, args.port)
+    print(f"📼 重播伺服器已啟動: {server.base_url}")
+    print(f"   設定 CEQ_BASE_URL={server.base_url} 後執行 auto_questionnaire.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🔚 重播伺服器已關閉")
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
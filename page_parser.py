@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面分析層
+只取一次 page_source，以 BeautifulSoup 在記憶體中建立按鈕、題組與選項的模型，
+不再逐一元素向 WebDriver 讀取 text / value / class / onclick。
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+from bs4 import BeautifulSoup
+
+# 問卷按鈕文字
+BUTTON_KEYWORD = "填寫問卷"
+BUTTON_MARKER = "Start"
+
+# 🎯 與 _is_button_candidate 對應的 XPath，文件順序相同，供即時 driver 一次取回所有候選元素
+BUTTON_CANDIDATES_XPATH = (
+    "//*[self::button or self::input or self::a]"
+    f"[contains(normalize-space(.),'{BUTTON_KEYWORD}') or contains(@value,'{BUTTON_KEYWORD}')]"
+)
+
+# onclick 中的跳轉網址: location.href='...' / location='...' / window.open('...')
+ONCLICK_URL_PATTERN = re.compile(
+    r"""(?:location(?:\.href)?\s*=\s*|location\.(?:assign|replace)\(\s*|window\.open\(\s*)['"]([^'"]+)['"]"""
+)
+
+# 每次產生列表都會改變的隱藏欄位（防偽 token、ASP.NET 狀態欄位等），不列入問卷識別碼
+VOLATILE_FIELD_PATTERN = re.compile(r'^__|token|csrf|xsrf|nonce|timestamp', re.IGNORECASE)
+
+# 文字欄位排除帳號密碼
+EXCLUDED_TEXT_NAMES = ('UserAccount', 'Password')
+
+
+@dataclass
+class QuestionnaireButton:
+    """問卷列表上的一個「填寫問卷(Start)」按鈕"""
+    index: int                 # 在 BUTTON_CANDIDATES_XPATH 結果中的位置
+    text: str
+    tag: str
+    css_class: str = ''
+    onclick: str = ''
+    target_url: str = ''       # 由 form action / onclick / href 取得的問卷網址
+    target_method: str = 'get'
+    target_fields: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def open_method(self):
+        """開啟問卷的 HTTP 方法（只有 onclick 時無從得知，視為 GET）"""
+        return self.target_method.upper() if self.target_url else 'GET'
+
+    @property
+    def identity_fields(self):
+        """識別問卷的欄位: target_fields 去掉每次載入都會改變的欄位"""
+        return {name: value for name, value in self.target_fields.items() if not VOLATILE_FIELD_PATTERN.search(name)}
+
+    @property
+    def key(self):
+        """問卷的穩定識別碼，不隨列表順序或重新載入改變"""
+        if self.target_url:
+            key = f"{self.target_method.upper()} {self.target_url}"
+            fields = self.identity_fields
+            if fields:
+                key += "?" + urlencode(sorted(fields.items()))
+            return key
+        if self.onclick:
+            return f"onclick:{self.onclick}"
+        return f"button:{self.index}"
+
+
+@dataclass
+class QuestionGroup:
+    """一個題組: 同名的單選/複選、一個下拉選單或一個文字欄位"""
+    name: str
+    kind: str                  # radio / checkbox / select / text
+    options: List[str] = field(default_factory=list)
+    required: bool = False
+    value: str = ''            # 文字欄位或下拉選單目前的值
+    hint: str = ''             # 文字欄位附近的提示文字（用於判斷「請填寫原因」）
+    selected: List[str] = field(default_factory=list)  # 單選/複選目前已勾選的值
+    error: bool = False        # 伺服器退回時標記為錯誤的欄位
+
+
+@dataclass
+class QuestionnaireForm:
+    """問卷表單模型"""
+    action: str = ''
+    method: str = 'post'
+    hidden: Dict[str, str] = field(default_factory=dict)
+    groups: List[QuestionGroup] = field(default_factory=list)
+    submit_name: Optional[str] = None
+    submit_value: Optional[str] = None
+
+    def errors(self):
+        return [group for group in self.groups if group.error]
+
+
+def _soup(html):
+    return BeautifulSoup(html or '', 'html.parser')
+
+
+def _element_text(element):
+    return element.get_text(" ", strip=True) or element.get('value') or ''
+
+
+def _class_string(element):
+    css_class = element.get('class') or []
+    return ' '.join(css_class) if isinstance(css_class, list) else str(css_class)
+
+
+def _is_button_candidate(element):
+    if element.name not in ('button', 'input', 'a'):
+        return False
+    return BUTTON_KEYWORD in ' '.join(element.get_text().split()) or BUTTON_KEYWORD in (element.get('value') or '')
+
+
+def _form_fields(form):
+    fields = {}
+    for hidden in form.find_all('input', attrs={'type': 'hidden'}):
+        if hidden.get('name'):
+            fields[hidden['name']] = hidden.get('value') or ''
+    return fields
+
+
+def _button_target(element, form):
+    """找出按鈕開啟的問卷網址，回傳 (url, method, fields)"""
+    if form is not None:
+        fields = _form_fields(form)
+        if element.get('name'):
+            fields[element['name']] = element.get('value') or ''
+        return form.get('action') or '', (form.get('method') or 'get').lower(), fields
+    match = ONCLICK_URL_PATTERN.search(element.get('onclick') or '')
+    if match:
+        return match.group(1), 'get', {}
+    href = element.get('href') or ''
+    if href and not href.startswith(('#', 'javascript:')):
+        return href, 'get', {}
+    return '', 'get', {}
+
+
+def parse_questionnaire_list(html):
+    """解析問卷列表頁，回傳 QuestionnaireButton 列表"""
+    soup = _soup(html)
+    buttons = []
+    candidates = [element for element in soup.find_all(True) if _is_button_candidate(element)]
+    for index, element in enumerate(candidates):
+        text = _element_text(element)
+        if BUTTON_KEYWORD not in text or BUTTON_MARKER not in text:
+            continue
+        target_url, target_method, target_fields = _button_target(element, element.find_parent('form'))
+        buttons.append(QuestionnaireButton(
+            index=index,
+            text=text,
+            tag=element.name,
+            css_class=_class_string(element),
+            onclick=element.get('onclick') or '',
+            target_url=target_url,
+            target_method=target_method,
+            target_fields=target_fields
+        ))
+    return buttons
+
+
+def _error_names(soup):
+    """伺服器退回時的錯誤標記 (ASP.NET MVC 的 data-valmsg-for / field-validation-error)"""
+    names = set()
+    for marker in soup.select('[data-valmsg-for], .field-validation-error'):
+        target = marker.get('data-valmsg-for')
+        if target and marker.get_text(strip=True):
+            names.add(target)
+    for control in soup.select('.input-validation-error[name]'):
+        names.add(control['name'])
+    return names
+
+
+def _main_form(soup):
+    """選出包含最多題目的 form；沒有 form 時以整份文件為範圍"""
+    forms = soup.find_all('form')
+    if not forms:
+        return None, soup
+    best = max(forms, key=lambda form: len(form.find_all(['input', 'select', 'textarea'])))
+    return best, best
+
+
+def parse_questionnaire_form(html):
+    """解析問卷填寫頁，回傳 QuestionnaireForm"""
+    soup = _soup(html)
+    form, scope = _main_form(soup)
+    model = QuestionnaireForm()
+    if form is not None:
+        model.action = form.get('action') or ''
+        model.method = (form.get('method') or 'post').lower()
+        model.hidden = _form_fields(form)
+
+    errors = _error_names(soup)
+    grouped = {}
+    for element in scope.find_all(['input', 'select', 'textarea']):
+        input_type = (element.get('type') or 'text').lower() if element.name == 'input' else element.name
+        name = element.get('name')
+
+        if input_type in ('radio', 'checkbox'):
+            if not name:
+                continue
+            key = (input_type, name)
+            if key not in grouped:
+                grouped[key] = QuestionGroup(name=name, kind=input_type)
+                model.groups.append(grouped[key])
+            group = grouped[key]
+            group.options.append(element.get('value') or 'on')
+            group.required = group.required or element.has_attr('required')
+            if element.has_attr('checked'):
+                group.selected.append(element.get('value') or 'on')
+
+        elif input_type == 'select':
+            options = [option.get('value', option.get_text(strip=True)) for option in element.find_all('option')]
+            selected = element.find('option', selected=True)
+            model.groups.append(QuestionGroup(
+                name=name or '',
+                kind='select',
+                options=options,
+                required=element.has_attr('required'),
+                value=(selected.get('value', selected.get_text(strip=True)) if selected else '')
+            ))
+
+        elif input_type in ('text', 'textarea'):
+            if name and any(excluded in name for excluded in EXCLUDED_TEXT_NAMES):
+                continue
+            container = element.parent.parent if element.parent is not None else None
+            model.groups.append(QuestionGroup(
+                name=name or '',
+                kind='text',
+                required=element.has_attr('required'),
+                value=element.get_text() if element.name == 'textarea' else (element.get('value') or ''),
+                hint=container.get_text(" ", strip=True) if container is not None else ''
+            ))
+
+        elif input_type == 'submit' and model.submit_name is None:
+            model.submit_name = name or ''
+            model.submit_value = element.get('value') or ''
+
+    if model.submit_name is None:
+        button = scope.find('button', attrs={'type': 'submit'})
+        if button is not None:
+            model.submit_name = button.get('name') or ''
+            model.submit_value = button.get('value') or button.get_text(strip=True)
+
+    for group in model.groups:
+        group.error = group.name in errors
+    return model
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+取樣分析
+以背景執行緒定時取樣各執行緒的呼叫堆疊，輸出 collapsed stack（flamegraph.pl、speedscope 可直接開啟），
+並把時間分成四類: 刻意的 time.sleep、等待 WebDriver 回應（HTTP 往返與 WebDriverWait 輪詢）、
+Python CPU，以及等待其他執行緒或網路 (requests)。
+sleep 與 WebDriver 由包住 time.sleep 與 RemoteConnection._request 的標記判定，不靠猜測堆疊；
+用來判斷某段 Python 迴圈的最佳化相對於等待時間是否值得。
+
+使用方式:
+    python auto_questionnaire.py --profile                 # 輸出 profile.folded 與 profile.txt
+    python auto_questionnaire.py --profile run.folded      # 指定檔名
+"""
+
+import os
+import sys
+import threading
+import time
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+import config
+from fake_driver import FakeDriver
+
+SLEEP = 'sleep'
+WEBDRIVER = 'webdriver'
+CPU = 'cpu'
+WAITING = 'waiting'
+
+BUCKET_LABELS = {
+    SLEEP: '刻意等待 (time.sleep)',
+    WEBDRIVER: '等待 WebDriver 回應',
+    CPU: 'Python CPU',
+    WAITING: '等待其他執行緒 / 網路',
+}
+
+# 堆疊最內層的 Python 函式位於這些模組時，執行緒是阻塞在 C 層的鎖或 socket 上而不是在執行 Python
+BLOCKING_MODULES = ('threading.py', 'queue.py', 'socket.py', 'ssl.py', 'selectors.py', os.path.join('http', 'client.py'))
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_DEPTH = 128
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=None, project_dir=PROJECT_DIR):
+        self.interval = interval or config.PROFILE_INTERVAL
+        self.project_dir = os.path.normcase(project_dir)
+        self.own_file = os.path.normcase(os.path.abspath(__file__))
+        self.states = {}     # 執行緒 id → 標記堆疊 (sleep / webdriver)
+        self.stacks = {}     # collapsed stack → 取樣數
+        self.buckets = {}    # (執行緒名稱, 類別) → 秒數
+        self.inclusive = {}  # 專案內函式 → {類別: 秒數}
+        self.samples = 0
+        self.wall_seconds = 0.0
+        self.main_ident = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = None
+        self._patched = []
+
+    # ---------- 標記 ----------
+
+    def _mark(self, state, func):
+        states = self.states
+
+        def wrapper(*args, **kwargs):
+            stack = states.setdefault(threading.get_ident(), [])
+            stack.append(state)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+
+        return wrapper
+
+    def _patch(self, owner, name, wrapper):
+        self._patched.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, wrapper)
+
+    def _install(self):
+        original_sleep = time.sleep
+        mark_sleep = self._mark(SLEEP, original_sleep)
+        mark_wait = self._mark(WEBDRIVER, original_sleep)
+
+        def sleep(seconds):
+            # WebDriverWait 的輪詢間隔算在等待 WebDriver，不算刻意等待
+            caller = sys._getframe(1).f_code.co_filename
+            return (mark_wait if 'selenium' in caller else mark_sleep)(seconds)
+
+        self._patch(time, 'sleep', sleep)
+        self._patch(RemoteConnection, '_request', self._mark(WEBDRIVER, RemoteConnection._request))
+        # 假 driver 以函式呼叫代替 HTTP 往返，同樣算在 WebDriver（須在建立 driver 前替換）
+        self._patch(FakeDriver, 'execute', self._mark(WEBDRIVER, FakeDriver.execute))
+
+    def _uninstall(self):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+
+    # ---------- 取樣 ----------
+
+    def start(self):
+        self._install()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._uninstall()
+        self.wall_seconds = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        wait = self._stop.wait
+        last = time.perf_counter()
+        while not wait(self.interval):
+            # 以實際間隔加權: 負載高時取樣變慢也不會低估時間
+            now = time.perf_counter()
+            weight, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._sample(ident, names.get(ident, str(ident)), frame, weight)
+
+    def _sample(self, ident, thread_name, frame, weight):
+        codes = []
+        while frame is not None and len(codes) < MAX_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        # 只統計執行到專案程式碼的執行緒（略過記錄輸出等背景執行緒）
+        if not any(os.path.normcase(code.co_filename).startswith(self.project_dir) for code in codes):
+            return
+
+        marks = self.states.get(ident)
+        if marks:
+            bucket = marks[0]  # 最外層的標記為準: 假 driver 內模擬延遲的 sleep 仍算 WebDriver
+        elif codes and os.path.normcase(codes[-1].co_filename).endswith(BLOCKING_MODULES):
+            bucket = WAITING
+        else:
+            bucket = CPU
+
+        labels = [_frame_label(code) for code in codes]
+        if bucket != CPU:
+            labels.append(f"[{bucket}]")
+        key = ';'.join([thread_name] + labels)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+        bucket_key = (thread_name if ident == self.main_ident else '工作執行緒', bucket)
+        self.buckets[bucket_key] = self.buckets.get(bucket_key, 0) + weight
+        for label in {_frame_label(code) for code in codes if code.co_name != '<module>' and
+                      os.path.normcase(code.co_filename).startswith(self.project_dir) and
+                      os.path.normcase(code.co_filename) != self.own_file}:
+            entry = self.inclusive.setdefault(label, {})
+            entry[bucket] = entry.get(bucket, 0) + weight
+        self.samples += 1
+
+    # ---------- 輸出 ----------
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def summary(self, top=None):
+        """回傳摘要文字的各行: 各執行緒的時間分類與 CPU 最多的專案函式"""
+        top = top or config.PROFILE_TOP
+        lines = [f"🔬 取樣分析: 牆鐘 {self.wall_seconds:.2f} 秒，{self.samples} 個取樣，"
+                 f"間隔 {self.interval * 1000:.0f} ms"]
+        threads = []
+        for thread_name, _ in self.buckets:
+            if thread_name not in threads:
+                threads.append(thread_name)
+        for thread_name in threads:
+            seconds = {bucket: self.buckets.get((thread_name, bucket), 0) for bucket in BUCKET_LABELS}
+            total = sum(seconds.values()) or 1
+            lines.append(f"   {thread_name} (合計 {total:.2f} 秒):")
+            for bucket, label in BUCKET_LABELS.items():
+                lines.append(f"      {label:24s} {seconds[bucket]:8.2f} 秒 {seconds[bucket] / total:6.1%}")
+
+        functions = sorted(self.inclusive.items(), key=lambda item: -item[1].get(CPU, 0))
+        functions = [(name, buckets) for name, buckets in functions if buckets.get(CPU)][:top]
+        if functions:
+            lines.append("   Python CPU 最多的函式 (含呼叫的函式；另列同一函式內的等待):")
+            for name, buckets in functions:
+                waits = '，'.join(f"{BUCKET_LABELS[bucket]} {buckets[bucket]:.2f}"
+                                 for bucket in (SLEEP, WEBDRIVER, WAITING) if buckets.get(bucket))
+                lines.append(f"      {name:48s} CPU {buckets[CPU]:7.2f} 秒"
+                             f"{'  (' + waits + ')' if waits else ''}")
+        return lines
+
+    def write(self, path, emit=print):
+        """寫出 collapsed stack (path) 與摘要 (同名 .txt)，並輸出摘要"""
+        self.write_collapsed(path)
+        lines = self.summary()
+        summary_path = os.path.splitext(path)[0] + '.txt'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        for line in lines:
+            emit(line)
+        emit(f"🔬 取樣結果已匯出: {path}（flamegraph.pl / speedscope）、{summary_path}")
+
+
+def profile(func, path, interval=None, emit=print):
+    """在取樣分析下執行 func，結束後（包含例外）寫出結果"""
+    profiler = SamplingProfiler(interval).start()
+    try:
+        return func()
+    finally:
+        profiler.stop()
+        profiler.write(path, emit)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+頁面就緒等待
+以事件條件取代固定 sleep: 頁面一就緒立即返回，
+ULTRA_SPEED_CONFIG 中的等待秒數只作為上限，並記錄每次實際等待時間。
+"""
+
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+import config
+
+# 表單控制項已出現（問卷頁可開始填寫）
+FORM_CONTROLS_SCRIPT = """
+return document.readyState !== 'loading' &&
+    !!document.querySelector("input[type='radio'], input[type='checkbox'], select, textarea");
+"""
+
+# 點擊送出並標記目前的文件: 標記只存在於原本的問卷頁，送出後載入的新文件沒有標記
+SUBMIT_CLICK_SCRIPT = "window.__ceqSubmitPending = true; arguments[0].click();"
+
+# 送出後的結果頁已出現: 'rejected' (伺服器退回的錯誤標記)、'success' (感謝頁)，
+# 仍是原本的問卷頁或載入中時為 false；錯誤標記先判定，退回的問卷頁文字本身可能含「感謝」
+SUBMISSION_PAGE_SCRIPT = """
+if (window.__ceqSubmitPending || document.readyState === 'loading' || !document.body) return false;
+if (document.querySelector('.field-validation-error, .input-validation-error, .validation-summary-errors'))
+    return 'rejected';
+var text = document.body.innerText || '';
+if (text.indexOf('感謝') >= 0 || text.indexOf('謝謝') >= 0 ||
+        document.title.indexOf('成功') >= 0 || document.title.indexOf('完成') >= 0 ||
+        location.href.toLowerCase().indexOf('success') >= 0) return 'success';
+return false;
+"""
+
+
+class PageReadiness:
+    """事件驅動的就緒等待，並統計每次等待實際花費的時間"""
+
+    def __init__(self, driver, poll_interval=None, tracer=None):
+        self.driver = driver
+        self.tracer = tracer
+        self.poll_interval = poll_interval or config.READY_POLL_INTERVAL
+        self.timings = []  # (標籤, 實際秒數, 是否在上限內就緒)
+
+    def _wait(self, label, condition, timeout):
+        """等待 condition 成立，回傳其值（逾時為 False）"""
+        start = time.time()
+        trace_start = self.tracer.now() if self.tracer else 0
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(condition)
+        except TimeoutException:
+            result = False
+        ready = bool(result)
+        elapsed = time.time() - start
+        self.timings.append((label, elapsed, ready))
+        if self.tracer:
+            self.tracer.add_complete(f"wait:{label}", trace_start, elapsed * 1e6, ready=ready, limit=timeout)
+        return result
+
+    def _script(self, script):
+        def condition(driver):
+            try:
+                return driver.execute_script(script)
+            except WebDriverException:
+                return False  # 頁面切換中，下一輪再試
+        return condition
+
+    def document_ready(self, label, timeout):
+        """等待 document.readyState 脫離 loading（配合 eager 載入策略）"""
+        return self._wait(label, self._script("return document.readyState !== 'loading';"), timeout)
+
+    def url_changes(self, old_url, label, timeout):
+        """等待網址改變且新頁面已可操作"""
+        def condition(driver):
+            try:
+                return driver.current_url != old_url and driver.execute_script(
+                    "return document.readyState !== 'loading';")
+            except WebDriverException:
+                return False
+        return self._wait(label, condition, timeout)
+
+    def url_contains(self, fragment, label, timeout):
+        """等待網址包含指定片段且頁面已可操作"""
+        def condition(driver):
+            try:
+                return fragment in driver.current_url and driver.execute_script(
+                    "return document.readyState !== 'loading';")
+            except WebDriverException:
+                return False
+        return self._wait(label, condition, timeout)
+
+    def form_controls(self, label, timeout):
+        """等待問卷表單控制項出現"""
+        return self._wait(label, self._script(FORM_CONTROLS_SCRIPT), timeout)
+
+    def submission_page(self, label, timeout):
+        """
+        等待以 SUBMIT_CLICK_SCRIPT 送出後的結果頁: 先確認已離開原本的文件，
+        成功頁回傳 'success'，出現錯誤標記立即回傳 'rejected'，逾時回傳 False
+        """
+        return self._wait(label, self._script(SUBMISSION_PAGE_SCRIPT), timeout)
+
+    def report(self, emit=print):
+        """輸出各類等待的實際耗時統計"""
+        if not self.timings:
+            return
+        stats = {}
+        for label, elapsed, ready in self.timings:
+            entry = stats.setdefault(label, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            if not ready:
+                entry['timeouts'] += 1
+
+        total = sum(entry['total'] for entry in stats.values())
+        emit(f"⏱️ 就緒等待統計 (共 {total:.2f} 秒):")
+        for label, entry in sorted(stats.items(), key=lambda item: -item[1]['total']):
+            emit(f"   {label}: {entry['count']} 次, 合計 {entry['total']:.2f} 秒, "
+                 f"最長 {entry['max']:.2f} 秒, 逾時 {entry['timeouts']} 次")
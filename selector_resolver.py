@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+選擇器鏈解析
+以一次頁面內呼叫評估整串 CSS / XPath 候選選擇器，回傳第一個符合（可選擇要求可見且可用）的元素
+與勝出的候選。每個候選都會被評估並回報符合數，耗時與勝出的是第幾個候選無關，
+也不受 implicitly_wait 影響: 未命中的候選不再各自等待到逾時。
+各候選的勝出與符合次數保存於本機 JSON: 之後的執行依歷史勝出次數排序候選，
+連續多次執行都沒有符合過的候選不再評估；排序後的鏈全部未命中時改以完整的原始鏈重試。
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+import config
+from json_store import load_json, save_json
+from session_recovery import is_session_lost
+
+# arguments = [候選選擇器列表, 是否要求可見且可用]
+# 以 / 或 ( 開頭的候選視為 XPath，其餘為 CSS；語法錯誤的候選回報 -1
+RESOLVE_SCRIPT = """
+var candidates = arguments[0], usable = arguments[1];
+function isUsable(el) {
+    if (el.disabled) return false;
+    var style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none') return false;
+    return el.getClientRects().length > 0;
+}
+function query(selector) {
+    if (selector.charAt(0) === '/' || selector.charAt(0) === '(') {
+        var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+var winner = null, index = -1, counts = [];
+for (var c = 0; c < candidates.length; c++) {
+    var nodes;
+    try { nodes = query(candidates[c]); } catch (e) { counts.push(-1); continue; }
+    var matched = usable ? nodes.filter(function (el) { return el.nodeType === 1 && isUsable(el); }) : nodes;
+    counts.push(matched.length);
+    if (winner === null && matched.length) { winner = matched[0]; index = c; }
+}
+return {element: winner, index: index, counts: counts};
+"""
+
+
+def is_xpath(selector):
+    return selector.startswith(('/', '('))
+
+
+class SelectorStats:
+    """
+    {鏈名稱: {'runs': 執行次數, 'candidates': {選擇器: {'wins', 'matches', 'since'}}}}
+    since 為第一次見到該候選時鏈的執行次數；path 為空字串時只保留在記憶體
+    """
+
+    def __init__(self, path=None, prune_after=None):
+        self.path = path if path is not None else config.SELECTOR_STATS_PATH
+        self.prune_after = config.SELECTOR_PRUNE_AFTER if prune_after is None else prune_after
+        self.chains = self._load()
+        self.seen = set()  # 本次執行已計入 runs 的鏈
+        self.dirty = False
+
+    def _load(self):
+        return load_json(self.path)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        if save_json(self.path, self.chains, "選擇器統計"):
+            self.dirty = False
+
+    def _chain(self, name, candidates):
+        chain = self.chains.setdefault(name, {'runs': 0, 'candidates': {}})
+        if name not in self.seen:
+            self.seen.add(name)
+            chain['runs'] += 1
+            self.dirty = True
+        for selector in candidates:
+            chain['candidates'].setdefault(selector, {'wins': 0, 'matches': 0, 'since': chain['runs'] - 1})
+        return chain
+
+    def order(self, name, candidates):
+        """回傳 (依歷史勝出次數排序並去除從未符合者的候選, 被略過的候選)；全部都會被略過時不略過"""
+        chain = self._chain(name, candidates)
+        stats = chain['candidates']
+
+        def stale(selector):
+            entry = stats[selector]
+            return entry['matches'] == 0 and chain['runs'] - entry['since'] >= self.prune_after
+
+        kept = [selector for selector in candidates if not stale(selector)] or list(candidates)
+        pruned = [selector for selector in candidates if selector not in kept]
+        kept.sort(key=lambda selector: -stats[selector]['wins'])  # 穩定排序: 同分時保留原始順序
+        return kept, pruned
+
+    def record(self, name, candidates, counts, index):
+        stats = self._chain(name, candidates)['candidates']
+        for selector, count in zip(candidates, counts):
+            if count > 0:
+                stats[selector]['matches'] += 1
+        if index >= 0:
+            stats[candidates[index]]['wins'] += 1
+        self.dirty = True
+
+
+@dataclass
+class Resolution:
+    element: Optional[Any]
+    index: int                       # 勝出候選在評估順序中的位置，-1 表示都沒有符合
+    selector: Optional[str]
+    counts: List[int] = field(default_factory=list)  # 各候選的符合數（-1 為語法錯誤）
+    seconds: float = 0.0
+
+    def __bool__(self):
+        return self.element is not None
+
+
+class SelectorResolver:
+    def __init__(self, driver, tracer=None, stats=None):
+        self.driver = driver
+        self.tracer = tracer
+        self.stats = stats if stats is not None else SelectorStats()
+        self.history = []  # (鏈名稱, 勝出的選擇器, 秒數)
+
+    def resolve(self, name, candidates, usable=True):
+        """
+        依歷史統計排序後在頁面內一次評估 candidates，回傳 Resolution
+        usable=True 時只接受可見且可用的元素（例如送出按鈕）；False 時與 find_elements 相同只要求存在
+        """
+        start = time.perf_counter()
+        trace_start = self.tracer.now() if self.tracer else 0
+        ordered, pruned = self.stats.order(name, candidates)
+        resolution = self._evaluate(name, ordered, usable)
+        if not resolution and pruned:
+            # 頁面結構改變: 以完整的原始鏈重試，被略過的候選也有機會重新累積統計
+            resolution = self._evaluate(name, list(candidates), usable)
+        resolution.seconds = time.perf_counter() - start
+
+        self.history.append((name, resolution.selector, resolution.seconds))
+        if self.tracer:
+            self.tracer.add_complete(f"resolve:{name}", trace_start, resolution.seconds * 1e6,
+                                     winner=resolution.selector, counts=resolution.counts, pruned=len(pruned))
+        return resolution
+
+    def _evaluate(self, name, candidates, usable):
+        try:
+            result = self.driver.execute_script(RESOLVE_SCRIPT, candidates, usable) or {}
+        except Exception as e:
+            if is_session_lost(e):
+                raise  # 會話失效不是「沒有符合的候選」，交給呼叫端恢復
+            result = {}
+        index = result.get('index', -1)
+        if index is None:
+            index = -1
+        counts = list(result.get('counts') or [])
+        if result:
+            self.stats.record(name, candidates, counts, index)
+        return Resolution(result.get('element'), index, candidates[index] if index >= 0 else None, counts)
+
+    def save(self):
+        self.stats.save()
+
+    def report(self, emit=print):
+        """輸出各選擇器鏈的解析次數、耗時與勝出位置"""
+        if not self.history:
+            return
+        stats = {}
+        for name, selector, seconds in self.history:
+            entry = stats.setdefault(name, {'count': 0, 'seconds': 0.0, 'misses': 0, 'winners': {}})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            if selector is None:
+                entry['misses'] += 1
+            else:
+                entry['winners'][selector] = entry['winners'].get(selector, 0) + 1
+        emit("🎯 選擇器鏈解析:")
+        for name, entry in stats.items():
+            winners = "、".join(f"{selector} ×{count}" for selector, count in entry['winners'].items())
+            misses = f"，未命中 {entry['misses']} 次" if entry['misses'] else ''
+            emit(f"   {name}: {entry['count']} 次，平均 {entry['seconds'] / entry['count'] * 1000:.1f} ms，"
+                 f"勝出 {winners or '無'}{misses}")
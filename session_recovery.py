@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+瀏覽器會話恢復
+保存登入後的 cookies 快照；瀏覽器會話失效（當機、被關閉、invalid session id）時
+重新啟動 driver 並還原 cookies，跳過登入頁直接回到問卷列表，
+run() 的佇列保持原位，從中斷的問卷繼續處理。
+"""
+
+import logging
+import time
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+import config
+
+# 代表會話已無法使用的錯誤訊息
+SESSION_LOST_MARKERS = (
+    'invalid session id',
+    'session deleted',
+    'no such window',
+    'target window already closed',
+    'disconnected',
+    'not reachable',
+    'failed to establish a new connection',
+    'connection refused',
+)
+
+
+def is_session_lost(error):
+    """判斷例外是否代表瀏覽器會話已失效"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in SESSION_LOST_MARKERS)
+
+
+class SessionRecovery:
+    def __init__(self, filler, max_recoveries=None):
+        self.filler = filler
+        self.max_recoveries = config.MAX_DRIVER_RECOVERIES if max_recoveries is None else max_recoveries
+        self.cookies = []
+        self.timings = []  # 每次從失效到恢復處理的秒數
+
+    def snapshot(self):
+        """保存目前的登入 cookies"""
+        try:
+            cookies = self.filler.driver.get_cookies()
+        except Exception:
+            return False
+        if cookies:
+            self.cookies = cookies
+        return bool(cookies)
+
+    def _restore_cookies(self):
+        """在同網域的頁面上還原 cookies，回傳還原的數量"""
+        driver = self.filler.driver
+        driver.get(f"{config.BASE_URL}/favicon.ico")  # 須先位於同網域才能設定 cookie
+        restored = 0
+        for cookie in self.cookies:
+            cookie = {key: value for key, value in cookie.items()
+                      if key in ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')}
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except Exception:
+                cookie.pop('domain', None)  # 網域寫法不被接受時改用目前網域
+                try:
+                    driver.add_cookie(cookie)
+                    restored += 1
+                except Exception:
+                    continue
+        return restored
+
+    def recover(self, failed_at=None):
+        """
+        重新啟動瀏覽器並回到問卷列表，成功時回傳 True
+        failed_at 為偵測到失效的時間，用來計算恢復耗時
+        """
+        failed_at = failed_at or time.time()
+        if len(self.timings) >= self.max_recoveries:
+            self.filler.emit(f"💥 已恢復 {len(self.timings)} 次仍失效，不再重試", logging.ERROR)
+            return False
+
+        filler = self.filler
+        with filler.tracer.span('recover', attempt=len(self.timings) + 1) as span:
+            filler.emit("🛟 瀏覽器會話失效，重新啟動並還原登入狀態...")
+            filler.close_driver()  # 常駐瀏覽器仍在執行時只中斷連線，重新連上即可
+
+            try:
+                filler.setup_browser()
+                restored = self._restore_cookies() if self.cookies else 0
+                list_url = filler.list_url or config.QUESTIONNAIRE_LIST_URL
+                filler.driver.get(list_url)
+                filler.ready.document_ready("恢復後列表頁", config.ULTRA_SPEED_CONFIG['list_wait'])
+
+                if not filler.is_on_list_page():
+                    # cookies 已過期: 只能重新登入
+                    filler.emit("   ⚠️ 還原的 cookies 無效，重新登入", logging.WARNING)
+                    filler.login()
+                    filler.navigate_to_questionnaire_list()
+                    span.args['relogin'] = True
+                filler.list_url = filler.driver.current_url
+                self.snapshot()
+            except Exception as e:
+                filler.emit(f"   ❌ 恢復失敗: {e}", logging.ERROR)
+                span.args['error'] = str(e)
+                return False
+
+            elapsed = time.time() - failed_at
+            self.timings.append(elapsed)
+            span.args['cookies'] = restored
+            filler.emit(f"   ✅ 已恢復 (還原 {restored} 個 cookies)，{elapsed:.2f} 秒後繼續處理")
+            return True
+
+    def report(self, emit=print):
+        if not self.timings:
+            return
+        emit(f"🛟 瀏覽器恢復: {len(self.timings)} 次，平均 {sum(self.timings) / len(self.timings):.2f} 秒，"
+             f"最長 {max(self.timings):.2f} 秒")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提交結果判定
+依送出請求本身的回應判定每份問卷是否完成，不再下載整份 page_source:
+瀏覽器模式取 DevTools 效能記錄中的文件回應（狀態碼、轉址）加上頁面內擷取的一小段文字，
+HTTP 模式直接使用 requests 的回應。結果只有確認完成、被退回、失敗三種，未確認一律不算完成。
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+from session_recovery import is_session_lost
+
+CONFIRMED = 'confirmed'
+REJECTED = 'rejected'  # 伺服器退回（欄位錯誤），可補填後重送
+FAILED = 'failed'      # HTTP 錯誤或看不到成功頁，不算完成
+
+# 成功頁面關鍵字
+SUCCESS_KEYWORDS = ("感謝", "謝謝")
+SUCCESS_TITLE_KEYWORDS = ("成功", "完成")
+
+# 伺服器退回時的錯誤標記 (ASP.NET MVC)
+ERROR_MARKERS = ('field-validation-error', 'input-validation-error', 'validation-summary-errors')
+
+# 頁面內擷取判定所需的最小資訊: 網址、標題、成功關鍵字附近的片段與錯誤標記數
+# 仍是送出時標記過的原問卷頁（尚未換頁）時只回傳 {pending: true}，不判定舊頁面的內容
+# arguments = [成功關鍵字列表]
+SUBMISSION_STATE_SCRIPT = """
+if (window.__ceqSubmitPending) return {pending: true, url: location.href};
+var text = document.body ? (document.body.innerText || '') : '';
+var keywords = arguments[0], fragment = '';
+for (var i = 0; i < keywords.length && !fragment; i++) {
+    var at = text.indexOf(keywords[i]);
+    if (at >= 0) fragment = text.substr(Math.max(0, at - 20), 60);
+}
+var errors = document.querySelectorAll(
+    '.field-validation-error, .input-validation-error, .validation-summary-errors').length;
+return {url: location.href, title: document.title, fragment: fragment, errors: errors};
+"""
+
+
+@dataclass
+class SubmissionResult:
+    outcome: str
+    source: str                  # network / page / http
+    status: Optional[int] = None
+    url: str = ''
+    redirects: List[int] = field(default_factory=list)
+    reason: str = ''
+
+    @property
+    def confirmed(self):
+        return self.outcome == CONFIRMED
+
+    def describe(self):
+        status = f"HTTP {self.status}" if self.status is not None else "狀態碼未知"
+        redirect = f"，轉址 {'→'.join(str(code) for code in self.redirects)}" if self.redirects else ''
+        return f"{self.reason} ({status}{redirect}，來源 {self.source})"
+
+
+def classify(status=None, url='', text='', title='', errors=None, redirects=(), source='page'):
+    """
+    依回應判定提交結果
+    text 可以是完整回應或只含關鍵字附近的片段；errors 為已知的錯誤標記數（None 時從 text 計算）
+    錯誤標記優先於成功關鍵字: 被退回的問卷頁本身可能含「感謝」等字樣
+    """
+    redirects = list(redirects)
+    result = SubmissionResult(FAILED, source, status, url or '', redirects)
+    if status is not None and status >= 400:
+        result.reason = "伺服器回應錯誤"
+        return result
+
+    text, title = text or '', title or ''
+    if errors is None:
+        errors = sum(text.count(marker) for marker in ERROR_MARKERS)
+    if errors:
+        result.outcome, result.reason = REJECTED, f"{errors} 個錯誤標記"
+        return result
+
+    if (any(keyword in text for keyword in SUCCESS_KEYWORDS) or
+            any(keyword in title for keyword in SUCCESS_TITLE_KEYWORDS) or 'success' in result.url.lower()):
+        result.outcome, result.reason = CONFIRMED, "成功頁"
+        return result
+
+    result.reason = "未出現成功頁"
+    return result
+
+
+def classify_http(response):
+    """HTTP 模式: 直接以 requests 的回應判定"""
+    return classify(response.status_code, response.url, response.text,
+                    redirects=[previous.status_code for previous in response.history], source='http')
+
+
+def classify_browser(driver, success_ready, document=None):
+    """
+    瀏覽器模式: document 為效能記錄中送出請求的文件回應（無效能記錄時為 None）
+    頁面內已等到成功頁 (success_ready) 且回應正常時直接確認，不再與頁面往返；
+    否則執行一次 SUBMISSION_STATE_SCRIPT，只傳回網址、標題、關鍵字片段與錯誤標記數
+    """
+    status = document.get('status') if document else None
+    redirects = document.get('redirects', []) if document else []
+    source = 'network' if document else 'page'
+    if document and document.get('error'):
+        return SubmissionResult(FAILED, source, status, document.get('url', ''), redirects,
+                                f"請求失敗: {document['error']}")
+    if success_ready and (status is None or status < 400):
+        return SubmissionResult(CONFIRMED, source, status, document.get('url', '') if document else '',
+                                redirects, "成功頁")
+
+    try:
+        state = driver.execute_script(SUBMISSION_STATE_SCRIPT, list(SUCCESS_KEYWORDS)) or {}
+    except Exception as e:
+        if is_session_lost(e):
+            raise
+        return SubmissionResult(FAILED, source, status, '', redirects, f"無法讀取提交結果: {e}")
+    if state.get('pending'):
+        return SubmissionResult(FAILED, source, status, state.get('url', ''), redirects, "送出後仍停在原問卷頁")
+    return classify(status, state.get('url', ''), state.get('fragment', ''), state.get('title', ''),
+                    state.get('errors', 0), redirects, source)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+問卷預載管線
+點擊送出第 N 份問卷後不在原分頁等待伺服器回應，先切到第二個分頁開啟第 N+1 份問卷，
+再回到原分頁等待成功頁並判定結果: 伺服器處理送出的時間與下一份問卷的載入重疊。
+兩個分頁輪流使用，確認完成後已預載的分頁成為目前分頁，原分頁留待下一次預載。
+只能在列表頁以 onclick 開啟的問卷不預載，照常在目前分頁開啟。
+
+使用方式:
+    set PIPELINE_PREFETCH=true
+    python auto_questionnaire.py
+"""
+
+import time
+from session_recovery import is_session_lost
+
+
+class TabPipeline:
+    def __init__(self, filler):
+        self.filler = filler
+        self.handles = []       # [目前分頁, 預載分頁]；尚未開啟第二個分頁時為空
+        self.prefetched = None  # 已在預載分頁開啟的問卷
+        self.timings = []       # 每次預載的秒數（與送出請求重疊的時間）
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self):
+        """driver 重新啟動後，舊的分頁都已不存在"""
+        self.handles = []
+        self.prefetched = None
+
+    @property
+    def window(self):
+        """目前分頁的 handle，供判定送出結果時排除另一個分頁的請求"""
+        return self.handles[0] if self.handles else None
+
+    @staticmethod
+    def can_prefetch(item):
+        return item is not None and bool(item.target_url)
+
+    def _ensure_tabs(self):
+        """開啟第二個分頁（同一個瀏覽器共用登入 cookies）"""
+        if self.handles:
+            return
+        driver = self.filler.driver
+        current = driver.current_window_handle
+        driver.switch_to.new_window('tab')
+        spare = driver.current_window_handle
+        network = self.filler.network
+        if network and network.active:
+            network.install()  # 網路封鎖以分頁為單位，新分頁需重新設定
+        driver.switch_to.window(current)
+        self.handles = [current, spare]
+
+    def prefetch(self, item):
+        """在送出請求進行中呼叫: 於預載分頁開啟 item，完成後切回目前分頁"""
+        if not self.can_prefetch(item):
+            return
+        filler = self.filler
+        with filler.tracer.span('prefetch', key=item.key) as span:
+            start = time.perf_counter()
+            self.prefetched = None
+            try:
+                self._ensure_tabs()
+                current, spare = self.handles
+                filler.driver.switch_to.window(spare)
+                try:
+                    filler.open_questionnaire(item)
+                    self.prefetched = item
+                finally:
+                    filler.driver.switch_to.window(current)
+            except Exception as e:
+                if is_session_lost(e):
+                    raise
+                span.args['error'] = str(e)
+                filler.detail(f"   ⚠️ 預載下一份問卷失敗，輪到時照常開啟: {e}")
+                return
+            self.timings.append(time.perf_counter() - start)
+            filler.detail(f"   🔀 送出期間已預載下一份問卷 ({self.timings[-1]:.2f} 秒)")
+
+    def take(self, item):
+        """輪到 item 時: 已預載則切到預載分頁並交換兩個分頁的角色，回傳 True；否則回傳 False 照常開啟"""
+        prefetched, self.prefetched = self.prefetched, None
+        if prefetched is None or prefetched.key != item.key:
+            if self.can_prefetch(item) and self.handles:
+                self.misses += 1
+            return False
+        current, spare = self.handles
+        self.filler.driver.switch_to.window(spare)
+        self.handles = [spare, current]
+        self.hits += 1
+        return True
+
+    def close(self, driver):
+        """關閉預載分頁（連上常駐瀏覽器時，避免每次執行都留下一個分頁）"""
+        if not self.handles:
+            return
+        current, spare = self.handles
+        self.reset()
+        try:
+            driver.switch_to.window(spare)
+            driver.close()
+            driver.switch_to.window(current)
+        except Exception:
+            pass  # 會話已失效
+
+    def report(self, emit=print):
+        if not self.timings:
+            return
+        misses = f"，{self.misses} 份未預載" if self.misses else ''
+        emit(f"🔀 預載管線: {self.hits} 份問卷在前一份送出期間開啟，平均 "
+             f"{sum(self.timings) / len(self.timings):.2f} 秒與送出重疊{misses}")
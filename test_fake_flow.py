@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+以假 driver 跑完整流程的自動測試
+不需瀏覽器: 確認 登入 → 列表 → 填寫 → 送出 能完成所有問卷，且各階段的 WebDriver 指令數沒有增加。
+指令數預算與 benchmark.py --backend fake 量到的相同；流程改動使往返變多時這裡會先失敗。
+
+使用方式:
+    python -m pytest -q test_fake_flow.py
+    python -m unittest test_fake_flow
+"""
+
+import contextlib
+import io
+import tempfile
+import unittest
+import benchmark
+import config
+from auto_questionnaire import QuestionnaireAutoFiller
+from fake_driver import FakeDriver
+from fixture_server import FixtureSite
+from page_corpus import QUESTIONNAIRE, CorpusSite, PageCorpus
+from log_setup import start_logging, stop_logging
+
+# 各階段的 WebDriver 指令數上限 (每次呼叫)
+COMMAND_BUDGET = {
+    'login': 14,
+    'navigate_to_questionnaire_list': 4,
+    'get_questionnaire_buttons': 5,
+    'open_questionnaire': 3,
+    'fill_single_questionnaire': 2,
+    'submit_questionnaire': 4,
+}
+
+
+class FakeFlowTest(unittest.TestCase):
+    def setUp(self):
+        # 流程輸出寫入記憶體，不寫記錄檔
+        self.addCleanup(stop_logging, start_logging(stream=io.StringIO(), log_file=''))
+
+    def test_benchmark_phases(self):
+        """分階段流程完成所有問卷，且每個階段的指令數不超過預算"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = benchmark.run_benchmark([10], [3], backend='fake')
+
+        for sweep, count in (('questions', '10'), ('questionnaires', '3')):
+            phases = results[sweep][count]
+            self.assertEqual(phases['completed'], phases['expected'], f"{sweep}={count}")
+            for phase, budget in COMMAND_BUDGET.items():
+                entry = phases[phase]
+                self.assertLessEqual(entry['commands'], budget * entry['calls'], f"{sweep}={count}/{phase}")
+
+    def test_run_completes_with_template_cache(self):
+        """run() 以假 driver 完成所有問卷；相同模板只分析一次，其餘套用快取的作答計畫"""
+        site = FixtureSite(questionnaires=3)
+        filler = QuestionnaireAutoFiller()
+        filler.driver_factory = lambda: FakeDriver(site)
+        filler.use_fixture_state()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            filler.run()
+
+        self.assertEqual(len(site.completed), 3)
+        self.assertEqual((filler.form_templates.misses, filler.form_templates.hits), (1, 2))
+
+    def test_fake_backend_keeps_user_state(self):
+        """DRIVER_BACKEND=fake 時不讀寫使用者的完成紀錄、模板快取與選擇器統計"""
+        backend, config.DRIVER_BACKEND = config.DRIVER_BACKEND, 'fake'
+        self.addCleanup(setattr, config, 'DRIVER_BACKEND', backend)
+        filler = QuestionnaireAutoFiller()
+        self.assertIsNone(filler.journal)
+        self.assertEqual(filler.form_templates.path, '')
+        self.assertEqual(filler.selectors.stats.path, '')
+
+    def test_corpus_replays_post_opened_questionnaires(self):
+        """以 POST 開啟的問卷錄製為 POST，重播時能再次開啟，不會被當成送出"""
+        site = FixtureSite(questionnaires=2, button_style='post')
+        filler = QuestionnaireAutoFiller()
+        filler.driver_factory = lambda: FakeDriver(site)
+        filler.use_fixture_state()
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        filler.corpus = PageCorpus(folder.name)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            filler.run()
+        self.assertEqual(len(site.completed), 2)
+        questionnaires = [entry for entry in filler.corpus.entries if entry['kind'] == QUESTIONNAIRE]
+        self.assertEqual({entry['method'] for entry in questionnaires}, {'POST'})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = benchmark.run_benchmark([], [], backend='fake', corpus=folder.name)
+        replay = results['corpus']['replay']
+        self.assertEqual(replay['expected'], 2)
+        self.assertEqual(replay['completed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
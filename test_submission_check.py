@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提交結果判定的單元測試
+classify / classify_browser 決定哪些問卷寫入完成紀錄: 誤判為完成的問卷之後每次執行都會被跳過。
+
+使用方式:
+    python -m pytest -q test_submission_check.py
+"""
+
+import unittest
+from selenium.common.exceptions import InvalidSessionIdException, JavascriptException
+import submission_check
+from submission_check import CONFIRMED, FAILED, REJECTED, classify, classify_browser
+
+FILL_URL = 'http://fixture.local/StuFillIn/Fill?id=1'
+REJECTED_PAGE = ('<p>感謝您撥冗填寫</p>'
+                 '<span class="field-validation-error" data-valmsg-for="Q1">請填寫</span>')
+
+
+class StateDriver:
+    """只回應 SUBMISSION_STATE_SCRIPT 的最小 driver；state 為例外時拋出"""
+
+    def __init__(self, state):
+        self.state = state
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        assert script == submission_check.SUBMISSION_STATE_SCRIPT
+        self.calls += 1
+        if isinstance(self.state, Exception):
+            raise self.state
+        return self.state
+
+
+class ClassifyTest(unittest.TestCase):
+    def test_success_keyword(self):
+        result = classify(200, 'http://fixture.local/StuFillIn', '<p>感謝您的填寫</p>')
+        self.assertEqual(result.outcome, CONFIRMED)
+
+    def test_success_title_and_url(self):
+        self.assertEqual(classify(200, FILL_URL, '', '填寫完成').outcome, CONFIRMED)
+        self.assertEqual(classify(200, 'http://fixture.local/Success').outcome, CONFIRMED)
+
+    def test_error_markers_win_over_success_keywords(self):
+        result = classify(200, FILL_URL, REJECTED_PAGE)
+        self.assertEqual(result.outcome, REJECTED)
+        self.assertEqual(classify(200, FILL_URL, '感謝', errors=2).outcome, REJECTED)
+
+    def test_http_error(self):
+        self.assertEqual(classify(500, FILL_URL, '<p>感謝</p>').outcome, FAILED)
+
+    def test_no_success_page(self):
+        result = classify(200, FILL_URL, '<form></form>')
+        self.assertEqual(result.outcome, FAILED)
+        self.assertFalse(result.confirmed)
+
+
+class ClassifyBrowserTest(unittest.TestCase):
+    def test_success_ready_skips_page_round_trip(self):
+        driver = StateDriver({})
+        result = classify_browser(driver, True, {'status': 200, 'url': FILL_URL, 'redirects': [302]})
+        self.assertEqual(result.outcome, CONFIRMED)
+        self.assertEqual(result.redirects, [302])
+        self.assertEqual(driver.calls, 0)
+
+    def test_success_ready_with_http_error(self):
+        driver = StateDriver({'url': FILL_URL, 'title': '', 'fragment': '', 'errors': 0})
+        self.assertEqual(classify_browser(driver, True, {'status': 500}).outcome, FAILED)
+
+    def test_request_error(self):
+        result = classify_browser(StateDriver({}), False, {'error': 'net::ERR_CONNECTION_RESET'})
+        self.assertEqual(result.outcome, FAILED)
+
+    def test_rejected_page_with_success_keyword(self):
+        driver = StateDriver({'url': FILL_URL, 'title': '', 'fragment': '感謝您撥冗填寫', 'errors': 1})
+        self.assertEqual(classify_browser(driver, False).outcome, REJECTED)
+
+    def test_page_state_success(self):
+        driver = StateDriver({'url': 'http://fixture.local/StuFillIn', 'title': '', 'fragment': '謝謝', 'errors': 0})
+        result = classify_browser(driver, False)
+        self.assertEqual(result.outcome, CONFIRMED)
+        self.assertEqual(result.source, 'page')
+
+    def test_not_navigated_is_not_judged(self):
+        """送出後仍停在原問卷頁時不判定舊頁面的內容"""
+        driver = StateDriver({'pending': True, 'url': FILL_URL})
+        self.assertEqual(classify_browser(driver, False).outcome, FAILED)
+
+    def test_script_error(self):
+        driver = StateDriver(JavascriptException('javascript error'))
+        self.assertEqual(classify_browser(driver, False).outcome, FAILED)
+
+    def test_session_lost_is_raised(self):
+        with self.assertRaises(InvalidSessionIdException):
+            classify_browser(StateDriver(InvalidSessionIdException('invalid session id')), False)
+
+
+if __name__ == '__main__':
+    unittest.main()
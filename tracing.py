@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+執行追蹤
+記錄整次執行、每份問卷與其中每個步驟的巢狀 span（含時間與計數），
+可匯出為 JSONL 或 Chrome trace_event 格式（chrome://tracing、Perfetto 開啟）。
+主控台輸出只是這些事件的一個檢視（經由 logging 分級輸出），可以關閉。
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+
+class Span:
+    """進行中的 span；counters 會在結束時寫入事件的 args"""
+
+    def __init__(self, name, start, args):
+        self.name = name
+        self.start = start
+        self.args = dict(args)
+        self.counters = {}
+
+    def count(self, key, amount=1):
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+
+class Tracer:
+    def __init__(self, console=True, logger=None):
+        self.console = console
+        self.logger = logger or logging.getLogger('questionnaire')
+        self.events = []
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    # ---------- 時間與事件 ----------
+
+    def now(self):
+        """相對於追蹤開始的微秒數"""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def _record(self, event):
+        event.setdefault('pid', self.pid)
+        event.setdefault('tid', threading.get_ident())
+        with self.lock:
+            self.events.append(event)
+
+    # ---------- span ----------
+
+    def begin(self, name, **args):
+        span = Span(name, self.now(), args)
+        self._stack().append(span)
+        return span
+
+    def end(self, span, **args):
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+        span.args.update(args)
+        span.args.update(span.counters)
+        self._record({'name': span.name, 'ph': 'X', 'ts': span.start,
+                      'dur': self.now() - span.start, 'args': span.args})
+
+    def span(self, name, **args):
+        """with tracer.span('fill'): ... 的 context manager 形式"""
+        return _SpanContext(self, name, args)
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def count(self, key, amount=1):
+        """累加目前 span 的計數"""
+        span = self.current()
+        if span is not None:
+            span.count(key, amount)
+
+    def add_complete(self, name, start, duration, **args):
+        """加入已知起點與長度的 span（例如頁面內量到的時間）"""
+        self._record({'name': name, 'ph': 'X', 'ts': start, 'dur': duration, 'args': args})
+
+    # ---------- 訊息（主控台檢視） ----------
+
+    def enabled(self, level):
+        """此等級的訊息是否會輸出（用於延遲產生診斷訊息）"""
+        return self.console and self.logger.isEnabledFor(level)
+
+    def message(self, text='', level=logging.INFO):
+        self._record({'name': 'message', 'ph': 'i', 's': 't', 'ts': self.now(),
+                      'args': {'text': text, 'level': logging.getLevelName(level)}})
+        if self.enabled(level):
+            self.logger.log(level, text)
+
+    # ---------- 匯出 ----------
+
+    def export(self, path, fmt='chrome'):
+        """匯出事件: fmt 為 'chrome' (trace_event JSON) 或 'jsonl'"""
+        with self.lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+        with open(path, 'w', encoding='utf-8') as f:
+            if fmt == 'jsonl':
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False) + '\n')
+            else:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return path
+
+
+class _SpanContext:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.tracer.begin(self.name, **self.args)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is not None:
+            self.span.args['error'] = str(exc)
+        self.tracer.end(self.span)
+        return False
+
+
+def traced(name):
+    """方法裝飾器: 以 self.tracer 記錄整個方法為一個 span"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator